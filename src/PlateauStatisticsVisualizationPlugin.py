@@ -29,10 +29,8 @@ from .resources import * # pylint: disable=wildcard-import, unused-wildcard-impo
 from .PlateauStatisticsVisualizationPlugin_dockwidget import (
     PlateauStatisticsVisualizationPluginDockWidget
 )
-from .functions.create_directory import CreateDirectory
-from .functions.metric_calculation import MetricCalculation
-from .functions.visualization import ControlDock, GraphDock
-from .functions.output import Output
+# 各機能（pandas・matplotlib・processing などを使用）はQGIS起動時の読み込みを
+# 避けるため、ダイアログ・DockWidgetを初めて開く時に読み込む
 
 
 class PlateauStatisticsVisualizationPlugin:
@@ -262,16 +260,21 @@ class PlateauStatisticsVisualizationPlugin:
 
     def _createDir(self):
         """CreateDirectoryダイアログを使用してディレクトリ構造を作成する関数"""
+        from .functions.create_directory import CreateDirectory # pylint: disable=import-outside-toplevel
+
         createDirectory = CreateDirectory(self.translator)
         createDirectory.exec_()
 
     def _calcMetric(self):
         """MetricCalculationダイアログを使用して指標計算を実行する関数"""
+        from .functions.metric_calculation import MetricCalculation # pylint: disable=import-outside-toplevel
+
         metricCalculation = MetricCalculation(self.translator)
         metricCalculation.exec_()
 
     def _visualizing(self):
         """ControlDockおよびGraphDockを開き、可視化を行う関数"""
+        from .functions.visualization import ControlDock, GraphDock # pylint: disable=import-outside-toplevel
 
         if not self.control_dock:
             self.control_dock = ControlDock(self.iface.mainWindow(),
@@ -307,5 +310,7 @@ class PlateauStatisticsVisualizationPlugin:
 
     def _output(self):
         """データをエクスポートするためのOutputダイアログを開く関数"""
+        from .functions.output import Output # pylint: disable=import-outside-toplevel
+
         outputDialog = Output(translator=self.translator)
         outputDialog.exec_()
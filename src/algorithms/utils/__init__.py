@@ -1,26 +1,59 @@
 """
 データ処理および評価指標算出に関する関数を提供します。
+
+各クラスは初回参照時にモジュールを読み込みます
+（GpkgManager などの軽いクラスのみ使用する場合に、processing や
+各データ作成機能を読み込まないため）。
 """
-from .gpkg_manager import GpkgManager
-from .vacancy_data_generator import VacancyDataGenerator
-from .zone_data_generator import ZoneDataGenerator
-from .data_loader import DataLoader
-from .population_data_generator import PopulationDataGenerator
-from .facility_data_generator import FacilityDataGenerator
-from .transportation_data_generator import TransportationDataGenerator
-from .building_data_assigner import BuildingDataAssigner
-from .area_data_generator import AreaDataGenerator
-from .financial_data_generator import FinancialDataGenerator
+import importlib
+
+# クラス名: 定義しているモジュール
+_CLASS_MODULES = {
+    'GpkgManager': '.gpkg_manager',
+    'SourceCatalog': '.source_catalog',
+    'ReprojectionManager': '.reprojection_manager',
+    'LayerAggregator': '.layer_aggregator',
+    'StagingManager': '.staging_manager',
+    'ProgressManager': '.progress_manager',
+    'SpatialIndexRegistry': '.spatial_index_registry',
+    'ScratchManager': '.scratch_manager',
+    'VacancyDataGenerator': '.vacancy_data_generator',
+    'ZoneDataGenerator': '.zone_data_generator',
+    'DataLoader': '.data_loader',
+    'PopulationDataGenerator': '.population_data_generator',
+    'FacilityDataGenerator': '.facility_data_generator',
+    'TransportationDataGenerator': '.transportation_data_generator',
+    'BuildingDataAssigner': '.building_data_assigner',
+    'AreaDataGenerator': '.area_data_generator',
+    'FinancialDataGenerator': '.financial_data_generator',
+    'LayerClassifier': '.layer_classifier',
+    'LayerGeneralizer': '.layer_generalizer',
+    'MetricResultStore': '.metric_result_store',
+    'ResidentialInductionMetricCalculator':
+        '.residential_induction_metric_calculator',
+    'UrbanFunctionInductionMetricCalculator':
+        '.urban_functionInduction_metric_calculator',
+    'DisasterPreventionMetricCalculator':
+        '.disaster_prevention_metric_calculator',
+    'PublicTransportMetricCalculator': '.public_transport_metric_calculator',
+    'LandUseMetricCalculator': '.land_use_metric_calculator',
+    'FiscalMetricCalculator': '.fiscal_metric_calculator',
+}
+
+__all__ = list(_CLASS_MODULES)
+
+
+def __getattr__(name):
+    """クラスを初回参照時に読み込む"""
+    module_name = _CLASS_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        )
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
-from .residential_induction_metric_calculator import (
-    ResidentialInductionMetricCalculator,
-)
-from .urban_functionInduction_metric_calculator import (
-    UrbanFunctionInductionMetricCalculator,
-)
-from .disaster_prevention_metric_calculator import (
-    DisasterPreventionMetricCalculator,
-)
-from .public_transport_metric_calculator import PublicTransportMetricCalculator
-from .land_use_metric_calculator import LandUseMetricCalculator
-from .fiscal_metric_calculator import FiscalMetricCalculator
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -11,16 +11,12 @@ import traceback
 import heapq
 
 import processing
-import chardet
 from qgis.core import (
     QgsMessageLog,
     Qgis,
     QgsVectorLayer,
     QgsField,
     QgsFeature,
-    QgsProject,
-    QgsCoordinateTransform,
-    QgsCoordinateReferenceSystem,
     QgsGeometry,
     QgsPointXY,
     QgsWkbTypes,
@@ -33,6 +29,10 @@ from shapely.geometry import LineString, Polygon
 from shapely.ops import unary_union
 
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
+from .staging_manager import StagingManager
+from .reprojection_manager import ReprojectionManager
+from .progress_manager import ProgressManager
 
 class AreaDataGenerator:
     """圏域作成機能"""
@@ -43,9 +43,16 @@ class AreaDataGenerator:
         threshold_railway,
         threshold_shelter,
         check_canceled_callback=None,
+        gpkg_manager=None,
     ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
+        # 座標変換管理
+        self.reprojection_manager = ReprojectionManager._instance
+        # 広域データ共有
+        self.staging_manager = StagingManager._instance
         # インプットデータパス
         self.base_path = base_path
         # 閾値の設定
@@ -120,10 +127,7 @@ class AreaDataGenerator:
             buffer_distance = self.threshold_railway  # 閾値（単位: m）
 
             # 投影座標系に変換
-            target_crs = QgsCoordinateReferenceSystem('EPSG:3857')
-            transform = QgsCoordinateTransform(
-                railway_layer.crs(), target_crs, QgsProject.instance()
-            )
+            target_crs = self.reprojection_manager.get_metric_crs()
 
             # railway_stationsレイヤと同じCRSを使用してメモリレイヤを作成
             buffer_layer = QgsVectorLayer(
@@ -142,13 +146,17 @@ class AreaDataGenerator:
             )  # 閾値フィールド
             buffer_layer.updateFields()
 
-            # フィーチャごとにバッファを作成
-            for station in railway_layer.getFeatures():
-                station_geom = station.geometry()
-
-                # 座標系変換を適用
-                station_geom.transform(transform)
+            # 座標系変換を一括で適用
+            stations = list(railway_layer.getFeatures())
+            station_geoms = self.reprojection_manager.transform_geometries(
+                [station.geometry() for station in stations],
+                railway_layer.crs(),
+                target_crs,
+            )
 
+            # フィーチャごとにバッファを作成
+            buffer_features = []
+            for station, station_geom in zip(stations, station_geoms):
                 # 投影座標系でバッファを計算
                 buffer_geom = station_geom.buffer(
                     float(buffer_distance), 5
@@ -164,8 +172,10 @@ class AreaDataGenerator:
                 # 属性を設定
                 buffer_feature.setAttributes(station_attributes)
 
-                # フィーチャを追加
-                buffer_provider.addFeature(buffer_feature)
+                buffer_features.append(buffer_feature)
+
+            # フィーチャを一括で追加
+            buffer_provider.addFeatures(buffer_features)
 
             # GeoPackage に保存
             if not self.gpkg_manager.add_layer(
@@ -212,10 +222,7 @@ class AreaDataGenerator:
             buffer_distance = self.threshold_bus  # 閾値（単位: m）
 
             # 投影座標系に変換
-            target_crs = QgsCoordinateReferenceSystem('EPSG:3857')
-            transform = QgsCoordinateTransform(
-                bus_layer.crs(), target_crs, QgsProject.instance()
-            )
+            target_crs = self.reprojection_manager.get_metric_crs()
 
             # bus_stopsレイヤと同じCRSを使用してメモリレイヤを作成
             buffer_layer = QgsVectorLayer(
@@ -234,13 +241,17 @@ class AreaDataGenerator:
             )  # 閾値フィールド
             buffer_layer.updateFields()
 
-            # フィーチャごとにバッファを作成
-            for stop in bus_layer.getFeatures():
-                stop_geom = stop.geometry()
-
-                # 座標系変換を適用
-                stop_geom.transform(transform)
+            # 座標系変換を一括で適用
+            stops = list(bus_layer.getFeatures())
+            stop_geoms = self.reprojection_manager.transform_geometries(
+                [stop.geometry() for stop in stops],
+                bus_layer.crs(),
+                target_crs,
+            )
 
+            # フィーチャごとにバッファを作成
+            buffer_features = []
+            for stop, stop_geom in zip(stops, stop_geoms):
                 # 投影座標系でバッファを計算
                 buffer_geom = stop_geom.buffer(
                     float(buffer_distance), 5
@@ -256,8 +267,10 @@ class AreaDataGenerator:
                 # 属性を設定
                 buffer_feature.setAttributes(stop_attributes)
 
-                # フィーチャを追加
-                buffer_provider.addFeature(buffer_feature)
+                buffer_features.append(buffer_feature)
+
+            # フィーチャを一括で追加
+            buffer_provider.addFeatures(buffer_features)
 
             # GeoPackage に保存
             if not self.gpkg_manager.add_layer(
@@ -289,33 +302,16 @@ class AreaDataGenerator:
         try:
             # base_path 配下の「避難所」フォルダを再帰的に探索してShapefileを収集
             induction_area_folder = os.path.join(self.base_path, "避難所")
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
             # レイヤを格納するリスト
             layers = []
 
             for shp_file in shp_files:
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
                 # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
+                layer_fields = set(self.source_catalog.get_fields(shp_file))
                 required_fields = {
                     "P20_001",
                     "P20_002",
@@ -341,6 +337,25 @@ class AreaDataGenerator:
                     )
                     continue
 
+                encoding = self.source_catalog.get_encoding(shp_file)
+
+                # Shapefile 読み込み
+                layer = QgsVectorLayer(
+                    shp_file, os.path.basename(shp_file), "ogr"
+                )
+                layer.setProviderEncoding(encoding)
+
+                if not layer.isValid():
+                    msg = self.tr(
+                        "Failed to load layer: %1"
+                    ).replace("%1", shp_file)
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Warning,
+                    )
+                    continue
+
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
                     f"Point?crs={layer.crs().authid()}", "shelters", "memory"
@@ -457,9 +472,13 @@ class AreaDataGenerator:
 
             distance = self.threshold_shelter
 
+            target_crs = self.reprojection_manager.get_metric_crs()
+
             # 一時メモリレイヤの作成 (Polygonタイプ)
             tmp_buffer_layer = QgsVectorLayer(
-                "Polygon?crs=EPSG:3857", "tmp_shelter_area", "memory"
+                f"Polygon?crs={target_crs.authid()}",
+                "tmp_shelter_area",
+                "memory",
             )
             temp_buffer_provider = tmp_buffer_layer.dataProvider()
             # 必要なフィールドを追加
@@ -470,7 +489,9 @@ class AreaDataGenerator:
 
             # shelter_buffersレイヤを作成
             shelter_buffer_layer = QgsVectorLayer(
-                "Polygon?crs=EPSG:3857", "shelter_buffers", "memory"
+                f"Polygon?crs={target_crs.authid()}",
+                "shelter_buffers",
+                "memory",
             )
             shelter_buffer_provider = shelter_buffer_layer.dataProvider()
             shelter_buffer_provider.addAttributes(
@@ -478,30 +499,18 @@ class AreaDataGenerator:
             )
             shelter_buffer_layer.updateFields()
 
-            target_crs = QgsCoordinateReferenceSystem("EPSG:3857")
-
             # 避難所を投影座標系へ変換
-            shelters_layer = processing.run(
-                "native:reprojectlayer",
-                {
-                    'INPUT': shelters_layer,
-                    'TARGET_CRS': target_crs,  # オブジェクトを使用
-                    'OUTPUT': 'memory:',  # 一時メモリレイヤとして出力
-                },
-            )['OUTPUT']
+            shelters_layer = self.reprojection_manager.reproject_layer(
+                shelters_layer, target_crs
+            )
 
             if self.check_canceled():
                 return  # キャンセルチェック
 
             # 道路ネットワークを投影座標系へ変換
-            road_network_layer = processing.run(
-                "native:reprojectlayer",
-                {
-                    'INPUT': road_network_layer,
-                    'TARGET_CRS': target_crs,  # オブジェクトを使用
-                    'OUTPUT': 'memory:',  # 一時メモリレイヤとして出力
-                },
-            )['OUTPUT']
+            road_network_layer = self.reprojection_manager.reproject_layer(
+                road_network_layer, target_crs
+            )
 
             if self.check_canceled():
                 return  # キャンセルチェック
@@ -849,7 +858,9 @@ class AreaDataGenerator:
         try:
             # base_path 配下の「誘導区域」フォルダを再帰的に探索してShapefileを収集
             induction_area_folder = os.path.join(self.base_path, "誘導区域")
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
             if not shp_files:
                 data_name = self.tr("induction area")
@@ -870,27 +881,8 @@ class AreaDataGenerator:
             for shp_file in shp_files:
                 if self.check_canceled():
                     return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
                 # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
+                layer_fields = set(self.source_catalog.get_fields(shp_file))
                 required_fields = {
                     "区域区分",
                     "kubunID",
@@ -919,6 +911,25 @@ class AreaDataGenerator:
                     )
                     continue
 
+                encoding = self.source_catalog.get_encoding(shp_file)
+
+                # Shapefile 読み込み
+                layer = QgsVectorLayer(
+                    shp_file, os.path.basename(shp_file), "ogr"
+                )
+                layer.setProviderEncoding(encoding)
+
+                if not layer.isValid():
+                    msg = self.tr(
+                        "Failed to load layer: %1"
+                    ).replace("%1", shp_file)
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Warning,
+                    )
+                    continue
+
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
                     f"Polygon?crs={layer.crs().authid()}",
@@ -1009,7 +1020,9 @@ class AreaDataGenerator:
         try:
             # base_path 配下の「誘導区域」フォルダを再帰的に探索してShapefileを収集
             induction_area_folder = os.path.join(self.base_path, "誘導区域")
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
             if not shp_files:
                 data_name = self.tr("induction area")
@@ -1030,27 +1043,8 @@ class AreaDataGenerator:
             for shp_file in shp_files:
                 if self.check_canceled():
                     return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
                 # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
+                layer_fields = set(self.source_catalog.get_fields(shp_file))
                 required_fields = {
                     "tokeiname",
                     "Type",
@@ -1080,6 +1074,25 @@ class AreaDataGenerator:
                     )
                     continue
 
+                encoding = self.source_catalog.get_encoding(shp_file)
+
+                # Shapefile 読み込み
+                layer = QgsVectorLayer(
+                    shp_file, os.path.basename(shp_file), "ogr"
+                )
+                layer.setProviderEncoding(encoding)
+
+                if not layer.isValid():
+                    msg = self.tr(
+                        "Failed to load layer: %1"
+                    ).replace("%1", shp_file)
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Warning,
+                    )
+                    continue
+
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
                     f"Polygon?crs={layer.crs().authid()}",
@@ -1172,7 +1185,9 @@ class AreaDataGenerator:
         try:
             # base_path 配下の「誘導区域」フォルダを再帰的に探索してShapefileを収集
             induction_area_folder = os.path.join(self.base_path, "誘導区域")
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
             if not shp_files:
                 data_name = self.tr("induction area")
@@ -1193,27 +1208,8 @@ class AreaDataGenerator:
             for shp_file in shp_files:
                 if self.check_canceled():
                     return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
                 # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
+                layer_fields = set(self.source_catalog.get_fields(shp_file))
                 required_fields = {
                     "用途地域",
                     "YoutoID",
@@ -1244,6 +1240,25 @@ class AreaDataGenerator:
                     )
                     continue
 
+                encoding = self.source_catalog.get_encoding(shp_file)
+
+                # Shapefile 読み込み
+                layer = QgsVectorLayer(
+                    shp_file, os.path.basename(shp_file), "ogr"
+                )
+                layer.setProviderEncoding(encoding)
+
+                if not layer.isValid():
+                    msg = self.tr(
+                        "Failed to load layer: %1"
+                    ).replace("%1", shp_file)
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Warning,
+                    )
+                    continue
+
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
                     f"Polygon?crs={layer.crs().authid()}",
@@ -1340,137 +1355,139 @@ class AreaDataGenerator:
             induction_area_folder = os.path.join(
                 self.base_path, "ハザードエリア計画規模"
             )
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-            # レイヤを格納するリスト
-            layers = []
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "hazard_area_planned_scales", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
+                for shp_file in shp_files:
+                    if self.check_canceled():
+                        return  # キャンセルチェック
+                    # Shapefileの属性フィールドバリデーション
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
+                    )
+                    required_fields = {
+                        "A31b_101",
+                    }
+
+                    if not required_fields.issubset(layer_fields):
+                        data_name = self.tr("hazard area planned scales")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
                     )
-                    continue
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
-                required_fields = {
-                    "A31b_101",
-                }
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Polygon?crs={layer.crs().authid()}",
+                        "hazard_area_planned_scales",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
 
-                if not required_fields.issubset(layer_fields):
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # 属性データのマッピング
+                        attributes = [
+                            feature["A31b_101"],  # rank
+                        ]
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
                     data_name = self.tr("hazard area planned scales")
                     msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
                     )
                     QgsMessageLog.logMessage(
                         msg,
                         self.tr("Plugin"),
-                        Qgis.Warning,
+                        Qgis.Info,
                     )
-                    continue
 
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Polygon?crs={layer.crs().authid()}",
-                    "hazard_area_planned_scales",
-                    "memory",
-                )
-                temp_provider = temp_layer.dataProvider()
+                    # 一時メモリレイヤを作成
+                    temp_layer = QgsVectorLayer(
+                        "Polygon", "hazard_area_planned_scales", "memory"
+                    )
+                    temp_provider = temp_layer.dataProvider()
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+                    layers.append(temp_layer)
 
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    if self.check_canceled():
-                        return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
 
-                    # 属性データのマッピング
-                    attributes = [
-                        feature["A31b_101"],  # rank
-                    ]
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
+                # 無効なジオメトリを修正する
+                merged_layer = self.__fix_invalid_geometries(merged_layer)
+                merged_layer = self.staging_manager.save_layer(
+                    "hazard_area_planned_scales", shp_files, merged_layer
+                )
 
-                layers.append(temp_layer)
+            # ゾーンポリゴンを読み込む
+            zones_layer = self.gpkg_manager.load_layer(
+                'zones', None, withload_project=False
+            )
 
-            if not layers:
-                data_name = self.tr("hazard area planned scales")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
-
-                # 一時メモリレイヤを作成
-                temp_layer = QgsVectorLayer(
-                    "Polygon", "hazard_area_planned_scales", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
-
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
-                layers.append(temp_layer)
-
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
-
-            # 無効なジオメトリを修正する
-            merged_layer = self.__fix_invalid_geometries(merged_layer)
-
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
-
-            # ゾーンポリゴンを読み込む
-            zones_layer = self.gpkg_manager.load_layer(
-                'zones', None, withload_project=False
-            )
-
-            # ゾーンポリゴン範囲と交差するエリアのみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            # ゾーンポリゴン範囲と交差するエリアのみを抽出
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # hazard_area_planned_scalesレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -1506,121 +1523,129 @@ class AreaDataGenerator:
             induction_area_folder = os.path.join(
                 self.base_path, "ハザードエリア想定最大規模"
             )
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-            # レイヤを格納するリスト
-            layers = []
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "hazard_area_maximum_scales", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
+                for shp_file in shp_files:
+                    if self.check_canceled():
+                        return  # キャンセルチェック
+                    # Shapefileの属性フィールドバリデーション
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
+                    )
+                    required_fields = {
+                        "A31b_201",
+                    }
+
+                    if not required_fields.issubset(layer_fields):
+                        data_name = self.tr("hazard area maximum scale")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
                     )
-                    continue
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
-                required_fields = {
-                    "A31b_201",
-                }
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Polygon?crs={layer.crs().authid()}",
+                        "hazard_area_maximum_scales",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
 
-                if not required_fields.issubset(layer_fields):
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # 属性データのマッピング
+                        attributes = [
+                            feature["A31b_201"],  # rank
+                        ]
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
                     data_name = self.tr("hazard area maximum scale")
                     msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
                     )
                     QgsMessageLog.logMessage(
                         msg,
                         self.tr("Plugin"),
-                        Qgis.Warning,
+                        Qgis.Info,
                     )
-                    continue
-
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Polygon?crs={layer.crs().authid()}",
-                    "hazard_area_maximum_scales",
-                    "memory",
-                )
-                temp_provider = temp_layer.dataProvider()
-
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
 
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    if self.check_canceled():
-                        return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
-
-                    # 属性データのマッピング
-                    attributes = [
-                        feature["A31b_201"],  # rank
-                    ]
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
-
-                layers.append(temp_layer)
+                    # 一時メモリレイヤを作成
+                    temp_layer = QgsVectorLayer(
+                        "Polygon", "hazard_area_maximum_scales", "memory"
+                    )
+                    temp_provider = temp_layer.dataProvider()
 
-            if not layers:
-                data_name = self.tr("hazard area maximum scale")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+                    layers.append(temp_layer)
 
-                # 一時メモリレイヤを作成
-                temp_layer = QgsVectorLayer(
-                    "Polygon", "hazard_area_maximum_scales", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("rank", QVariant.String),
-                    ]
+                # 無効なジオメトリを修正する
+                merged_layer = self.__fix_invalid_geometries(merged_layer)
+                merged_layer = self.staging_manager.save_layer(
+                    "hazard_area_maximum_scales", shp_files, merged_layer
                 )
-                temp_layer.updateFields()
-                layers.append(temp_layer)
-
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
-
-            # 無効なジオメトリを修正する
-            merged_layer = self.__fix_invalid_geometries(merged_layer)
-
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
 
             # ゾーンポリゴンを読み込む
             zones_layer = self.gpkg_manager.load_layer(
@@ -1628,15 +1653,9 @@ class AreaDataGenerator:
             )
 
             # ゾーンポリゴン範囲と交差するエリアのみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # hazard_area_maximum_scalesレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -1672,135 +1691,143 @@ class AreaDataGenerator:
             induction_area_folder = os.path.join(
                 self.base_path, "ハザードエリア高潮浸水想定区域"
             )
-            shp_files = self.__get_shapefiles(induction_area_folder)
-
-            # レイヤを格納するリスト
-            layers = []
-
-            required_fields = {
-                "A49_001",
-                "A49_002",
-                "A49_003",
-            }
-
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "hazard_area_storm_surges", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-                # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
                 required_fields = {
                     "A49_001",
                     "A49_002",
                     "A49_003",
                 }
 
-                if not required_fields.issubset(layer_fields):
+                for shp_file in shp_files:
+                    if self.check_canceled():
+                        return  # キャンセルチェック
+                    # Shapefileの属性フィールドバリデーション
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
+                    )
+                    required_fields = {
+                        "A49_001",
+                        "A49_002",
+                        "A49_003",
+                    }
+
+                    if not required_fields.issubset(layer_fields):
+                        data_name = self.tr("hazard area storm surge")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
+
+                    encoding = self.source_catalog.get_encoding(shp_file)
+
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
+                    )
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
+
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Polygon?crs={layer.crs().authid()}",
+                        "hazard_area_storm_surges",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("prefecture_name", QVariant.String),
+                            QgsField("prefecture_code", QVariant.String),
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # 属性データのマッピング
+                        attributes = [
+                            feature["A49_001"],  # prefecture_name
+                            feature["A49_002"],  # prefecture_code
+                            feature["A49_003"],  # rank
+                        ]
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
                     data_name = self.tr("hazard area storm surge")
                     msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
                     )
                     QgsMessageLog.logMessage(
                         msg,
                         self.tr("Plugin"),
-                        Qgis.Warning,
+                        Qgis.Info,
                     )
-                    continue
-
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Polygon?crs={layer.crs().authid()}",
-                    "hazard_area_storm_surges",
-                    "memory",
-                )
-                temp_provider = temp_layer.dataProvider()
-
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("prefecture_name", QVariant.String),
-                        QgsField("prefecture_code", QVariant.String),
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
-
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    if self.check_canceled():
-                        return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
-
-                    # 属性データのマッピング
-                    attributes = [
-                        feature["A49_001"],  # prefecture_name
-                        feature["A49_002"],  # prefecture_code
-                        feature["A49_003"],  # rank
-                    ]
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
-
-                layers.append(temp_layer)
 
-            if not layers:
-                data_name = self.tr("hazard area storm surge")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
+                    # 一時メモリレイヤを作成
+                    temp_layer = QgsVectorLayer(
+                        "Polygon", "hazard_area_storm_surges", "memory"
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("prefecture_name", QVariant.String),
+                            QgsField("prefecture_code", QVariant.String),
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+                    layers.append(temp_layer)
 
-                # 一時メモリレイヤを作成
-                temp_layer = QgsVectorLayer(
-                    "Polygon", "hazard_area_storm_surges", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("prefecture_name", QVariant.String),
-                        QgsField("prefecture_code", QVariant.String),
-                        QgsField("rank", QVariant.String),
-                    ]
+                # 無効なジオメトリを修正する
+                merged_layer = self.__fix_invalid_geometries(merged_layer)
+                merged_layer = self.staging_manager.save_layer(
+                    "hazard_area_storm_surges", shp_files, merged_layer
                 )
-                temp_layer.updateFields()
-                layers.append(temp_layer)
-
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
-
-            # 無効なジオメトリを修正する
-            merged_layer = self.__fix_invalid_geometries(merged_layer)
-
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
 
             # ゾーンポリゴンを読み込む
             zones_layer = self.gpkg_manager.load_layer(
@@ -1808,15 +1835,9 @@ class AreaDataGenerator:
             )
 
             # ゾーンポリゴン範囲と交差するエリアのみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # hazard_area_storm_surgesレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -1850,129 +1871,137 @@ class AreaDataGenerator:
             induction_area_folder = os.path.join(
                 self.base_path, "ハザードエリア津波浸水想定区域"
             )
-            shp_files = self.__get_shapefiles(induction_area_folder)
-
-            # レイヤを格納するリスト
-            layers = []
-
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
-                # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
-                required_fields = {
-                    "A40_001",
-                    "A40_002",
-                    "A40_003",
-                }
-
-                if not required_fields.issubset(layer_fields):
-                    data_name = self.tr("hazard area tsunami")
-                    msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
-                    )
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Polygon?crs={layer.crs().authid()}",
-                    "hazard_area_tsunamis",
-                    "memory",
-                )
-                temp_provider = temp_layer.dataProvider()
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("prefecture_name", QVariant.String),
-                        QgsField("prefecture_code", QVariant.String),
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "hazard_area_tsunamis", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-                # フィーチャの追加
-                for feature in layer.getFeatures():
+                for shp_file in shp_files:
                     if self.check_canceled():
                         return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
-
-                    # 属性データのマッピング
-                    attributes = [
-                        feature["A40_001"],  # prefecture_name
-                        feature["A40_002"],  # prefecture_code
-                        feature["A40_003"],  # rank
-                    ]
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
-
-                layers.append(temp_layer)
+                    # Shapefileの属性フィールドバリデーション
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
+                    )
+                    required_fields = {
+                        "A40_001",
+                        "A40_002",
+                        "A40_003",
+                    }
+
+                    if not required_fields.issubset(layer_fields):
+                        data_name = self.tr("hazard area tsunami")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-            if not layers:
-                data_name = self.tr("hazard area tsunami")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
-                # 一時メモリレイヤを作成
-                temp_layer = QgsVectorLayer(
-                    "Polygon", "hazard_area_tsunamis", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
+                    )
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("prefecture_name", QVariant.String),
-                        QgsField("prefecture_code", QVariant.String),
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
-                layers.append(temp_layer)
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Polygon?crs={layer.crs().authid()}",
+                        "hazard_area_tsunamis",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("prefecture_name", QVariant.String),
+                            QgsField("prefecture_code", QVariant.String),
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # 属性データのマッピング
+                        attributes = [
+                            feature["A40_001"],  # prefecture_name
+                            feature["A40_002"],  # prefecture_code
+                            feature["A40_003"],  # rank
+                        ]
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
+                    data_name = self.tr("hazard area tsunami")
+                    msg = (
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
+                    )
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Info,
+                    )
 
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
+                    # 一時メモリレイヤを作成
+                    temp_layer = QgsVectorLayer(
+                        "Polygon", "hazard_area_tsunamis", "memory"
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("prefecture_name", QVariant.String),
+                            QgsField("prefecture_code", QVariant.String),
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+                    layers.append(temp_layer)
 
-            # 無効なジオメトリを修正する
-            merged_layer = self.__fix_invalid_geometries(merged_layer)
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
 
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
+                # 無効なジオメトリを修正する
+                merged_layer = self.__fix_invalid_geometries(merged_layer)
+                merged_layer = self.staging_manager.save_layer(
+                    "hazard_area_tsunamis", shp_files, merged_layer
+                )
 
             # ゾーンポリゴンを読み込む
             zones_layer = self.gpkg_manager.load_layer(
@@ -1980,15 +2009,9 @@ class AreaDataGenerator:
             )
 
             # ゾーンポリゴン範囲と交差するエリアのみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # hazard_area_tsunamisレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -2022,147 +2045,155 @@ class AreaDataGenerator:
             induction_area_folder = os.path.join(
                 self.base_path, "ハザードエリア土砂災害"
             )
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-            # レイヤを格納するリスト
-            layers = []
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "hazard_area_landslides", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
+                for shp_file in shp_files:
+                    if self.check_canceled():
+                        return  # キャンセルチェック
+                    # Shapefileの属性フィールドバリデーション
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
+                    )
+                    required_fields = {
+                        "A33_001",
+                        "A33_002",
+                        "A33_004",
+                        "A33_005",
+                        "A33_006",
+                        "A33_007",
+                        "A33_008",
+                    }
+
+                    if not required_fields.issubset(layer_fields):
+                        data_name = self.tr("shelter")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
                     )
-                    continue
-
-                # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
-                required_fields = {
-                    "A33_001",
-                    "A33_002",
-                    "A33_004",
-                    "A33_005",
-                    "A33_006",
-                    "A33_007",
-                    "A33_008",
-                }
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                if not required_fields.issubset(layer_fields):
-                    data_name = self.tr("shelter")
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Polygon?crs={layer.crs().authid()}",
+                        "hazard_area_landslides",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("phenomenon_type", QVariant.String),
+                            QgsField("area_type", QVariant.String),
+                            QgsField("prefecture_code", QVariant.String),
+                            QgsField("area_number", QVariant.String),
+                            QgsField("area_name", QVariant.String),
+                            QgsField("address", QVariant.String),
+                            QgsField("public_date", QVariant.String),
+                            QgsField("designated_flag", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # 属性データのマッピング
+                        attributes = [
+                            feature["A33_001"],  # phenomenon_type
+                            feature["A33_002"],  # area_type
+                            feature["A33_004"],  # area_number
+                            feature["A33_005"],  # area_name
+                            feature["A33_006"],  # address
+                            feature["A33_007"],  # public_date
+                            feature["A33_008"],  # designated_flag
+                        ]
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
+                    data_name = self.tr("hazard area landslide")
                     msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
                     )
                     QgsMessageLog.logMessage(
                         msg,
                         self.tr("Plugin"),
-                        Qgis.Warning,
+                        Qgis.Info,
                     )
-                    continue
-
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Polygon?crs={layer.crs().authid()}",
-                    "hazard_area_landslides",
-                    "memory",
-                )
-                temp_provider = temp_layer.dataProvider()
-
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("phenomenon_type", QVariant.String),
-                        QgsField("area_type", QVariant.String),
-                        QgsField("prefecture_code", QVariant.String),
-                        QgsField("area_number", QVariant.String),
-                        QgsField("area_name", QVariant.String),
-                        QgsField("address", QVariant.String),
-                        QgsField("public_date", QVariant.String),
-                        QgsField("designated_flag", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
-
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    if self.check_canceled():
-                        return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
-
-                    # 属性データのマッピング
-                    attributes = [
-                        feature["A33_001"],  # phenomenon_type
-                        feature["A33_002"],  # area_type
-                        feature["A33_004"],  # area_number
-                        feature["A33_005"],  # area_name
-                        feature["A33_006"],  # address
-                        feature["A33_007"],  # public_date
-                        feature["A33_008"],  # designated_flag
-                    ]
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
-
-                layers.append(temp_layer)
 
-            if not layers:
-                data_name = self.tr("hazard area landslide")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
+                    # 一時メモリレイヤを作成
+                    temp_layer = QgsVectorLayer(
+                        "Polygon", "hazard_area_landslides", "memory"
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("phenomenon_type", QVariant.String),
+                            QgsField("area_type", QVariant.String),
+                            QgsField("prefecture_code", QVariant.String),
+                            QgsField("area_number", QVariant.String),
+                            QgsField("area_name", QVariant.String),
+                            QgsField("address", QVariant.String),
+                            QgsField("public_date", QVariant.String),
+                            QgsField("designated_flag", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+                    layers.append(temp_layer)
 
-                # 一時メモリレイヤを作成
-                temp_layer = QgsVectorLayer(
-                    "Polygon", "hazard_area_landslides", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("phenomenon_type", QVariant.String),
-                        QgsField("area_type", QVariant.String),
-                        QgsField("prefecture_code", QVariant.String),
-                        QgsField("area_number", QVariant.String),
-                        QgsField("area_name", QVariant.String),
-                        QgsField("address", QVariant.String),
-                        QgsField("public_date", QVariant.String),
-                        QgsField("designated_flag", QVariant.String),
-                    ]
+                # 無効なジオメトリを修正する
+                merged_layer = self.__fix_invalid_geometries(merged_layer)
+                merged_layer = self.staging_manager.save_layer(
+                    "hazard_area_landslides", shp_files, merged_layer
                 )
-                temp_layer.updateFields()
-                layers.append(temp_layer)
-
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
-
-            # 無効なジオメトリを修正する
-            merged_layer = self.__fix_invalid_geometries(merged_layer)
-
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
 
             # ゾーンポリゴンを読み込む
             zones_layer = self.gpkg_manager.load_layer(
@@ -2170,15 +2201,9 @@ class AreaDataGenerator:
             )
 
             # ゾーンポリゴン範囲と交差するエリアのみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # hazard_area_landslidesレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -2212,121 +2237,129 @@ class AreaDataGenerator:
             induction_area_folder = os.path.join(
                 self.base_path, "ハザードエリア氾濫流"
             )
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-            # レイヤを格納するリスト
-            layers = []
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "hazard_area_floodplains", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
+                for shp_file in shp_files:
+                    if self.check_canceled():
+                        return  # キャンセルチェック
+                    # Shapefileの属性フィールドバリデーション
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
+                    )
+                    required_fields = {
+                        "A31b_401",
+                    }
+
+                    if not required_fields.issubset(layer_fields):
+                        data_name = self.tr("hazard area floodplain")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
                     )
-                    continue
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
-                required_fields = {
-                    "A31b_401",
-                }
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Polygon?crs={layer.crs().authid()}",
+                        "hazard_area_floodplains",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
 
-                if not required_fields.issubset(layer_fields):
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # 属性データのマッピング
+                        attributes = [
+                            feature["A31b_401"],  # rank
+                        ]
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
                     data_name = self.tr("hazard area floodplain")
                     msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
                     )
                     QgsMessageLog.logMessage(
                         msg,
                         self.tr("Plugin"),
-                        Qgis.Warning,
+                        Qgis.Info,
                     )
-                    continue
-
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Polygon?crs={layer.crs().authid()}",
-                    "hazard_area_floodplains",
-                    "memory",
-                )
-                temp_provider = temp_layer.dataProvider()
-
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("rank", QVariant.String),
-                    ]
-                )
-                temp_layer.updateFields()
-
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    if self.check_canceled():
-                        return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
-
-                    # 属性データのマッピング
-                    attributes = [
-                        feature["A31b_401"],  # rank
-                    ]
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
 
-                layers.append(temp_layer)
+                    # 一時メモリレイヤを作成
+                    temp_layer = QgsVectorLayer(
+                        "Polygon", "hazard_area_floodplains", "memory"
+                    )
+                    temp_provider = temp_layer.dataProvider()
 
-            if not layers:
-                data_name = self.tr("hazard area floodplain")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField("rank", QVariant.String),
+                        ]
+                    )
+                    temp_layer.updateFields()
+                    layers.append(temp_layer)
 
-                # 一時メモリレイヤを作成
-                temp_layer = QgsVectorLayer(
-                    "Polygon", "hazard_area_floodplains", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
 
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("rank", QVariant.String),
-                    ]
+                # 無効なジオメトリを修正する
+                merged_layer = self.__fix_invalid_geometries(merged_layer)
+                merged_layer = self.staging_manager.save_layer(
+                    "hazard_area_floodplains", shp_files, merged_layer
                 )
-                temp_layer.updateFields()
-                layers.append(temp_layer)
-
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
-
-            # 無効なジオメトリを修正する
-            merged_layer = self.__fix_invalid_geometries(merged_layer)
-
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
 
             # ゾーンポリゴンを読み込む
             zones_layer = self.gpkg_manager.load_layer(
@@ -2334,15 +2367,9 @@ class AreaDataGenerator:
             )
 
             # ゾーンポリゴン範囲と交差するエリアのみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # hazard_area_floodplainsレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -2380,77 +2407,11 @@ class AreaDataGenerator:
                 'CRS': layers[0].crs().authid(),
                 'OUTPUT': 'memory:merged_layer',
             },
+            feedback=ProgressManager.get_feedback(),
         )
 
         return result['OUTPUT']
 
-    def __get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        msg = self.tr("Directory: %1").replace("%1", directory)
-        QgsMessageLog.logMessage(
-            msg,
-            self.tr("Plugin"),
-            Qgis.Info,
-        )
-
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
-    def __detect_encoding(self, file_path):
-        """Shapefile に対応する DBF ファイルのエンコーディングを検出"""
-        dbf_file = file_path.replace(
-            '.shp', '.dbf'
-        )  # shpに対応する .dbf ファイルのパス
-        if os.path.exists(dbf_file):
-            with open(dbf_file, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                if encoding == 'MacRoman':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "MacRoman").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                if encoding == 'Windows-1254':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "Windows-1254").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                msg = self.tr("Encoding: %1").replace("%1", encoding)
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
-                return encoding if encoding else 'SHIFT_JIS'
-        else:
-            msg = self.tr(
-                "No corresponding DBF file was found for the specified path: "
-                "%1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Warning,
-            )
-            return 'UTF-8'
-
     def __fix_invalid_geometries(self, layer):
         """Fix invalid geometries in the layer"""
         msg_start = self.tr(
@@ -2464,6 +2425,7 @@ class AreaDataGenerator:
         result = processing.run(
             "native:fixgeometries",
             {'INPUT': layer, 'OUTPUT': 'memory:fixed_layer'},
+            feedback=ProgressManager.get_feedback(),
         )
         msg_complete = self.tr(
             "Completed fixing invalid geometries in layer: %1."
@@ -10,7 +10,6 @@ import re
 
 import processing
 from qgis.core import (
-    QgsCoordinateTransform,
     QgsProject,
     QgsFeatureRequest,
     QgsField,
@@ -22,12 +21,17 @@ from qgis.core import (
 from PyQt5.QtCore import QCoreApplication, QVariant
 
 from .gpkg_manager import GpkgManager
+from .reprojection_manager import ReprojectionManager
+from .progress_manager import ProgressManager
 
 
 class BuildingDataAssigner:
     """建築物LOD1へのデータ付与機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
-        self.gpkg_manager = GpkgManager._instance
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.reprojection_manager = ReprojectionManager._instance
         self.base_path = base_path
         self.check_canceled = check_canceled_callback
 
@@ -69,15 +73,6 @@ class BuildingDataAssigner:
                 None,
             )
 
-            # CRSの違いを考慮
-            transform = None
-            if buildings_layer.crs() != meshes_layer.crs():
-                transform = QgsCoordinateTransform(
-                    meshes_layer.crs(),
-                    buildings_layer.crs(),
-                    QgsProject.instance(),
-                )
-
             # population_fieldsを正規表現でフィルタリング
             attribute_names = [field.name() for field in meshes_layer.fields()]
             regex_pattern = (
@@ -100,6 +95,8 @@ class BuildingDataAssigner:
                         [QgsField(field, QVariant.Double)]
                     )
             buildings_layer.updateFields()
+            # 読み込み済みのレイヤはフィールドの追加を反映しないため破棄
+            self.gpkg_manager.invalidate_layer('buildings')
 
             # 空間インデックスを作成
             spatial_index = QgsSpatialIndex(buildings_layer.getFeatures())
@@ -107,14 +104,18 @@ class BuildingDataAssigner:
             processed_count = 0  # 按分処理済建物数
             attribute_updates = {}
 
+            # CRSの違いを考慮（メッシュを建物のCRSへ一括変換）
+            mesh_features = list(meshes_layer.getFeatures())
+            mesh_geoms = self.reprojection_manager.transform_geometries(
+                [mesh_feature.geometry() for mesh_feature in mesh_features],
+                meshes_layer.crs(),
+                buildings_layer.crs(),
+            )
+
             # メッシュごとに処理
-            for mesh_feature in meshes_layer.getFeatures():
+            for mesh_feature, mesh_geom in zip(mesh_features, mesh_geoms):
                 if self.check_canceled():
                     return  # キャンセルチェック
-                mesh_geom = mesh_feature.geometry()
-
-                if transform:
-                    mesh_geom.transform(transform)
 
                 # メッシュ内の建物を検索
                 building_ids = spatial_index.intersects(
@@ -211,6 +212,7 @@ class BuildingDataAssigner:
                 attribute_updates
             )
             buildings_layer.commitChanges()
+            self.gpkg_manager.invalidate_layer('buildings')
 
             msg = self.tr("Completed attaching population to buildings.")
             QgsMessageLog.logMessage(
@@ -279,6 +281,8 @@ class BuildingDataAssigner:
                         [QgsField(field_name, QVariant.Int)]
                     )
             buildings_layer.updateFields()
+            # 読み込み済みのレイヤはフィールドの追加を反映しないため破棄
+            self.gpkg_manager.invalidate_layer('buildings')
 
             # 各年度ごとの処理
             for year in unique_years:
@@ -318,6 +322,7 @@ class BuildingDataAssigner:
                         'EXPRESSION': expression,
                         'OUTPUT': 'TEMPORARY_OUTPUT',
                     },
+                    feedback=ProgressManager.get_feedback(),
                 )['OUTPUT']
 
                 # 建物レイヤに空き家フラグを空間結合で追加
@@ -334,6 +339,7 @@ class BuildingDataAssigner:
                         'PREFIX': 'vacancy_',
                         'OUTPUT': 'memory:',
                     },
+                    feedback=ProgressManager.get_feedback(),
                 )['OUTPUT']
 
                 # 空き家フラグフィールドの更新
@@ -354,6 +360,7 @@ class BuildingDataAssigner:
 
             # コミット
             buildings_layer.commitChanges()
+            self.gpkg_manager.invalidate_layer('buildings')
             msg = self.tr("Completed setting vacant house flags.")
             QgsMessageLog.logMessage(
                 msg,
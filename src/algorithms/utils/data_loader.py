@@ -18,13 +18,14 @@ from qgis.core import (
 from PyQt5.QtCore import QCoreApplication, QVariant
 import processing
 from .gpkg_manager import GpkgManager
+from .progress_manager import ProgressManager
 
 
 class DataLoader:
     """データ読み込み機能"""
-    def __init__(self, check_canceled_callback=None):
+    def __init__(self, check_canceled_callback=None, gpkg_manager=None):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
 
         self.check_canceled = check_canceled_callback
 
@@ -140,6 +141,7 @@ class DataLoader:
                 'PREFIX': '',
                 'OUTPUT': 'memory:',
             },
+            feedback=ProgressManager.get_feedback(),
         )
         return result['OUTPUT']
 
@@ -191,6 +193,7 @@ class DataLoader:
                 'PREFIX': '',
                 'OUTPUT': 'memory:',
             },
+            feedback=ProgressManager.get_feedback(),
         )
         joined_layer = result['OUTPUT']
 
@@ -279,6 +282,7 @@ class DataLoader:
         result = processing.run(
             "native:fixgeometries",
             {'INPUT': layer, 'OUTPUT': 'memory:fixed_layer'},
+            feedback=ProgressManager.get_feedback(),
         )
         msg_complete = self.tr(
             "Completed fixing invalid geometries in layer: %1."
@@ -15,6 +15,37 @@ from PyQt5.QtCore import QCoreApplication
 
 class DirMaker:
     """フォルダ生成機能"""
+    # 作成するフォルダのリスト
+    DIRECTORIES = [
+        "ゾーンポリゴン",
+        "250mメッシュ",
+        "250mメッシュ人口/2010年",
+        "250mメッシュ人口/2015年",
+        "250mメッシュ人口/2020年",
+        "鉄道駅位置",
+        "鉄道ネットワーク",
+        "道路ネットワーク",
+        "施設/行政施設ポイント",
+        "施設/医療施設ポイント",
+        "施設/福祉施設ポイント",
+        "施設/学校ポイント",
+        "施設/文化施設ポイント",
+        "避難所",
+        "バスネットワーク",
+        "500mメッシュ別将来人口",
+        "ハザードエリア計画規模",
+        "ハザードエリア想定最大規模",
+        "ハザードエリア高潮浸水想定区域",
+        "ハザードエリア津波浸水想定区域",
+        "ハザードエリア土砂災害",
+        "ハザードエリア氾濫流",
+        "誘導区域",
+        "交通流動",
+        "地価公示",
+        "土地利用状況判別",
+        "空き家ポイント",
+    ]
+
     def __init__(self, base_path):
         self.base_path = base_path
 
@@ -25,38 +56,7 @@ class DirMaker:
     def create_structure(self):
         """フォルダ生成処理"""
         try:
-            # 作成するフォルダのリスト
-            directories = [
-                "ゾーンポリゴン",
-                "250mメッシュ",
-                "250mメッシュ人口/2010年",
-                "250mメッシュ人口/2015年",
-                "250mメッシュ人口/2020年",
-                "鉄道駅位置",
-                "鉄道ネットワーク",
-                "道路ネットワーク",
-                "施設/行政施設ポイント",
-                "施設/医療施設ポイント",
-                "施設/福祉施設ポイント",
-                "施設/学校ポイント",
-                "施設/文化施設ポイント",
-                "避難所",
-                "バスネットワーク",
-                "500mメッシュ別将来人口",
-                "ハザードエリア計画規模",
-                "ハザードエリア想定最大規模",
-                "ハザードエリア高潮浸水想定区域",
-                "ハザードエリア津波浸水想定区域",
-                "ハザードエリア土砂災害",
-                "ハザードエリア氾濫流",
-                "誘導区域",
-                "交通流動",
-                "地価公示",
-                "土地利用状況判別",
-                "空き家ポイント",
-            ]
-
-            for directory in directories:
+            for directory in self.DIRECTORIES:
                 dir_path = os.path.join(self.base_path, directory)
                 os.makedirs(dir_path, exist_ok=True)
 
@@ -7,27 +7,32 @@
 """
 
 import re
-import csv
 from qgis.core import (
     QgsMessageLog,
     Qgis,
-    QgsAggregateCalculator,
     QgsVectorLayer,
     QgsFeature,
 )
 from PyQt5.QtCore import QCoreApplication
 import processing
 from .gpkg_manager import GpkgManager
+from .metric_result_store import MetricResultStore, round_or_na
+from .scratch_manager import ScratchManager
+from .layer_aggregator import LayerAggregator
+from .progress_manager import ProgressManager
 
 
 class DisasterPreventionMetricCalculator:
     """防災関連評価指標算出機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         self.base_path = base_path
 
         self.check_canceled = check_canceled_callback
 
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.scratch_manager = ScratchManager._instance
 
     def tr(self, message):
         """翻訳用のメソッド"""
@@ -130,11 +135,13 @@ class DisasterPreventionMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': centroid_layer}
+                "native:createspatialindex",
+                {'INPUT': centroid_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            centroid_layer = self.gpkg_manager.add_layer(
-                centroid_layer, "tmp_building_centroids", None, False
+            centroid_layer = self.scratch_manager.add_layer(
+                centroid_layer, "tmp_building_centroids"
             )
             if not centroid_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -152,6 +159,7 @@ class DisasterPreventionMetricCalculator:
                     'CRS': centroid_layer.crs(),
                     'OUTPUT': 'memory:merged_hazard_area',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             if self.check_canceled():
@@ -186,21 +194,27 @@ class DisasterPreventionMetricCalculator:
 
             # 空間インデックス作成（浸水以外）
             processing.run(
-                "native:createspatialindex", {'INPUT': hazard_area_other_layer}
+                "native:createspatialindex",
+                {'INPUT': hazard_area_other_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 空間インデックス作成（避難所）
             processing.run(
-                "native:createspatialindex", {'INPUT': shelter_buffers_layer}
+                "native:createspatialindex",
+                {'INPUT': shelter_buffers_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 空間インデックス作成（L1）
             processing.run(
-                "native:createspatialindex", {'INPUT': hazard_area_l1_layer}
+                "native:createspatialindex",
+                {'INPUT': hazard_area_l1_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            hazard_area_l1_layer = self.gpkg_manager.add_layer(
-                hazard_area_l1_layer, "tmp_hazard_area_l1_layer", None, False
+            hazard_area_l1_layer = self.scratch_manager.add_layer(
+                hazard_area_l1_layer, "tmp_hazard_area_l1_layer"
             )
             if not hazard_area_l1_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -220,10 +234,11 @@ class DisasterPreventionMetricCalculator:
                     'DISCARD_NONMATCHING': True,
                     'PREFIX': 'hazard_area_l1_',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
-            l1_buildings = self.gpkg_manager.add_layer(
-                result['OUTPUT'], "tmp_l1_buildings", None, False
+            l1_buildings = self.scratch_manager.add_layer(
+                result['OUTPUT'], "tmp_l1_buildings"
             )
             if not l1_buildings:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -232,11 +247,13 @@ class DisasterPreventionMetricCalculator:
                 return  # キャンセルチェック
             # 空間インデックス作成（L2）
             processing.run(
-                "native:createspatialindex", {'INPUT': hazard_area_l2_layer}
+                "native:createspatialindex",
+                {'INPUT': hazard_area_l2_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            hazard_area_l2_layer = self.gpkg_manager.add_layer(
-                hazard_area_l2_layer, "tmp_hazard_area_l2_layer", None, False
+            hazard_area_l2_layer = self.scratch_manager.add_layer(
+                hazard_area_l2_layer, "tmp_hazard_area_l2_layer"
             )
             if not hazard_area_l2_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -256,10 +273,11 @@ class DisasterPreventionMetricCalculator:
                     'DISCARD_NONMATCHING': True,
                     'PREFIX': 'hazard_area_l2_',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
-            l2_buildings = self.gpkg_manager.add_layer(
-                result['OUTPUT'], "tmp_l2_buildings", None, False
+            l2_buildings = self.scratch_manager.add_layer(
+                result['OUTPUT'], "tmp_l2_buildings"
             )
             if not l2_buildings:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -274,10 +292,11 @@ class DisasterPreventionMetricCalculator:
                     'FIELD': [],  # 全てのフィーチャをマージ
                     'OUTPUT': 'TEMPORARY_OUTPUT',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
-            hazard_area_other_layer = self.gpkg_manager.add_layer(
-                result['OUTPUT'], "tmp_hazard_area_other_layer", None, False
+            hazard_area_other_layer = self.scratch_manager.add_layer(
+                result['OUTPUT'], "tmp_hazard_area_other_layer"
             )
             if not hazard_area_other_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -297,10 +316,11 @@ class DisasterPreventionMetricCalculator:
                     'DISCARD_NONMATCHING': True,
                     'PREFIX': 'other_hazard_',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
-            other_buildings = self.gpkg_manager.add_layer(
-                result['OUTPUT'], "tmp_other_buildings", None, False
+            other_buildings = self.scratch_manager.add_layer(
+                result['OUTPUT'], "tmp_other_buildings"
             )
             if not other_buildings:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -316,18 +336,22 @@ class DisasterPreventionMetricCalculator:
                     'METHOD': 0,  # Discard matching buildings
                     'PREDICATE': [2],  # disjoint
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 選択されたフィーチャを一時レイヤとして保存
             result = processing.run(
                 "native:saveselectedfeatures",
                 {'INPUT': centroid_layer, 'OUTPUT': 'TEMPORARY_OUTPUT'},
+                feedback=ProgressManager.get_feedback(),
             )
             safe_buildings = result['OUTPUT']
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': safe_buildings}
+                "native:createspatialindex",
+                {'INPUT': safe_buildings},
+                feedback=ProgressManager.get_feedback(),
             )
 
             if self.check_canceled():
@@ -341,10 +365,13 @@ class DisasterPreventionMetricCalculator:
                     'METHOD': 0,  # Discard matching buildings
                     'PREDICATE': [2],  # disjoint
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             processing.run(
-                "native:createspatialindex", {'INPUT': safe_buildings}
+                "native:createspatialindex",
+                {'INPUT': safe_buildings},
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 再度選択されたフィーチャを保存
@@ -353,11 +380,14 @@ class DisasterPreventionMetricCalculator:
             result = processing.run(
                 "native:saveselectedfeatures",
                 {'INPUT': safe_buildings, 'OUTPUT': 'TEMPORARY_OUTPUT'},
+                feedback=ProgressManager.get_feedback(),
             )
             safe_buildings = result['OUTPUT']
 
             processing.run(
-                "native:createspatialindex", {'INPUT': safe_buildings}
+                "native:createspatialindex",
+                {'INPUT': safe_buildings},
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 浸水以外のハザード区域外の建物を選択
@@ -371,16 +401,18 @@ class DisasterPreventionMetricCalculator:
                     'METHOD': 0,  # Discard matching buildings
                     'PREDICATE': [2],  # disjoint
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 最終的に選択されたフィーチャを保存
             result = processing.run(
                 "native:saveselectedfeatures",
                 {'INPUT': safe_buildings, 'OUTPUT': 'TEMPORARY_OUTPUT'},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            safe_buildings = self.gpkg_manager.add_layer(
-                result['OUTPUT'], "tmp_safe_buildings", None, False
+            safe_buildings = self.scratch_manager.add_layer(
+                result['OUTPUT'], "tmp_safe_buildings"
             )
             if not safe_buildings:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -400,122 +432,95 @@ class DisasterPreventionMetricCalculator:
                     'PREFIX': 'shelter_buffers_',
                     'OUTPUT': 'TEMPORARY_OUTPUT',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             if self.check_canceled():
                 return  # キャンセルチェック
             # GeoPackage に保存
-            evacuation_possible_buildings = self.gpkg_manager.add_layer(
-                result['OUTPUT'],
-                "tmp_evacuation_possible_buildings",
-                None,
-                False,
+            evacuation_possible_buildings = self.scratch_manager.add_layer(
+                result['OUTPUT'], "tmp_evacuation_possible_buildings"
             )
             if not evacuation_possible_buildings:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
 
+            # 全年度の人口を各レイヤ1回の走査でまとめて集計
+            pop_requests = [
+                (f"{year}_population", None) for year in unique_years
+            ]
+            pop_sums = {}
+            for key, layer in (
+                ('total', buildings_layer),
+                ('other', other_buildings),
+                ('l1', l1_buildings),
+                ('l2', l2_buildings),
+                ('safe', safe_buildings),
+                ('evacuation', evacuation_possible_buildings),
+            ):
+                if self.check_canceled():
+                    return  # キャンセルチェック
+                pop_sums[key] = LayerAggregator(layer).sums(pop_requests)
+
             for year in unique_years:
                 if self.check_canceled():
                     return  # キャンセルチェック
                 year_field = f"{year}_population"
 
                 # 総人口を集計
-                total_pop_result = buildings_layer.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                total_pop = (
-                    int(total_pop_result[0])
-                    if total_pop_result[0] is not None
-                    else 0
-                )
+                total_pop = int(pop_sums['total'][(year_field, None)])
 
                 # 浸水以外人口
-                sum_result = other_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                hazard01_area_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
-                )
+                hazard01_area_pop = int(pop_sums['other'][(year_field, None)])
 
                 # L1浸水区域内人口
-                sum_result = l1_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                hazard02_area_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
-                )
+                hazard02_area_pop = int(pop_sums['l1'][(year_field, None)])
 
                 # L2浸水区域内人口
-                sum_result = l2_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                hazard03_area_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
-                )
+                hazard03_area_pop = int(pop_sums['l2'][(year_field, None)])
 
                 # 安全区域人口
-                sum_result = safe_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                hazard04_area_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
-                )
+                hazard04_area_pop = int(pop_sums['safe'][(year_field, None)])
 
                 # 浸水以外のハザード区域内人口割合
                 rate_hazard01_area_pop = (
-                    self.round_or_na((hazard01_area_pop / total_pop) * 100, 2)
+                    round_or_na((hazard01_area_pop / total_pop) * 100, 2)
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
 
                 # L1浸水区域内人口割合
                 rate_hazard02_area_pop = (
-                    self.round_or_na((hazard02_area_pop / total_pop) * 100, 2)
+                    round_or_na((hazard02_area_pop / total_pop) * 100, 2)
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
 
                 # L2浸水区域内人口割合
                 rate_hazard03_area_pop = (
-                    self.round_or_na((hazard03_area_pop / total_pop) * 100, 2)
+                    round_or_na((hazard03_area_pop / total_pop) * 100, 2)
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
 
                 # 安全区域内人口割合
                 rate_hazard04_area_pop = (
-                    self.round_or_na((hazard04_area_pop / total_pop) * 100, 2)
+                    round_or_na((hazard04_area_pop / total_pop) * 100, 2)
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
 
                 # 避難施設カバー圏人口
-                sum_result = evacuation_possible_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                evacuation_facility_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
+                evacuation_facility_pop = int(
+                    pop_sums['evacuation'][(year_field, None)]
                 )
 
                 # 避難施設カバー率
                 rate_evacuation_facility_pop = (
-                    self.round_or_na(
+                    round_or_na(
                         (evacuation_facility_pop / total_pop) * 100, 2
                     )
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
 
                 # 前年度のデータがあれば、変化率を計算
@@ -523,7 +528,7 @@ class DisasterPreventionMetricCalculator:
                     previous_year_data = data_list[-1]
 
                     rate_hazard01_area_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (
                                     rate_hazard01_area_pop
@@ -537,11 +542,11 @@ class DisasterPreventionMetricCalculator:
                             2,
                         )
                         if previous_year_data['Rate_hazard01_Area_Pop'] > 0
-                        else '―'
+                        else None
                     )
 
                     rate_hazard02_area_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (
                                     rate_hazard02_area_pop
@@ -555,11 +560,11 @@ class DisasterPreventionMetricCalculator:
                             2,
                         )
                         if previous_year_data['Rate_hazard02_Area_Pop'] > 0
-                        else '―'
+                        else None
                     )
 
                     rate_hazard03_area_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (
                                     rate_hazard03_area_pop
@@ -573,11 +578,11 @@ class DisasterPreventionMetricCalculator:
                             2,
                         )
                         if previous_year_data['Rate_hazard03_Area_Pop'] > 0
-                        else '―'
+                        else None
                     )
 
                     rate_hazard04_area_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (
                                     rate_hazard04_area_pop
@@ -591,11 +596,11 @@ class DisasterPreventionMetricCalculator:
                             2,
                         )
                         if previous_year_data['Rate_hazard04_Area_Pop'] > 0
-                        else '―'
+                        else None
                     )
 
                     rate_evacuation_facility_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (
                                     rate_evacuation_facility_pop
@@ -612,15 +617,15 @@ class DisasterPreventionMetricCalculator:
                         )
                         if previous_year_data['Rate_Evacuation_Facility_Pop']
                         > 0
-                        else '―'
+                        else None
                     )
 
                 else:
-                    rate_hazard01_area_pop_change = '―'
-                    rate_hazard02_area_pop_change = '―'
-                    rate_hazard03_area_pop_change = '―'
-                    rate_hazard04_area_pop_change = '―'
-                    rate_evacuation_facility_pop_change = '―'
+                    rate_hazard01_area_pop_change = None
+                    rate_hazard02_area_pop_change = None
+                    rate_hazard03_area_pop_change = None
+                    rate_hazard04_area_pop_change = None
+                    rate_evacuation_facility_pop_change = None
 
                 # データを辞書にまとめる
                 year_data = {
@@ -661,10 +666,9 @@ class DisasterPreventionMetricCalculator:
                 # 辞書をリストに追加
                 data_list.append(year_data)
 
-            # ファイルパスを指定してエクスポート
-            self.export(
-                self.base_path + '\\IF103_防災関連評価指標ファイル.csv',
-                data_list,
+            # 算出結果を保存し、評価指標ファイルを出力
+            MetricResultStore(self.gpkg_manager).save(
+                'IF103', data_list, self.base_path
             )
 
             return
@@ -677,50 +681,3 @@ class DisasterPreventionMetricCalculator:
                 Qgis.Critical,
             )
             raise e
-
-    def export(self, file_path, data):
-        """エクスポート処理"""
-        try:
-            if not data:
-                raise Exception(self.tr("The data to export is empty."))
-
-            # データ項目からヘッダーを取得
-            headers = list(data[0].keys())
-
-            # CSVファイル書き込み
-            with open(
-                file_path, mode='w', newline='', encoding='utf-8'
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
-
-            msg = self.tr(
-                "File export completed: %1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
-            )
-            return True
-        except Exception as e:
-            # エラーメッセージのログ出力
-            msg = self.tr(
-                "An error occurred during file export: %1."
-            ).replace("%1", e)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Critical,
-            )
-            raise e
-
-    def round_or_na(self, value, decimal_places, threshold=None):
-        """丸め処理"""
-        if value is None or (threshold is not None and value <= threshold):
-            return '―'
-        else:
-            return round(value, decimal_places)
@@ -8,7 +8,7 @@
 
 import os
 import re
-import chardet
+
 from qgis.core import (
     QgsMessageLog,
     Qgis,
@@ -16,9 +16,11 @@ from qgis.core import (
     QgsField,
     QgsFeature,
     QgsFeatureRequest,
+    QgsVectorDataProvider,
 )
 from PyQt5.QtCore import QCoreApplication, QVariant
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
 
 class FacilityDataGenerator:
     """施設関連データ作成機能"""
@@ -43,9 +45,13 @@ class FacilityDataGenerator:
         7: {"name_field": "P27_005", "address_field": "P27_006"},
     }
 
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
         # インプットデータパス
         self.base_path = base_path
 
@@ -63,7 +69,7 @@ class FacilityDataGenerator:
                 facility_folder = os.path.join(
                     self.base_path, "施設", facility_type
                 )
-                shp_files = self.__get_shapefiles(facility_folder)
+                shp_files = self.source_catalog.get_shapefiles(facility_folder)
 
                 if not shp_files:
                     msg = self.tr(
@@ -82,7 +88,7 @@ class FacilityDataGenerator:
 
                 for shp_file in shp_files:
                     year = self.__extract_year_from_path(shp_file)
-                    encoding = self.__detect_encoding(shp_file)
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
                     # Shapefile 読み込み時にエンコーディングを指定
                     layer = QgsVectorLayer(
@@ -109,9 +115,10 @@ class FacilityDataGenerator:
             # レイヤを結合し、施設データを作成
             facility_layer = self.__create_facilities_layer(layers)
 
-            if not self.gpkg_manager.add_layer(
+            facility_layer = self.gpkg_manager.add_layer(
                 facility_layer, "facilities", "都市施設"
-            ):
+            )
+            if not facility_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
 
             data_name = self.tr("facility")
@@ -134,22 +141,6 @@ class FacilityDataGenerator:
             )
             return False
 
-    def __get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        msg = self.tr("Directory: %1").replace("%1", directory)
-        QgsMessageLog.logMessage(
-            msg,
-            self.tr("Plugin"),
-            Qgis.Info,
-        )
-
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
     def __extract_year_from_path(self, file_path):
         """ファイルパスから年度を抽出"""
         try:
@@ -204,79 +195,105 @@ class FacilityDataGenerator:
         for layer, year, file_type in layers:
             if self.check_canceled():
                 return  # キャンセルチェック
+
+            # フィールドのマッピングを使用して name と address のインデックスを取得
+            layer_fields = layer.fields()
+            welfare_index = -1
+            if file_type == 4:
+                # 福祉施設ポイントは大分類によって、子育て施設と福祉施設を判別
+                name_index = layer_fields.indexOf("P14_008")
+                address_index = layer_fields.indexOf("P14_004")
+                welfare_index = layer_fields.indexOf("P14_005")
+            elif file_type in self.FIELD_MAPPINGS:
+                mapping = self.FIELD_MAPPINGS[file_type]
+                name_index = layer_fields.indexOf(mapping["name_field"])
+                address_index = layer_fields.indexOf(mapping["address_field"])
+            else:
+                msg = self.tr(
+                    "Skipped layer %1. Unknown type: %2."
+                ).replace("%1", layer.name()).replace("%2", str(file_type))
+
+                QgsMessageLog.logMessage(
+                    msg,
+                    self.tr("Plugin"),
+                    Qgis.Info,
+                )
+                continue
+
+            new_features = []
             for feature in layer.getFeatures():
-                new_feature = QgsFeature()
+                new_feature = QgsFeature(facility_layer.fields())
                 new_feature.setGeometry(feature.geometry())
-                new_feature.setFields(facility_layer.fields())
 
-                # フィールドのマッピングを使用して name と address を取得
+                name = (
+                    feature.attribute(name_index)
+                    if name_index != -1
+                    else None
+                )
+                address = (
+                    feature.attribute(address_index)
+                    if address_index != -1
+                    else None
+                )
                 if file_type == 4:
-                    # 福祉施設ポイントは大分類によって、子育て施設と福祉施設を判別
-                    name = (
-                        feature["P14_008"]
-                        if "P14_008" in feature.fields().names()
-                        else None
-                    )
-                    address = (
-                        feature["P14_004"]
-                        if "P14_004" in feature.fields().names()
-                        else None
-                    )
-                    type_code = self.__get_welfare_type(feature["P14_005"])
-                elif file_type in self.FIELD_MAPPINGS:
-                    mapping = self.FIELD_MAPPINGS[file_type]
-                    name = (
-                        feature[mapping["name_field"]]
-                        if mapping["name_field"] in feature.fields().names()
+                    type_code = self.__get_welfare_type(
+                        feature.attribute(welfare_index)
+                        if welfare_index != -1
                         else None
                     )
-                    address = (
-                        feature[mapping["address_field"]]
-                        if mapping["address_field"] in feature.fields().names()
-                        else None
-                    )
-                    type_code = file_type
                 else:
-                    msg = self.tr(
-                        "Skipped feature %1. Unknown type: %2."
-                    ).replace("%1", str(feature.id())).replace("%2", file_type)
-
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    continue
+                    type_code = file_type
 
                 # フィーチャの属性を設定
-                new_feature.setAttribute("year", year)
-                new_feature.setAttribute("name", name)
-                new_feature.setAttribute("type", type_code)
-                new_feature.setAttribute("address", address)
-                provider.addFeature(new_feature)
+                new_feature.setAttributes([year, name, type_code, address])
+                new_features.append(new_feature)
+
+            # フィーチャを一括で追加
+            provider.addFeatures(new_features)
 
         # 商業施設の情報をfacilitiesレイヤに追加
         buildings_layer = self.gpkg_manager.load_layer(
             'buildings', None, withload_project=False
         )  # buildingsレイヤ
+        buildings_provider = buildings_layer.dataProvider()
+        usage_index = buildings_layer.fields().indexOf("usage")
+        address_index = buildings_layer.fields().indexOf("address")
+
+        # 使用用途の属性インデックスを作成
+        if (
+            usage_index != -1
+            and buildings_provider.capabilities()
+            & QgsVectorDataProvider.CreateAttributeIndex
+        ):
+            buildings_provider.createAttributeIndex(usage_index)
+
         request = QgsFeatureRequest().setFilterExpression(
             '"usage" = \'商業施設\''
         )  # 使用用途が商業施設のものを抽出
+        if address_index != -1:
+            request.setSubsetOfAttributes([usage_index, address_index])
+
+        commercial_features = []
         for feature in buildings_layer.getFeatures(request):
             if self.check_canceled():
                 return  # キャンセルチェック
-            new_feature = QgsFeature()
+            new_feature = QgsFeature(facility_layer.fields())
             # ポリゴンの中心をポイントとして取得
-            centroid = feature.geometry().centroid()
-            new_feature.setGeometry(centroid)
-            new_feature.setFields(facility_layer.fields())
+            new_feature.setGeometry(feature.geometry().centroid())
 
             # 属性設定
-            new_feature.setAttribute("name", None)
-            new_feature.setAttribute("address", feature["address"])
-            new_feature.setAttribute("year", None)
-            new_feature.setAttribute("type", 2)
-            provider.addFeature(new_feature)
+            new_feature.setAttributes([
+                None,  # year
+                None,  # name
+                2,  # type
+                feature.attribute(address_index)
+                if address_index != -1
+                else None,  # address
+            ])
+            commercial_features.append(new_feature)
+
+        # フィーチャを一括で追加
+        provider.addFeatures(commercial_features)
 
         # 編集内容をコミットして保存
         facility_layer.commitChanges()
@@ -289,47 +306,3 @@ class FacilityDataGenerator:
         if data in ('05', '06'):
             return 4  # 子育て施設
         return 5  # 福祉施設（'01', '02', '03', '04', '99'..etc)
-
-    def __detect_encoding(self, file_path):
-        """Shapefile に対応する DBF ファイルのエンコーディングを検出"""
-        dbf_file = file_path.replace(
-            '.shp', '.dbf'
-        )  # shpに対応する .dbf ファイルのパス
-        if os.path.exists(dbf_file):
-            with open(dbf_file, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                if encoding == 'MacRoman':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "MacRoman").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                if encoding == 'Windows-1254':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "Windows-1254").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-                return encoding if encoding else 'UTF-8'
-        else:
-            msg = self.tr(
-                "No corresponding DBF file was found for the specified path: "
-                "%1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Warning,
-            )
-            return 'UTF-8'
@@ -9,7 +9,6 @@
 import os
 import re
 import processing
-import chardet
 from qgis.core import (
     QgsMessageLog,
     Qgis,
@@ -20,13 +19,22 @@ from qgis.core import (
 )
 from PyQt5.QtCore import QCoreApplication, QVariant
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
+from .staging_manager import StagingManager
+from .progress_manager import ProgressManager
 
 
 class FinancialDataGenerator:
     """財政関連データ作成機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
+        # 広域データ共有
+        self.staging_manager = StagingManager._instance
         # インプットデータパス
         self.base_path = base_path
 
@@ -41,144 +49,165 @@ class FinancialDataGenerator:
         try:
             # base_path 配下の「地価公示」フォルダを再帰的に探索してShapefileを収集
             induction_area_folder = os.path.join(self.base_path, "地価公示")
-            shp_files = self.__get_shapefiles(induction_area_folder)
-
-            # レイヤを格納するリスト
-            layers = []
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
-            for shp_file in shp_files:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "land_prices", shp_files
+            )
+            if merged_layer is None:
+                # レイヤを格納するリスト
+                layers = []
 
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
+                for shp_file in shp_files:
+                    if self.check_canceled():
+                        return  # キャンセルチェック
+                    encoding = self.source_catalog.get_encoding(shp_file)
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                    # Shapefile 読み込み
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
                     )
-                    continue
-
-                # 年度を判定（L01_007またはL01_006から取得）
-                year_field = None
-
-                # 年度フィールドを特定する
-                if "L01_007" in layer.fields().names() and re.match(
-                    r'^\d{4}$', str(layer.getFeature(0)["L01_007"])
-                ):  # 2024年以降
-                    year_field = "L01_007"
-                elif "L01_005" in layer.fields().names() and re.match(
-                    r'^\d{4}$', str(layer.getFeature(0)["L01_005"])
-                ):  # 2023年以前
-                    year_field = "L01_005"
-                else:
-                    msg = self.tr(
-                        "The year field was not found in %1."
-                    ).replace("%1", shp_file)
+                    layer.setProviderEncoding(encoding)
+
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
+
+                    # 年度を判定（L01_007またはL01_006から取得）
+                    year_field = None
+
+                    # 年度フィールドを特定する
+                    if "L01_007" in layer.fields().names() and re.match(
+                        r'^\d{4}$', str(layer.getFeature(0)["L01_007"])
+                    ):  # 2024年以降
+                        year_field = "L01_007"
+                    elif "L01_005" in layer.fields().names() and re.match(
+                        r'^\d{4}$', str(layer.getFeature(0)["L01_005"])
+                    ):  # 2023年以前
+                        year_field = "L01_005"
+                    else:
+                        msg = self.tr(
+                            "The year field was not found in %1."
+                        ).replace("%1", shp_file)
+
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
+                    # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
+                    temp_layer = QgsVectorLayer(
+                        f"Point?crs={layer.crs().authid()}",
+                        "land_prices",
+                        "memory",
+                    )
+                    temp_provider = temp_layer.dataProvider()
+
+                    # 必要なフィールドを追加
+                    temp_provider.addAttributes(
+                        [
+                            QgsField(
+                                "administrative_area_code", QVariant.String
+                            ),
+                            QgsField("usage_classification", QVariant.String),
+                            QgsField("serial_number", QVariant.String),
+                            QgsField(
+                                "previous_year_administrative_area_code",
+                                QVariant.String,
+                            ),
+                            QgsField(
+                                "previous_year_usage_category", QVariant.String
+                            ),
+                            QgsField(
+                                "previous_year_serial_number", QVariant.String
+                            ),
+                            QgsField("year", QVariant.String),
+                            QgsField("public_land_price", QVariant.Int),
+                            QgsField("year_change_rate", QVariant.Double),
+                        ]
+                    )
+                    temp_layer.updateFields()
+
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        if self.check_canceled():
+                            return  # キャンセルチェック
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        if year_field == "L01_007":  # 2024年以降のデータ
+                            attributes = [
+                                feature["L01_001"],  # administrative_area_code
+                                feature["L01_002"],  # usage_classification
+                                feature["L01_003"],  # serial_number
+                                feature[
+                                    "L01_004"
+                                ],  # previous_year_administrative_area_code
+                                # previous_year_usage_category
+                                feature["L01_005"],
+                                # previous_year_serial_number
+                                feature["L01_006"],
+                                feature["L01_007"],  # year
+                                feature["L01_008"],  # public_land_price
+                                feature["L01_009"],  # year_change_rate
+                            ]
+                        else:  # 2023年以前のデータ（yearとpublic_land_priceのみ）
+                            attributes = [
+                                None,  # administrative_area_code
+                                None,  # usage_classification
+                                None,  # serial_number
+                                None,  # previous_year_administrative_area_code
+                                None,  # previous_year_usage_category
+                                None,  # previous_year_serial_number
+                                feature["L01_005"],  # year
+                                feature["L01_006"],  # public_land_price
+                                None,  # year_change_rate
+                            ]
+
+                        new_feature.setAttributes(attributes)
+                        temp_provider.addFeature(new_feature)
+
+                    layers.append(temp_layer)
+
+                if not layers:
+                    data_name = self.tr("land price")
+                    msg = (
+                        self.tr("No valid %1 Shapefile was found.")
+                        .replace("%1", data_name)
+                    )
                     QgsMessageLog.logMessage(
                         msg,
                         self.tr("Plugin"),
-                        Qgis.Warning,
+                        Qgis.Info,
                     )
-                    continue
+                    return False
 
-                # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
-                temp_layer = QgsVectorLayer(
-                    f"Point?crs={layer.crs().authid()}", "land_prices", "memory"
-                )
-                temp_provider = temp_layer.dataProvider()
-
-                # 必要なフィールドを追加
-                temp_provider.addAttributes(
-                    [
-                        QgsField("administrative_area_code", QVariant.String),
-                        QgsField("usage_classification", QVariant.String),
-                        QgsField("serial_number", QVariant.String),
-                        QgsField(
-                            "previous_year_administrative_area_code",
-                            QVariant.String,
-                        ),
-                        QgsField(
-                            "previous_year_usage_category", QVariant.String
-                        ),
-                        QgsField(
-                            "previous_year_serial_number", QVariant.String
-                        ),
-                        QgsField("year", QVariant.String),
-                        QgsField("public_land_price", QVariant.Int),
-                        QgsField("year_change_rate", QVariant.Double),
-                    ]
+                # 複数のレイヤをマージ
+                merged_layer = self.__merge_layers(layers)
+                merged_layer = self.staging_manager.save_layer(
+                    "land_prices", shp_files, merged_layer
                 )
-                temp_layer.updateFields()
-
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    if self.check_canceled():
-                        return  # キャンセルチェック
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
-
-                    if year_field == "L01_007":  # 2024年以降のデータ
-                        attributes = [
-                            feature["L01_001"],  # administrative_area_code
-                            feature["L01_002"],  # usage_classification
-                            feature["L01_003"],  # serial_number
-                            feature[
-                                "L01_004"
-                            ],  # previous_year_administrative_area_code
-                            feature["L01_005"],  # previous_year_usage_category
-                            feature["L01_006"],  # previous_year_serial_number
-                            feature["L01_007"],  # year
-                            feature["L01_008"],  # public_land_price
-                            feature["L01_009"],  # year_change_rate
-                        ]
-                    else:  # 2023年以前のデータ（yearとpublic_land_priceのみ）
-                        attributes = [
-                            None,  # administrative_area_code
-                            None,  # usage_classification
-                            None,  # serial_number
-                            None,  # previous_year_administrative_area_code
-                            None,  # previous_year_usage_category
-                            None,  # previous_year_serial_number
-                            feature["L01_005"],  # year
-                            feature["L01_006"],  # public_land_price
-                            None,  # year_change_rate
-                        ]
-
-                    new_feature.setAttributes(attributes)
-                    temp_provider.addFeature(new_feature)
 
-                layers.append(temp_layer)
-
-            if not layers:
-                data_name = self.tr("land price")
-                msg = (
-                    self.tr("No valid %1 Shapefile was found.")
-                    .replace("%1", data_name)
-                )
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
+            # 空間インデックス作成（共有レイヤは作成済みのため、他プロセスが
+            # 読み込み中のGeoPackageを更新しないよう作成しない）
+            if not self.staging_manager.is_enabled():
+                processing.run(
+                    "native:createspatialindex",
+                    {'INPUT': merged_layer},
+                    feedback=ProgressManager.get_feedback(),
                 )
-                return False
-
-            # 複数のレイヤをマージ
-            merged_layer = self.__merge_layers(layers)
-
-            # 空間インデックス作成
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
 
             # メッシュレイヤ取得
             meshes_layer = self.gpkg_manager.load_layer(
@@ -364,73 +393,7 @@ class FinancialDataGenerator:
                 'CRS': layers[0].crs().authid(),
                 'OUTPUT': 'memory:merged_layer',
             },
+            feedback=ProgressManager.get_feedback(),
         )
 
         return result['OUTPUT']
-
-    def __get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        msg = self.tr("Directory: %1").replace("%1", directory)
-        QgsMessageLog.logMessage(
-            msg,
-            self.tr("Plugin"),
-            Qgis.Info,
-        )
-
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
-    def __detect_encoding(self, file_path):
-        """Shapefile に対応する DBF ファイルのエンコーディングを検出"""
-        dbf_file = file_path.replace(
-            '.shp', '.dbf'
-        )  # shpに対応する .dbf ファイルのパス
-        if os.path.exists(dbf_file):
-            with open(dbf_file, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                if encoding == 'MacRoman':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "MacRoman").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                if encoding == 'Windows-1254':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "Windows-1254").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                msg = self.tr("Detected encoding: %1").replace("%1", encoding)
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
-                return encoding if encoding else 'SHIFT_JIS'
-        else:
-            msg = self.tr(
-                "No corresponding DBF file was found for the specified path: "
-                "%1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Warning,
-            )
-            return 'UTF-8'
@@ -6,21 +6,24 @@
  ***************************************************************************/
 """
 
-import csv
-import processing
 from qgis.core import QgsMessageLog, Qgis, QgsVectorLayer
 from PyQt5.QtCore import QCoreApplication
 from .gpkg_manager import GpkgManager
+from .metric_result_store import MetricResultStore, round_or_na
+from .spatial_index_registry import SpatialIndexRegistry
 
 
 class FiscalMetricCalculator:
     """財政関連評価指標算出機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         self.base_path = base_path
 
         self.check_canceled = check_canceled_callback
 
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.spatial_index_registry = SpatialIndexRegistry._instance
 
     def tr(self, message):
         """翻訳用のメソッド"""
@@ -70,80 +73,55 @@ class FiscalMetricCalculator:
             residential_area_data.addFeatures(residential_area_features)
             residential_area_layer.updateExtents()
 
-            # 空間インデックス作成
-            processing.run(
-                "native:createspatialindex", {'INPUT': land_prices_layer}
+            # ゾーンポリゴン内地価公示の地物IDを取得
+            target_fids = self.spatial_index_registry.select_fids(
+                land_prices_layer,
+                zones_layer,
+                SpatialIndexRegistry.PREDICATE_WITHIN,
             )
-            processing.run("native:createspatialindex", {'INPUT': zones_layer})
 
-            # ゾーンポリゴン内地価公示を取得
-            result = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': land_prices_layer,
-                    'PREDICATE': [6],  # within
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
+            # 居住誘導区域内地価公示の地物IDを取得
+            residential_fids = self.spatial_index_registry.select_fids(
+                land_prices_layer,
+                residential_area_layer,
+                SpatialIndexRegistry.PREDICATE_WITHIN,
             )
 
-            target_land_prices = result['OUTPUT']
-
-            # 居住誘導区域内地価公示を取得
-            residential_land_prices = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': land_prices_layer,
-                    'PREDICATE': [6],  # within
-                    'INTERSECT': residential_area_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
-
-            # 居住誘導区域外地価公示を取得
-            non_residential_land_prices = processing.run(
-                "native:difference",
-                {
-                    'INPUT': target_land_prices,
-                    'OVERLAY': residential_area_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            # 居住誘導区域外地価公示（居住誘導区域と交差しないもの）の地物IDを取得
+            non_residential_fids = (
+                target_fids
+                - self.spatial_index_registry.select_fids(
+                    land_prices_layer,
+                    residential_area_layer,
+                    SpatialIndexRegistry.PREDICATE_INTERSECTS,
+                )
+            )
 
-            # 年度ごとに集計
+            # 年度ごとにSQLで集計
             year_field = 'year'
             sum_field = 'public_land_price'
-            result_aggregate = processing.run(
-                "qgis:statisticsbycategories",
-                {
-                    'INPUT': target_land_prices,
-                    'VALUES_FIELD_NAME': sum_field,
-                    'CATEGORIES_FIELD_NAME': year_field,
-                    'OUTPUT': 'memory:aggregated_land_prices',
-                },
+            total_rows = self.gpkg_manager.aggregate(
+                'land_prices',
+                [f'SUM("{sum_field}")'],
+                group_by=year_field,
+                fids=target_fids,
+            )
+            residential_means = dict(
+                self.gpkg_manager.aggregate(
+                    'land_prices',
+                    [f'AVG("{sum_field}")'],
+                    group_by=year_field,
+                    fids=residential_fids,
+                )
+            )
+            non_residential_means = dict(
+                self.gpkg_manager.aggregate(
+                    'land_prices',
+                    [f'AVG("{sum_field}")'],
+                    group_by=year_field,
+                    fids=non_residential_fids,
+                )
             )
-
-            residential_aggregate = processing.run(
-                "qgis:statisticsbycategories",
-                {
-                    'INPUT': residential_land_prices,
-                    'VALUES_FIELD_NAME': sum_field,
-                    'CATEGORIES_FIELD_NAME': year_field,
-                    'OUTPUT': 'memory:aggregated_residential_land_prices',
-                },
-            )['OUTPUT']
-
-            non_residential_aggregate = processing.run(
-                "qgis:statisticsbycategories",
-                {
-                    'INPUT': non_residential_land_prices,
-                    'VALUES_FIELD_NAME': sum_field,
-                    'CATEGORIES_FIELD_NAME': year_field,
-                    'OUTPUT': 'memory:aggregated_non_residential_land_prices',
-                },
-            )['OUTPUT']
-
-            aggregated_layer = result_aggregate['OUTPUT']
 
             # 結果をデータリストに追加
             data_list = []
@@ -153,9 +131,7 @@ class FiscalMetricCalculator:
                 "non_residential": None,
             }
 
-            for feature in aggregated_layer.getFeatures():
-                year = feature[year_field]
-                total_land_price = feature['sum']
+            for year, total_land_price in total_rows:
 
                 # 前年度からの変化率を計算
                 rate_land_price = None
@@ -170,16 +146,8 @@ class FiscalMetricCalculator:
                 previous_year_totals["total"] = total_land_price
 
                 # 居住誘導区域内のデータ
-                residential_feature = next(
-                    (
-                        f
-                        for f in residential_aggregate.getFeatures()
-                        if f[year_field] == year
-                    ),
-                    None,
-                )
-                if residential_feature:
-                    residential_avg_price = residential_feature['mean']
+                if year in residential_means:
+                    residential_avg_price = residential_means[year]
                     prev_residential_price = previous_year_totals["residential"]
                     if prev_residential_price is not None:
                         residential_rate_change = (
@@ -194,16 +162,8 @@ class FiscalMetricCalculator:
                     residential_rate_change = None
 
                 # 居住誘導区域外のデータ
-                non_residential_feature = next(
-                    (
-                        f
-                        for f in non_residential_aggregate.getFeatures()
-                        if f[year_field] == year
-                    ),
-                    None,
-                )
-                if non_residential_feature:
-                    non_residential_avg_price = non_residential_feature['mean']
+                if year in non_residential_means:
+                    non_residential_avg_price = non_residential_means[year]
                     prev_non_residential_price = previous_year_totals[
                         "non_residential"
                     ]
@@ -228,29 +188,28 @@ class FiscalMetricCalculator:
                 data = {
                     'Year': year,
                     'Total_Land_Price': int(
-                        self.round_or_na(total_land_price, 1)
+                        round_or_na(total_land_price, 1)
                     ),
-                    'Rate_Land_Price': self.round_or_na(rate_land_price, 1),
-                    'Average_Residental_Area_Land_Price': self.round_or_na(
+                    'Rate_Land_Price': round_or_na(rate_land_price, 1),
+                    'Average_Residental_Area_Land_Price': round_or_na(
                         residential_avg_price, 1
                     ),
-                    'Average_Residental_Area_Outside_Land_Price': self.round_or_na(
+                    'Average_Residental_Area_Outside_Land_Price': round_or_na(
                         non_residential_avg_price, 1
                     ),
-                    'Rate_Change_Residental_Area_Land_Price': self.round_or_na(
+                    'Rate_Change_Residental_Area_Land_Price': round_or_na(
                         residential_rate_change, 1
                     ),
-                    'Rate_Change_Residental_Area_Outside_Land_Price': self.round_or_na(
+                    'Rate_Change_Residental_Area_Outside_Land_Price': round_or_na(
                         non_residential_rate_change, 1
                     ),
                 }
 
                 data_list.append(data)
 
-            # ファイルパスを指定してエクスポート
-            self.export(
-                self.base_path + '\\IF106_財政関連評価指標ファイル.csv',
-                data_list,
+            # 算出結果を保存し、評価指標ファイルを出力
+            MetricResultStore(self.gpkg_manager).save(
+                'IF106', data_list, self.base_path
             )
 
             return
@@ -263,50 +222,3 @@ class FiscalMetricCalculator:
                 Qgis.Critical,
             )
             raise e
-
-    def export(self, file_path, data):
-        """エクスポート処理"""
-        try:
-            if not data:
-                raise Exception(self.tr("The data to export is empty."))
-
-            # データ項目からヘッダーを取得
-            headers = list(data[0].keys())
-
-            # CSVファイル書き込み
-            with open(
-                file_path, mode='w', newline='', encoding='utf-8'
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
-
-            msg = self.tr(
-                "File export completed: %1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
-            )
-            return True
-        except Exception as e:
-            # エラーメッセージのログ出力
-            msg = self.tr(
-                "An error occurred during file export: %1."
-            ).replace("%1", e)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Critical,
-            )
-            raise e
-
-    def round_or_na(self, value, decimal_places, threshold=None):
-        """丸め処理"""
-        if value is None or (threshold is not None and value <= threshold):
-            return '―'
-        else:
-            return round(value, decimal_places)
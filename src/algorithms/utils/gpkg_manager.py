@@ -7,6 +7,9 @@
 """
 
 import os
+import sqlite3
+import threading
+from pathlib import Path
 from qgis.core import (
     QgsVectorLayer,
     QgsVectorFileWriter,
@@ -19,19 +22,45 @@ from osgeo import ogr
 
 
 class GpkgManager:
-    """Geopackageファイル管理"""
+    """
+    Geopackageファイル管理
+    共有インスタンス（GpkgManager._instance）のほか、shared=False で
+    GeoPackageごとの独立したセッションを作成できる。
+    書き込みは同じGeoPackageを操作する全セッションで直列化し、
+    読み込みはスレッドごとの接続・レイヤで行う。
+    """
     _instance = None
 
+    # GeoPackageごとの書き込みロック
+    _write_locks = {}
+    _write_locks_guard = threading.Lock()
+
+    # レイヤごとの属性インデックス（絞り込み・結合に使用するフィールド）
+    ATTRIBUTE_INDEXES = {
+        'buildings': ['usage', 'id'],
+        'meshes': ['key_code'],
+        'zones': ['key_code'],
+        'induction_areas': ['type_id'],
+        'vacancies': ['year'],
+        'land_prices': ['year'],
+        'facilities': ['type', 'year'],
+    }
+
     def __new__(
         cls,
         base_path=None,
         gpkg_name="PlateauStatisticsVisualizationPlugin.gpkg",
+        shared=True,
     ):
+        # 独立したセッション（共有インスタンスを変更しない）
+        if not shared:
+            session = super(GpkgManager, cls).__new__(cls)
+            session.__setup(base_path, gpkg_name)
+            return session
+
         if cls._instance is None:
             cls._instance = super(GpkgManager, cls).__new__(cls)
-            cls._instance.base_path = base_path
-            cls._instance.gpkg_name = gpkg_name
-            cls._instance.geopackage_path = os.path.join(base_path, gpkg_name)
+            cls._instance.__setup(base_path, gpkg_name)
         return cls._instance
 
     def tr(self, message):
@@ -43,9 +72,8 @@ class GpkgManager:
     ):
         """初期化"""
         # 最初期化
-        self.base_path = base_path
-        self.gpkg_name = gpkg_name
-        self.geopackage_path = os.path.join(base_path, gpkg_name)
+        self.close()
+        self.__setup(base_path, gpkg_name)
         QgsMessageLog.logMessage(
             self.tr(
                 "GeoPackage Manager has been reset. New path: %1."
@@ -58,32 +86,34 @@ class GpkgManager:
         """GeoPackage作成"""
         try:
             # 既存のGeoPackageから読み込んだレイヤをレイヤパネルから削除
-            for layer in QgsProject.instance().mapLayers().values():
-                if os.path.normpath(layer.source()).startswith(
-                    os.path.normpath(self.geopackage_path)
-                ):
-                    QgsProject.instance().removeMapLayer(layer)
-
-            # GeoPackageが存在しない場合、新規作成する
-            if not os.path.exists(self.geopackage_path):
-                # 空のレイヤーを作成してGeoPackageを初期化
-                temp_layer = QgsVectorLayer("None", "temp", "memory")
-                options = QgsVectorFileWriter.SaveVectorOptions()
-                options.driverName = "GPKG"
-
-                # GeoPackageの初期化のために一時レイヤーを書き込む
-                error = QgsVectorFileWriter.writeAsVectorFormatV3(
-                    temp_layer,
-                    self.geopackage_path,
-                    QgsProject.instance().transformContext(),
-                    options,
-                )
-
-                if error[0] != QgsVectorFileWriter.NoError:
-                    error_message = self.tr(
-                        "Failed to create GeoPackage: %1"
-                    ).replace("%1", str(error))
-                    raise Exception(error_message)
+            for layer in self.__get_project_layers():
+                QgsProject.instance().removeMapLayer(layer)
+
+            with self.get_write_lock():
+                # GeoPackageが存在しない場合、新規作成する
+                if not os.path.exists(self.geopackage_path):
+                    # 空のレイヤーを作成してGeoPackageを初期化
+                    temp_layer = QgsVectorLayer("None", "temp", "memory")
+                    options = QgsVectorFileWriter.SaveVectorOptions()
+                    options.driverName = "GPKG"
+
+                    # GeoPackageの初期化のために一時レイヤーを書き込む
+                    error = QgsVectorFileWriter.writeAsVectorFormatV3(
+                        temp_layer,
+                        self.geopackage_path,
+                        QgsProject.instance().transformContext(),
+                        options,
+                    )
+
+                    if error[0] != QgsVectorFileWriter.NoError:
+                        error_message = self.tr(
+                            "Failed to create GeoPackage: %1"
+                        ).replace("%1", str(error))
+                        raise Exception(error_message)
+
+            # レイヤ一覧は次回参照時に取得し直す
+            with self.metadata_lock:
+                self.layer_names = None
 
             # 成功のログ出力
             QgsMessageLog.logMessage(
@@ -106,6 +136,24 @@ class GpkgManager:
     def load_layer(self, layer_name, alias=None, withload_project=True):
         """GeoPackageからレイヤを読み込む"""
         try:
+            # 存在しないレイヤはレイヤ一覧で判定し、レイヤを作成しない
+            if layer_name not in self.get_layers():
+                return None
+
+            # プロジェクトに追加しない場合は読み込み済みのレイヤを再利用
+            # （レイヤはスレッド間で共有しないため、スレッドごとに保持）
+            layers = self.__get_thread_layers()
+            version = self.layer_versions.get(layer_name, 0)
+            if not withload_project:
+                cached = layers.get(layer_name)
+                if (
+                    cached is not None
+                    and cached[0] == version
+                    and cached[1].isValid()
+                    and not self.__is_schema_changed(layer_name, cached[1])
+                ):
+                    return cached[1]
+
             # GeoPackageからレイヤを読み込み
             uri = f"{self.geopackage_path}|layername={layer_name}"
             display_name = (
@@ -134,6 +182,7 @@ class GpkgManager:
                     Qgis.Info,
                 )
             else:
+                layers[layer_name] = (version, gpkg_layer)
                 QgsMessageLog.logMessage(
                     self.tr("GeoPackage layer %1 loaded.")
                     .replace("%1", layer_name),
@@ -152,8 +201,19 @@ class GpkgManager:
             )
             return None
 
-    def add_layer(self, layer, layer_name, alias=None, withload_project=True):
-        """geopackageにレイヤを追加保存"""
+    def add_layer(
+        self,
+        layer,
+        layer_name,
+        alias=None,
+        withload_project=True,
+        index_fields=None,
+    ):
+        """
+        geopackageにレイヤを追加保存
+        :param index_fields: 属性インデックスを作成するフィールド名のリスト
+                             （None の場合は ATTRIBUTE_INDEXES の定義を使用）
+        """
         try:
             options = QgsVectorFileWriter.SaveVectorOptions()
             options.actionOnExistingFile = (
@@ -162,20 +222,30 @@ class GpkgManager:
             options.fileEncoding = 'UTF-8'
             options.layerName = layer_name
 
-            error = QgsVectorFileWriter.writeAsVectorFormatV3(
-                layer,
-                self.geopackage_path,
-                QgsProject.instance().transformContext(),
-                options,
-            )
-
-            if error[0] != QgsVectorFileWriter.NoError:
-                raise Exception(
-                    f"レイヤ {layer_name} の GeoPackage "
-                    f"{self.geopackage_path} への保存に失敗しました: "
-                    f"{error[1]}"
+            # 同じGeoPackageへの書き込みは直列化
+            with self.get_write_lock():
+                error = QgsVectorFileWriter.writeAsVectorFormatV3(
+                    layer,
+                    self.geopackage_path,
+                    QgsProject.instance().transformContext(),
+                    options,
                 )
 
+                if error[0] != QgsVectorFileWriter.NoError:
+                    raise Exception(
+                        f"レイヤ {layer_name} の GeoPackage "
+                        f"{self.geopackage_path} への保存に失敗しました: "
+                        f"{error[1]}"
+                    )
+
+                # 読み込み済みのレイヤを破棄し、レイヤ一覧を更新
+                self.__update_layer_names(layer_name, True)
+
+                # 一括書き込み後に属性インデックスを作成
+                if index_fields is None:
+                    index_fields = self.ATTRIBUTE_INDEXES.get(layer_name, [])
+                self.create_attribute_indexes(layer_name, index_fields)
+
             QgsMessageLog.logMessage(
                 self.tr("Layer %1 added to GeoPackage %2.")
                 .replace("%1", layer_name).replace("%2", self.geopackage_path),
@@ -194,24 +264,44 @@ class GpkgManager:
             )
             return False
 
+    def invalidate_layer(self, layer_name):
+        """
+        読み込み済みのレイヤを破棄する
+        GpkgManager を経由せずにレイヤを更新した場合（プロジェクトのレイヤの
+        データプロバイダでフィールドを追加した場合など）に呼び出す
+        :param layer_name: レイヤ名
+        """
+        self.__update_layer_names(layer_name, True)
+
+    def get_layer_version(self, layer_name):
+        """
+        レイヤの更新回数（追加・削除・破棄のたびに増加）
+        :param layer_name: レイヤ名
+        :return: 更新回数（未更新の場合は 0）
+        """
+        with self.metadata_lock:
+            return self.layer_versions.get(layer_name, 0)
+
     def delete_layer(self, layer_name):
         """指定したレイヤをGeoPackageから削除"""
         try:
-            gpkg = ogr.Open(self.geopackage_path, update=1)
+            if layer_name not in self.get_layers():
+                return
 
-            if gpkg is None:
-                raise Exception(
-                    f"GeoPackageの読み込みに失敗しました: {self.geopackage_path}"
-                )
+            with self.get_write_lock():
+                gpkg = self.get_connection()
 
-            if self.load_layer(layer_name, False) is None:
-                return
+                # 接続後に追加されたレイヤは接続し直して参照
+                if gpkg.GetLayerByName(layer_name) is None:
+                    self.__close_connection()
+                    gpkg = self.get_connection()
 
-            if gpkg.DeleteLayer(layer_name) != 0:
-                msg = self.tr(
-                    "Failed to delete layer: %1"
-                ).replace("%1", layer_name)
-                raise Exception(msg)
+                if gpkg.DeleteLayer(layer_name) != 0:
+                    msg = self.tr(
+                        "Failed to delete layer: %1"
+                    ).replace("%1", layer_name)
+                    raise Exception(msg)
+                self.__update_layer_names(layer_name, False)
 
             QgsMessageLog.logMessage(
                 self.tr("Layer %1 deleted from GeoPackage %2.")
@@ -220,7 +310,6 @@ class GpkgManager:
                 Qgis.Info,
             )
 
-            gpkg.Close()
             return True
 
         except Exception as e:
@@ -231,29 +320,445 @@ class GpkgManager:
             )
             return False
 
-    def get_layers(self):
-        """GeoPackage内のレイヤ名一覧を取得する"""
-        layer_names = []
+    def create_attribute_indexes(self, layer_name, index_fields):
+        """
+        属性インデックスを作成し、作成状況をログに出力する
+        :param layer_name: レイヤ名
+        :param index_fields: インデックスを作成するフィールド名のリスト
+        """
+        if not index_fields:
+            return
+
+        indexed_fields = []
+        missing_fields = []
+        try:
+            columns = [
+                row[1]
+                for row in self.query(
+                    f"PRAGMA table_info({self.__quote(layer_name)})"
+                )
+            ]
+            for field_name in index_fields:
+                if field_name not in columns:
+                    missing_fields.append(field_name)
+                    continue
+                index_name = f"idx_{layer_name}_{field_name}"
+                with self.get_write_lock():
+                    self.__execute(
+                        "CREATE INDEX IF NOT EXISTS "
+                        f"{self.__quote(index_name)} "
+                        f"ON {self.__quote(layer_name)} "
+                        f"({self.__quote(field_name)})"
+                    )
+                indexed_fields.append(field_name)
+
+        except Exception as e:
+            # インデックスは性能向上のためのものであり、失敗しても保存は継続
+            QgsMessageLog.logMessage(
+                self.tr("Failed to create attribute indexes on %1: %2")
+                .replace("%1", layer_name)
+                .replace("%2", str(e)),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+
+        if indexed_fields:
+            QgsMessageLog.logMessage(
+                self.tr("Attribute indexes created on %1: %2")
+                .replace("%1", layer_name)
+                .replace("%2", ", ".join(indexed_fields)),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+        if missing_fields:
+            QgsMessageLog.logMessage(
+                self.tr("Attribute indexes skipped on %1 (no field): %2")
+                .replace("%1", layer_name)
+                .replace("%2", ", ".join(missing_fields)),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
 
-        # GeoPackageを開く
-        gpkg = ogr.Open(self.geopackage_path)
+    def set_computed_column(self, layer_name, field_name, expression):
+        """
+        SQL式で計算した整数値をフィールドに保存し、属性インデックスを作成する
+        （フィールドがない場合は追加）
+        :param layer_name: レイヤ名
+        :param field_name: 保存先のフィールド名
+        :param expression: 値を計算するSQL式（値は埋め込み済みであること）
+        :return: 保存した場合 True
+        """
+        try:
+            columns = [
+                row[1]
+                for row in self.query(
+                    f"PRAGMA table_info({self.__quote(layer_name)})"
+                )
+            ]
+            with self.get_write_lock():
+                if field_name not in columns:
+                    self.__execute(
+                        f"ALTER TABLE {self.__quote(layer_name)} "
+                        f"ADD COLUMN {self.__quote(field_name)} INTEGER"
+                    )
+                self.__execute(
+                    f"UPDATE {self.__quote(layer_name)} "
+                    f"SET {self.__quote(field_name)} = {expression}"
+                )
+                # 読み込み済みのレイヤを破棄
+                self.__update_layer_names(layer_name, True)
+                self.create_attribute_indexes(layer_name, [field_name])
+
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                self.tr("Failed to compute field %1 on %2: %3")
+                .replace("%1", field_name)
+                .replace("%2", layer_name)
+                .replace("%3", str(e)),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+            return False
+
+        return True
+
+    def write_table(self, table_name, fields, rows):
+        """
+        属性テーブル（ジオメトリなし）を作成し、行を一括で書き込む
+        （同名のテーブルがある場合は置き換え）
+        :param table_name: テーブル名
+        :param fields: (フィールド名, OGRのフィールド型) のリスト
+        :param rows: 値のリスト（fields と同じ順、欠損値は None）のリスト
+        """
+        with self.get_write_lock():
+            gpkg = self.get_connection()
+
+            # 接続後に追加されたテーブルは接続し直して参照
+            if (
+                gpkg.GetLayerByName(table_name) is None
+                and table_name in self.get_layers()
+            ):
+                self.__close_connection()
+                gpkg = self.get_connection()
+
+            if gpkg.GetLayerByName(table_name) is not None:
+                if gpkg.DeleteLayer(table_name) != 0:
+                    raise Exception(
+                        self.tr("Failed to delete layer: %1").replace(
+                            "%1", table_name
+                        )
+                    )
+
+            layer = gpkg.CreateLayer(
+                table_name, geom_type=ogr.wkbNone, options=["FID=fid"]
+            )
+            if layer is None:
+                raise Exception(
+                    self.tr("Failed to create table: %1").replace(
+                        "%1", table_name
+                    )
+                )
+            for field_name, field_type in fields:
+                layer.CreateField(ogr.FieldDefn(field_name, field_type))
+
+            # 1トランザクションで書き込む
+            definition = layer.GetLayerDefn()
+            layer.StartTransaction()
+            try:
+                for values in rows:
+                    feature = ogr.Feature(definition)
+                    for index, value in enumerate(values):
+                        if value is None:
+                            feature.SetFieldNull(index)
+                        else:
+                            feature.SetField(index, value)
+                    layer.CreateFeature(feature)
+                layer.CommitTransaction()
+            except Exception:
+                layer.RollbackTransaction()
+                raise
+
+            # 読み込み済みのレイヤを破棄し、レイヤ一覧を更新
+            self.__update_layer_names(table_name, True)
 
-        if gpkg is None:
+        QgsMessageLog.logMessage(
+            self.tr("Table %1 written to GeoPackage %2 (%3 rows).")
+            .replace("%1", table_name)
+            .replace("%2", self.geopackage_path)
+            .replace("%3", str(len(rows))),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+
+    def vacuum(self):
+        """GeoPackageの未使用領域を解放"""
+        try:
+            with self.get_write_lock():
+                self.__execute("VACUUM")
+
+        except Exception as e:
             QgsMessageLog.logMessage(
-                self.tr(
-                    "Failed to load GeoPackage: %1"
-                ).replace("%1", self.geopackage_path),
+                self.tr("An error occurred: %1").replace("%1", str(e)),
                 self.tr("Plugin"),
                 Qgis.Critical,
             )
-            return []
+            return False
+
+        QgsMessageLog.logMessage(
+            self.tr("GeoPackage %1 vacuumed.").replace(
+                "%1", self.geopackage_path
+            ),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+        return True
+
+    def get_layers(self):
+        """GeoPackage内のレイヤ名一覧を取得する（初回のみ取得し保持）"""
+        with self.metadata_lock:
+            if self.layer_names is None:
+                try:
+                    self.layer_names = [
+                        row[0]
+                        for row in self.query(
+                            "SELECT table_name FROM gpkg_contents"
+                        )
+                    ]
+
+                except Exception:
+                    QgsMessageLog.logMessage(
+                        self.tr(
+                            "Failed to load GeoPackage: %1"
+                        ).replace("%1", self.geopackage_path),
+                        self.tr("Plugin"),
+                        Qgis.Critical,
+                    )
+                    return []
+
+            return list(self.layer_names)
+
+    def query(self, sql, params=()):
+        """
+        GeoPackageに対してSQLを直接実行する（読み取り専用）
+        :param sql: SQL（値は ? で指定）
+        :param params: SQLのパラメータ
+        :return: 結果行（タプル）のリスト
+        """
+        # 読み取り専用の接続はスレッドごとに作成
+        connection = getattr(self.thread_local, 'sql_connection', None)
+        if connection is None:
+            uri = Path(os.path.abspath(self.geopackage_path)).as_uri()
+            connection = sqlite3.connect(
+                f"{uri}?mode=ro", uri=True, check_same_thread=False
+            )
+            self.thread_local.sql_connection = connection
+            with self.metadata_lock:
+                self.sql_connections.append(connection)
+        return connection.execute(sql, params).fetchall()
+
+    def aggregate(
+        self,
+        layer_name,
+        columns,
+        where=None,
+        params=(),
+        group_by=None,
+        fids=None,
+    ):
+        """
+        GeoPackageのテーブルをSQLで集計する
+        :param layer_name: レイヤ名
+        :param columns: 集計式のリスト（例: 'SUM("total_floor_area")'）
+        :param where: 抽出条件（値は ? で指定）
+        :param params: 集計式・抽出条件のパラメータ（SQL内の出現順）
+        :param group_by: グループ化するフィールド名
+        :param fids: 対象とする地物IDの集合（空間条件で抽出した地物など）
+        :return: 結果行（タプル）のリスト（group_by 指定時は先頭がグループの値）
+        """
+        select = list(columns)
+        conditions = []
+        if group_by:
+            select.insert(0, self.__quote(group_by))
+        if where:
+            conditions.append(f"({where})")
+        if fids is not None:
+            # 地物IDは整数のためSQLに直接埋め込む（パラメータ数の上限を回避）
+            fid_list = ",".join(str(int(fid)) for fid in sorted(fids))
+            conditions.append(
+                f"{self.__quote(self.__get_fid_column(layer_name))} "
+                f"IN ({fid_list})"
+            )
 
-        # レイヤ名を取得
-        for i in range(gpkg.GetLayerCount()):
-            layer = gpkg.GetLayerByIndex(i)
-            layer_names.append(layer.GetName())
+        sql = f"SELECT {', '.join(select)} FROM {self.__quote(layer_name)}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if group_by:
+            sql += (
+                f" GROUP BY {self.__quote(group_by)}"
+                f" ORDER BY {self.__quote(group_by)}"
+            )
+        return self.query(sql, params)
+
+    def get_write_lock(self):
+        """書き込み用のロック（同じGeoPackageを操作する全セッションで共有）"""
+        key = os.path.normcase(os.path.abspath(self.geopackage_path))
+        with GpkgManager._write_locks_guard:
+            return GpkgManager._write_locks.setdefault(
+                key, threading.RLock()
+            )
+
+    def get_connection(self):
+        """
+        GeoPackageへの書き込み用接続（初回のみ接続し、以降は同じ接続を使用）
+        書き込みロックを取得した状態で使用すること
+        """
+        if self.connection is None:
+            connection = ogr.Open(self.geopackage_path, update=1)
+            if connection is None:
+                raise Exception(
+                    self.tr("Failed to load GeoPackage: %1").replace(
+                        "%1", self.geopackage_path
+                    )
+                )
+            self.connection = connection
+
+            # 読み込み中の接続があっても書き込めるようWALモードに設定
+            self.__execute("PRAGMA journal_mode=WAL")
+        return self.connection
+
+    def close(self):
+        """
+        接続と読み込み済みレイヤを破棄する
+        他に使用中の接続がない場合は、WALの内容を書き戻して単一ファイルに戻す
+        （レイヤパネルのレイヤが接続中の場合はWALのまま、失敗時はログのみ出力）
+        """
+        with self.metadata_lock:
+            self.thread_local = threading.local()
+            self.layer_names = None
+            self.layer_versions = {}
+            for connection in self.sql_connections:
+                connection.close()
+            self.sql_connections = []
+        if self.connection is None:
+            return
+
+        with self.get_write_lock():
+            try:
+                if self.__get_project_layers():
+                    # WALの解除には排他ロックが必要なため、書き戻しのみ行う
+                    self.__execute("PRAGMA wal_checkpoint(PASSIVE)")
+                else:
+                    self.__execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    self.__execute("PRAGMA journal_mode=DELETE")
+            except Exception as e:
+                QgsMessageLog.logMessage(
+                    self.tr("Failed to checkpoint GeoPackage: %1").replace(
+                        "%1", str(e)
+                    ),
+                    self.tr("Plugin"),
+                    Qgis.Warning,
+                )
+            finally:
+                self.__close_connection()
 
-        # GeoPackageを明示的に閉じる
-        gpkg.Close()
+    def __setup(self, base_path, gpkg_name):
+        """GeoPackageのパスと接続・読み込み済みレイヤの管理情報を設定"""
+        self.base_path = base_path
+        self.gpkg_name = gpkg_name
+        self.geopackage_path = os.path.join(base_path, gpkg_name)
+        self.connection = None
+        self.layer_names = None
+        # レイヤごとの更新回数（更新前に読み込んだレイヤの再利用を防ぐ）
+        self.layer_versions = {}
+        self.thread_local = threading.local()
+        self.sql_connections = []
+        self.metadata_lock = threading.RLock()
+
+    def __get_project_layers(self):
+        """レイヤパネルにあるこのGeoPackageのレイヤ"""
+        return [
+            layer
+            for layer in QgsProject.instance().mapLayers().values()
+            if os.path.normpath(layer.source()).startswith(
+                os.path.normpath(self.geopackage_path)
+            )
+        ]
+
+    def __get_thread_layers(self):
+        """現在のスレッドで読み込み済みのレイヤ"""
+        layers = getattr(self.thread_local, 'layers', None)
+        if layers is None:
+            layers = {}
+            self.thread_local.layers = layers
+        return layers
+
+    def __update_layer_names(self, layer_name, exists):
+        """レイヤの追加・削除をレイヤ一覧と更新回数に反映"""
+        with self.metadata_lock:
+            self.layer_versions[layer_name] = (
+                self.layer_versions.get(layer_name, 0) + 1
+            )
+            if self.layer_names is None:
+                return
+            if exists and layer_name not in self.layer_names:
+                self.layer_names.append(layer_name)
+            elif not exists and layer_name in self.layer_names:
+                self.layer_names.remove(layer_name)
+
+    def __execute(self, sql):
+        """SQLを実行し、結果を行のリストで返す"""
+        gpkg = self.get_connection()
+        result = gpkg.ExecuteSQL(sql)
+        if result is None:
+            return []
+        try:
+            return [
+                [
+                    feature.GetField(i)
+                    for i in range(feature.GetFieldCount())
+                ]
+                for feature in result
+            ]
+        finally:
+            gpkg.ReleaseResultSet(result)
+
+    def __is_schema_changed(self, layer_name, layer):
+        """
+        読み込み済みのレイヤにないフィールドがテーブルに追加されたかどうか
+        （プロジェクトのレイヤなど、GpkgManager 以外でフィールドを追加した場合）
+        """
+        geometry_columns = {
+            row[0]
+            for row in self.query(
+                "SELECT column_name FROM gpkg_geometry_columns "
+                "WHERE table_name = ?",
+                (layer_name,),
+            )
+        }
+        field_names = set(layer.fields().names())
+        return any(
+            row[1] not in field_names and row[1] not in geometry_columns
+            for row in self.query(
+                f"PRAGMA table_info({self.__quote(layer_name)})"
+            )
+        )
 
-        return layer_names
+    def __get_fid_column(self, layer_name):
+        """テーブルの地物ID（主キー）のフィールド名"""
+        for row in self.query(
+            f"PRAGMA table_info({self.__quote(layer_name)})"
+        ):
+            # (cid, name, type, notnull, dflt_value, pk)
+            if row[5]:
+                return row[1]
+        return "fid"
+
+    def __quote(self, identifier):
+        """SQLの識別子をエスケープ"""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def __close_connection(self):
+        """接続を閉じる"""
+        if self.connection is not None:
+            self.connection.Close()
+            self.connection = None
@@ -7,30 +7,36 @@
 """
 
 import re
-import csv
 from qgis.core import (
     QgsMessageLog,
     Qgis,
     QgsVectorLayer,
     QgsFeature,
-    QgsCoordinateReferenceSystem,
-    QgsExpression,
     QgsFeatureRequest,
-    QgsAggregateCalculator,
 )
 from PyQt5.QtCore import QCoreApplication
 import processing
 from .gpkg_manager import GpkgManager
+from .metric_result_store import MetricResultStore, round_or_na
+from .scratch_manager import ScratchManager
+from .reprojection_manager import ReprojectionManager
+from .spatial_index_registry import SpatialIndexRegistry
+from .progress_manager import ProgressManager
 
 
 class LandUseMetricCalculator:
     """土地利用関連評価指標算"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         self.base_path = base_path
 
         self.check_canceled = check_canceled_callback
 
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.scratch_manager = ScratchManager._instance
+        self.reprojection_manager = ReprojectionManager._instance
+        self.spatial_index_registry = SpatialIndexRegistry._instance
 
     def tr(self, message):
         """翻訳用のメソッド"""
@@ -85,11 +91,13 @@ class LandUseMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': centroid_layer}
+                "native:createspatialindex",
+                {'INPUT': centroid_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            centroid_layer = self.gpkg_manager.add_layer(
-                centroid_layer, "tmp_building_centroids", None, False
+            centroid_layer = self.scratch_manager.add_layer(
+                centroid_layer, "tmp_building_centroids"
             )
             if not centroid_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -128,26 +136,11 @@ class LandUseMetricCalculator:
             residential_area_data.addFeatures(residential_area_features)
             residential_area_layer.updateExtents()
 
-            # 空間インデックス作成
-            processing.run(
-                "native:createspatialindex", {'INPUT': residential_area_layer}
+            # メートル単位の座標系に変換済みの誘導区域（計算済みの場合は再利用）
+            transformed_layer = self.reprojection_manager.get_projected_layer(
+                'induction_areas'
             )
 
-            # CRS変換先（EPSG:3857）
-            crs_dest = QgsCoordinateReferenceSystem(
-                3857
-            )  # メートル単位の座標系 (EPSG:3857)
-
-            # CRS変換
-            transformed_layer = processing.run(
-                "native:reprojectlayer",
-                {
-                    'INPUT': induction_layer,
-                    'TARGET_CRS': crs_dest,
-                    'OUTPUT': 'memory:',  # メモリーレイヤとして変換後のレイヤを保持
-                },
-            )['OUTPUT']
-
             # 面積計算
             area = 0  # 居住誘導区域の面積(ha)
 
@@ -157,96 +150,92 @@ class LandUseMetricCalculator:
                     # 面積計算 (ヘクタール単位へ変換: 1ヘクタール = 10,000平方メートル)
                     area += induction_feature.geometry().area() / 10000
 
-            area = self.round_or_na(area, 1)
+            area = round_or_na(area, 1)
 
-            # 使用用途が住宅の建物を抽出
-            expression = (
-                '"usage" IN (\'住宅\', \'共同住宅\', \'店舗等併用住宅\', '
-                '\'店舗等併用共同住宅\', \'作業所併用住宅\')'
+            if self.check_canceled():
+                return  # キャンセルチェック
+            # 居住誘導区域内の建物（重心）の地物IDを取得
+            residential_fids = self.spatial_index_registry.select_fids(
+                centroid_layer,
+                residential_area_layer,
+                SpatialIndexRegistry.PREDICATE_WITHIN,
             )
-
-            result = processing.run(
-                "native:extractbyexpression",
-                {
-                    'INPUT': centroid_layer,
-                    'EXPRESSION': expression,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
+            request = (
+                QgsFeatureRequest()
+                .setFilterFids(sorted(residential_fids))
+                .setFlags(QgsFeatureRequest.NoGeometry)
+                .setSubsetOfAttributes(['fid'], centroid_layer.fields())
             )
-
-            # 結果をレイヤに追加
-            centroid_layer = result['OUTPUT']
-            # 空間インデックス作成
-            processing.run(
-                "native:createspatialindex", {'INPUT': centroid_layer}
+            building_fids = [
+                feature['fid']
+                for feature in centroid_layer.getFeatures(request)
+            ]
+
+            # 使用用途が住宅の建物の住居数・床面積を全年度分まとめてSQLで集計
+            residential_usages = [
+                '住宅',
+                '共同住宅',
+                '店舗等併用住宅',
+                '店舗等併用共同住宅',
+                '作業所併用住宅',
+            ]
+            building_fields = buildings_layer.fields().names()
+            vacancy_years = [
+                year
+                for year in unique_years
+                if f"{year}_is_vacancy" in building_fields
+            ]
+            columns = ['COUNT(*)', 'SUM("total_floor_area")']
+            params = []
+            if 'vacancy' in building_fields:
+                columns.append(
+                    'SUM(CASE WHEN "vacancy" = ? '
+                    'THEN "total_floor_area" END)'
+                )
+                params.append('空き家')
+            columns.extend(
+                f'SUM(CASE WHEN "{year}_is_vacancy" = 1 THEN 1 ELSE 0 END)'
+                for year in vacancy_years
             )
+            params.extend(residential_usages)
 
             if self.check_canceled():
                 return  # キャンセルチェック
-            # 居住誘導区域内の建物を取得
-            result = processing.run(
-                "native:joinattributesbylocation",
-                {
-                    'INPUT': centroid_layer,
-                    'JOIN': residential_area_layer,
-                    'PREDICATE': [5],  # overlap
-                    'JOIN_FIELDS': [],
-                    'METHOD': 0,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                    'DISCARD_NONMATCHING': True,
-                    'PREFIX': 'induction_area_',
-                },
+            row = self.gpkg_manager.aggregate(
+                'buildings',
+                columns,
+                where=(
+                    '"usage" IN ('
+                    + ', '.join('?' for _ in residential_usages)
+                    + ')'
+                ),
+                params=params,
+                fids=building_fids,
+            )[0]
+            # 該当する建物がない場合、SUMはNULLとなるため0とする
+            values = [value or 0 for value in row]
+            total_number = values.pop(0)
+            total_floor_area_sum = values.pop(0)
+            vacant_floor_area_sum = (
+                values.pop(0) if 'vacancy' in building_fields else 0
             )
-
-            # 結合結果の取得
-            residential_buildings = result['OUTPUT']
+            vacant_numbers = dict(zip(vacancy_years, values))
 
             for year in unique_years:
                 if self.check_canceled():
                     return  # キャンセルチェック
 
-                # 居住誘導区域内の住居総数
-                total_number = residential_buildings.featureCount()
-
                 # 空き家数を集計
-                vacancy_field = f"{year}_is_vacancy"
-                expression_vacancy = QgsExpression(
-                    f'"{vacancy_field}" = 1'
-                )  # vacancy_fieldを条件にして1のものを抽出
-                vacant_matching_features = residential_buildings.getFeatures(
-                    QgsFeatureRequest(expression_vacancy)
-                )
-                vacant_number = sum(1 for _ in vacant_matching_features)
+                vacant_number = vacant_numbers.get(year, 0)
 
                 # 居住誘導区域内の住居床面積を集計
-                total_floor_area_result = residential_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum, 'total_floor_area'
-                )
-                total_floor_area_m2 = (
-                    int(total_floor_area_result[0])
-                    if total_floor_area_result[0] is not None
-                    else 0
-                )
+                total_floor_area_m2 = int(total_floor_area_sum)
                 total_floor_area_ha = (
                     total_floor_area_m2 / 10000
                 )  # ヘクタールに変換
 
-                # 空き家の床面積を集計
-                expression_vacant_floor_area = QgsExpression(
-                    '"vacancy" = \'空き家\''
-                )
-                vacant_buildings = residential_buildings.getFeatures(
-                    QgsFeatureRequest(expression_vacant_floor_area)
-                )
-
                 # 空き家の床面積を合計
-                vacant_floor_area_m2 = sum(
-                    [
-                        feature['total_floor_area']
-                        for feature in vacant_buildings
-                        if feature['total_floor_area'] is not None
-                    ]
-                )
+                vacant_floor_area_m2 = vacant_floor_area_sum
                 vacant_floor_area_ha = (
                     vacant_floor_area_m2 / 10000
                 )  # ヘクタールに変換
@@ -255,7 +244,7 @@ class LandUseMetricCalculator:
                 if data_list:
                     previous_year_data = data_list[-1]
                     vacant_rate_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (vacant_number / total_number)
                                 - previous_year_data['Vacant_Rate']
@@ -264,10 +253,10 @@ class LandUseMetricCalculator:
                             1,
                         )
                         if total_number > 0
-                        else '―'
+                        else None
                     )
                     vacant_rate_floor_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (vacant_floor_area_ha / total_floor_area_ha)
                                 - previous_year_data['Vacant_Floor_Rate']
@@ -279,7 +268,7 @@ class LandUseMetricCalculator:
                         else '-'
                     )
                 else:
-                    vacant_rate_change = '―'
+                    vacant_rate_change = None
                     vacant_rate_floor_change = '-'
 
                 # データを辞書にまとめる
@@ -291,11 +280,11 @@ class LandUseMetricCalculator:
                     'Vacant_Number': vacant_number,
                     # 空き家率
                     'Vacant_Rate': (
-                        self.round_or_na(
+                        round_or_na(
                             (vacant_number / total_number) * 100, 1
                         )
                         if total_number > 0
-                        else '―'
+                        else None
                     ),
                     # 空き家率の変化
                     'Vacant_Rate_Change': vacant_rate_change,
@@ -305,12 +294,12 @@ class LandUseMetricCalculator:
                     'Vacant_FloorArea': vacant_floor_area_ha,
                     # 空き家の床面積率
                     'Vacant_Floor_Rate': (
-                        self.round_or_na(
+                        round_or_na(
                             (vacant_floor_area_ha / total_floor_area_ha) * 100,
                             1,
                         )
                         if total_floor_area_ha > 0
-                        else '―'
+                        else None
                     ),
                     # 空き家の床面積率の変化
                     'Vacant_Rate_Floor_Change': vacant_rate_floor_change,
@@ -329,10 +318,9 @@ class LandUseMetricCalculator:
                 # 辞書をリストに追加
                 data_list.append(year_data)
 
-            # ファイルパスを指定してエクスポート
-            self.export(
-                self.base_path + '\\IF105_土地利用関連評価指標ファイル.csv',
-                data_list,
+            # 算出結果を保存し、評価指標ファイルを出力
+            MetricResultStore(self.gpkg_manager).save(
+                'IF105', data_list, self.base_path
             )
 
             return
@@ -345,50 +333,3 @@ class LandUseMetricCalculator:
                 Qgis.Critical,
             )
             raise e
-
-    def export(self, file_path, data):
-        """エクスポート処理"""
-        try:
-            if not data:
-                raise Exception(self.tr("The data to export is empty."))
-
-            # データ項目からヘッダーを取得
-            headers = list(data[0].keys())
-
-            # CSVファイル書き込み
-            with open(
-                file_path, mode='w', newline='', encoding='utf-8'
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
-
-            msg = self.tr(
-                "File export completed: %1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
-            )
-            return True
-        except Exception as e:
-            # エラーメッセージのログ出力
-            msg = self.tr(
-                "An error occurred during file export: %1."
-            ).replace("%1", e)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Critical,
-            )
-            raise e
-
-    def round_or_na(self, value, decimal_places, threshold=None):
-        """丸め処理"""
-        if value is None or (threshold is not None and value <= threshold):
-            return '―'
-        else:
-            return round(value, decimal_places)
@@ -0,0 +1,104 @@
+"""
+/***************************************************************************
+ *
+ * レイヤ属性一括集計
+ *
+ ***************************************************************************/
+"""
+
+from qgis.core import (
+    QgsExpression,
+    QgsExpressionContext,
+    QgsExpressionContextUtils,
+    QgsFeatureRequest,
+    NULL,
+)
+from PyQt5.QtCore import QCoreApplication
+
+
+class LayerAggregator:
+    """レイヤ属性一括集計"""
+    def __init__(self, layer):
+        self.layer = layer
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("LayerAggregator", message)
+
+    def sums(self, requests):
+        """
+        複数フィールドの合計を1回の走査でまとめて集計する
+        :param requests: (集計するフィールド名, 条件式) のリスト
+                         フィールド名が None の場合は条件に一致する件数を集計
+                         条件式が None の場合は全地物を対象とする
+        :return: (フィールド名, 条件式) をキーとした集計結果の辞書
+        """
+        requests = list(dict.fromkeys(requests))
+        results = {request: 0 for request in requests}
+        if not requests:
+            return results
+
+        fields = self.layer.fields()
+        context = QgsExpressionContext()
+        context.appendScopes(
+            QgsExpressionContextUtils.globalProjectLayerScopes(self.layer)
+        )
+
+        # 条件式は同一のものをまとめて1回だけ評価する
+        expressions = {}
+        sum_fields = set()
+        attributes = set()
+        needs_geometry = False
+        for field_name, condition in requests:
+            if field_name is not None:
+                if fields.indexFromName(field_name) == -1:
+                    # 存在しないフィールドは集計対象外（結果は0）
+                    continue
+                sum_fields.add(field_name)
+            if condition is not None and condition not in expressions:
+                expression = QgsExpression(condition)
+                if expression.hasParserError():
+                    raise Exception(
+                        self.tr("Invalid expression: %1").replace(
+                            "%1", expression.parserErrorString()
+                        )
+                    )
+                expression.prepare(context)
+                attributes.update(expression.referencedColumns())
+                needs_geometry = needs_geometry or expression.needsGeometry()
+                expressions[condition] = expression
+
+        attributes.update(sum_fields)
+
+        # ジオメトリを読み込まず、必要な属性のみ取得
+        request = QgsFeatureRequest()
+        if not needs_geometry:
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        if QgsFeatureRequest.ALL_ATTRIBUTES not in attributes:
+            request.setSubsetOfAttributes(
+                [name for name in attributes if name in fields.names()],
+                fields,
+            )
+
+        targets = [
+            item for item in requests
+            if item[0] is None or item[0] in sum_fields
+        ]
+        for feature in self.layer.getFeatures(request):
+            context.setFeature(feature)
+            matches = {
+                condition: bool(expression.evaluate(context))
+                for condition, expression in expressions.items()
+            }
+            for field_name, condition in targets:
+                if condition is not None and not matches[condition]:
+                    continue
+                if field_name is None:
+                    results[(field_name, condition)] += 1
+                    continue
+                value = feature[field_name]
+                if value is None or value == NULL:
+                    continue
+                results[(field_name, condition)] += value
+
+        return results
@@ -0,0 +1,281 @@
+"""
+/***************************************************************************
+ *
+ * 地図表示用の分類コード作成
+ *
+ ***************************************************************************/
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import xml.etree.ElementTree as ET
+
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsProject,
+    QgsProviderRegistry,
+)
+from PyQt5.QtCore import QCoreApplication
+from .gpkg_manager import GpkgManager
+
+
+class LayerClassifier:
+    """
+    地図表示用の分類コード作成
+    レイヤ色分け設定の閾値・ルールを書き込み時に評価し、分類番号を整数フィールドに保存する。
+    表示時は分類番号のカテゴリ値で色分けし、地物ごとの式の評価を不要にする。
+    """
+    # レイヤ色分け設定
+    CONFIG_FILE = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "..",
+        "config",
+        "LayersColoringConfig.xml",
+    )
+
+    # 分類番号を作成する色分けの種類
+    CLASSIFIED_TYPES = ("graduated", "ruled")
+
+    # 分類番号のフィールド名の接頭辞
+    CLASS_FIELD_PREFIX = "cls_"
+
+    def __init__(self, check_canceled_callback=None, gpkg_manager=None):
+        # GeoPackageマネージャーを初期化
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+
+        self.check_canceled = check_canceled_callback
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate(self.__class__.__name__, message)
+
+    @staticmethod
+    def get_class_column(layer_info):
+        """
+        分類番号のフィールド名（同じ閾値・ルールの色分けでは同じフィールドを使用）
+        :param layer_info: レイヤ色分け設定（type, column, data）
+        :return: フィールド名（分類番号を作成しない色分けの場合は None）
+        """
+        if layer_info['type'] == 'graduated':
+            definition = [
+                [data['underthreshold'], data['upperthreshold']]
+                for data in layer_info['data']
+            ]
+            prefix = (
+                f"{LayerClassifier.CLASS_FIELD_PREFIX}{layer_info['column']}"
+            )
+        elif layer_info['type'] == 'ruled':
+            definition = [data['rule'] for data in layer_info['data']]
+            prefix = f"{LayerClassifier.CLASS_FIELD_PREFIX}rule"
+        else:
+            return None
+
+        digest = hashlib.md5(
+            json.dumps(
+                [layer_info['column'], definition], ensure_ascii=False
+            ).encode("utf-8")
+        ).hexdigest()
+        return f"{prefix}_{digest[:8]}"
+
+    @staticmethod
+    def get_class_expression(layer_info):
+        """
+        分類番号を計算するSQL式
+        graduated は QGIS と同じく先頭から順に下限・上限を含む範囲で判定し、
+        ruled は最初に一致したルールの番号とする（一致しない場合は NULL）
+        :param layer_info: レイヤ色分け設定（type, column, data）
+        :return: SQL式
+        """
+        cases = []
+        for index, data in enumerate(layer_info['data']):
+            if layer_info['type'] == 'graduated':
+                column = '"' + layer_info['column'].replace('"', '""') + '"'
+                lower = float(data['underthreshold'])
+                upper = float(data['upperthreshold'])
+                condition = (
+                    f"{column} >= {lower!r} AND {column} <= {upper!r}"
+                )
+            else:
+                condition = f"({data['rule']})"
+            cases.append(f"WHEN {condition} THEN {index}")
+        return f"CASE {' '.join(cases)} END"
+
+    def load_definitions(self):
+        """
+        レイヤ色分け設定から分類番号を作成する色分けを読み込む
+        :return: レイヤ名ごとの色分け設定のリスト
+        """
+        root = ET.parse(self.CONFIG_FILE).getroot()
+
+        definitions = {}
+        for dataset in root.find('datasets'):
+            year = dataset.find('year').text
+            for layer in dataset.find('layerlist'):
+                layer_type = layer.find('type').text
+                if layer_type not in self.CLASSIFIED_TYPES:
+                    continue
+
+                column = layer.find('column')
+                layer_info = {
+                    'name': layer.find('name').text,
+                    'type': layer_type,
+                    'column': (
+                        column.text.replace('yyyy', year)
+                        if column is not None and column.text
+                        else ''
+                    ),
+                    'data': [],
+                }
+                for data in layer.find('datalist'):
+                    if layer_type == 'graduated':
+                        layer_info['data'].append({
+                            'underthreshold': data.find(
+                                'underthreshold'
+                            ).text,
+                            'upperthreshold': data.find(
+                                'upperthreshold'
+                            ).text,
+                        })
+                    else:
+                        layer_info['data'].append(
+                            {'rule': data.find('rule').text}
+                        )
+
+                definitions.setdefault(layer_info['name'], []).append(
+                    layer_info
+                )
+        return definitions
+
+    def classify(self):
+        """分類番号を作成"""
+        try:
+            updated_layers = set()
+            for name, layer_infos in self.load_definitions().items():
+                if self.check_canceled():
+                    return  # キャンセルチェック
+
+                layer_name = self.__get_gpkg_layer_name(name)
+                if layer_name is None:
+                    continue
+
+                columns = [
+                    row[1]
+                    for row in self.gpkg_manager.query(
+                        f"PRAGMA table_info({self.__quote(layer_name)})"
+                    )
+                ]
+
+                class_columns = set()
+                for layer_info in layer_infos:
+                    class_column = self.get_class_column(layer_info)
+                    if class_column in class_columns:
+                        continue
+                    class_columns.add(class_column)
+
+                    if not self.__is_classifiable(
+                        layer_name, layer_info, columns
+                    ):
+                        continue
+
+                    if self.gpkg_manager.set_computed_column(
+                        layer_name,
+                        class_column,
+                        self.get_class_expression(layer_info),
+                    ):
+                        updated_layers.add(layer_name)
+
+            # 追加したフィールドをプロジェクトのレイヤに反映
+            self.__reload_project_layers(updated_layers)
+            if not updated_layers:
+                return
+
+            QgsMessageLog.logMessage(
+                self.tr("Class fields created on %1.").replace(
+                    "%1", ", ".join(sorted(updated_layers))
+                ),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+
+        except Exception as e:
+            # 分類番号は表示の高速化のためのものであり、失敗しても処理は継続
+            QgsMessageLog.logMessage(
+                self.tr("Failed to create class fields: %1").replace(
+                    "%1", str(e)
+                ),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+
+    def __is_classifiable(self, layer_name, layer_info, columns):
+        """SQLiteで分類番号を計算できるかどうか"""
+        if layer_info['type'] == 'graduated':
+            return layer_info['column'] in columns
+
+        # ルールがSQLとして評価できない場合は表示時にルールで判定
+        for data in layer_info['data']:
+            try:
+                # 構文・関数の確認のみ行う（地物は走査しない）
+                self.gpkg_manager.query(
+                    f"SELECT 1 FROM {self.__quote(layer_name)} "
+                    f"WHERE ({data['rule']}) LIMIT 0"
+                )
+            except sqlite3.Error:
+                QgsMessageLog.logMessage(
+                    self.tr("Rule is not evaluable in SQL: %1").replace(
+                        "%1", data['rule']
+                    ),
+                    self.tr("Plugin"),
+                    Qgis.Info,
+                )
+                return False
+        return True
+
+    def __get_gpkg_layer_name(self, name):
+        """プロジェクトのレイヤ名からGeoPackageのレイヤ名を取得"""
+        gpkg_path = os.path.normcase(
+            os.path.abspath(self.gpkg_manager.geopackage_path)
+        )
+        for layer in QgsProject.instance().mapLayersByName(name):
+            uri = QgsProviderRegistry.instance().decodeUri(
+                layer.providerType(), layer.source()
+            )
+            path = uri.get('path')
+            if (
+                path
+                and os.path.normcase(os.path.abspath(path)) == gpkg_path
+                and uri.get('layerName')
+            ):
+                return uri['layerName']
+        return None
+
+    def __reload_project_layers(self, layer_names):
+        """フィールドを追加したGeoPackageのレイヤを読み込み直す"""
+        if not layer_names:
+            return
+
+        gpkg_path = os.path.normcase(
+            os.path.abspath(self.gpkg_manager.geopackage_path)
+        )
+        for layer in QgsProject.instance().mapLayers().values():
+            if layer.providerType() != "ogr":
+                continue
+            uri = QgsProviderRegistry.instance().decodeUri(
+                "ogr", layer.source()
+            )
+            path = uri.get('path')
+            if (
+                path
+                and os.path.normcase(os.path.abspath(path)) == gpkg_path
+                and uri.get('layerName') in layer_names
+            ):
+                layer.dataProvider().reloadData()
+                layer.updateFields()
+
+    def __quote(self, identifier):
+        """SQLの識別子をエスケープ"""
+        return '"' + identifier.replace('"', '""') + '"'
@@ -0,0 +1,174 @@
+"""
+/***************************************************************************
+ *
+ * 小縮尺表示用の概略レイヤ作成
+ *
+ ***************************************************************************/
+"""
+
+import math
+
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsVectorLayer,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsWkbTypes,
+)
+from PyQt5.QtCore import QCoreApplication
+from .gpkg_manager import GpkgManager
+from .layer_classifier import LayerClassifier
+
+
+class LayerGeneralizer:
+    """
+    小縮尺表示用の概略レイヤ作成
+    地物を簡略化し、格子ごと・分類番号ごとに1地物にまとめる。
+    分類番号のみを保持するため、分類番号で色分けする場合のみ使用できる。
+    """
+    # 概略レイヤのレイヤ名の接尾辞
+    GENERALIZED_SUFFIX = "_generalized"
+
+    # 縮尺による表示の切り替え（縮尺の分母がこの値より大きい場合は概略レイヤを表示）
+    # 詳細レイヤに表示縮尺の設定がある場合はその最小縮尺で切り替える
+    GENERALIZED_SCALE = 50000.0
+
+    # 概略化するレイヤ（簡略化の許容距離[m], まとめる格子の大きさ[m], 表示名）
+    GENERALIZED_LAYERS = {
+        'buildings': {
+            'tolerance': 2.0,
+            'grid_size': 1000.0,
+            'alias': '建築物（概略）',
+        },
+        # メッシュは矩形のため簡略化せず、まとめるのみ
+        'meshes': {
+            'tolerance': 0.0,
+            'grid_size': 2000.0,
+            'alias': 'メッシュ（概略）',
+        },
+    }
+
+    # 地理座標系の場合の1度あたりの距離[m]（概略化のための近似値）
+    METERS_PER_DEGREE = 111320.0
+
+    def __init__(self, check_canceled_callback=None, gpkg_manager=None):
+        # GeoPackageマネージャーを初期化
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+
+        self.check_canceled = check_canceled_callback
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate(self.__class__.__name__, message)
+
+    def generalize(self):
+        """概略レイヤ作成"""
+        for layer_name, settings in self.GENERALIZED_LAYERS.items():
+            if self.check_canceled():
+                return  # キャンセルチェック
+            try:
+                self.__generalize_layer(layer_name, settings)
+
+            except Exception as e:
+                # 概略レイヤは表示の高速化のためのものであり、失敗しても処理は継続
+                QgsMessageLog.logMessage(
+                    self.tr("Failed to generalize %1: %2")
+                    .replace("%1", layer_name)
+                    .replace("%2", str(e)),
+                    self.tr("Plugin"),
+                    Qgis.Warning,
+                )
+
+    def __generalize_layer(self, layer_name, settings):
+        """レイヤを概略化してGeoPackageに保存"""
+        generalized_name = f"{layer_name}{self.GENERALIZED_SUFFIX}"
+        layer = self.gpkg_manager.load_layer(
+            layer_name, None, withload_project=False
+        )
+        if layer is None:
+            return
+
+        # 色分けに使用する分類番号のフィールド
+        fields = layer.fields()
+        class_indexes = [
+            index
+            for index, field in enumerate(fields)
+            if field.name().startswith(LayerClassifier.CLASS_FIELD_PREFIX)
+        ]
+        if not class_indexes:
+            # 分類番号がない場合は色分けできないため作成しない
+            self.gpkg_manager.delete_layer(generalized_name)
+            QgsMessageLog.logMessage(
+                self.tr("Generalization of %1 skipped (no class fields).")
+                .replace("%1", layer_name),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+            return
+
+        # 許容距離・格子の大きさをレイヤの座標系の単位に変換
+        unit = self.METERS_PER_DEGREE if layer.crs().isGeographic() else 1.0
+        tolerance = settings['tolerance'] / unit
+        grid_size = settings['grid_size'] / unit
+
+        # 格子・分類番号ごとに簡略化したジオメトリを集める
+        groups = {}
+        request = QgsFeatureRequest().setSubsetOfAttributes(class_indexes)
+        for feature in layer.getFeatures(request):
+            if not feature.hasGeometry():
+                continue
+            geometry = feature.geometry()
+            if tolerance > 0:
+                simplified = geometry.simplify(tolerance)
+                if not simplified.isEmpty():
+                    geometry = simplified
+
+            center = geometry.boundingBox().center()
+            key = (
+                math.floor(center.x() / grid_size),
+                math.floor(center.y() / grid_size),
+                tuple(feature.attribute(index) for index in class_indexes),
+            )
+            groups.setdefault(key, []).append(geometry)
+
+        wkb_type = QgsWkbTypes.multiType(layer.wkbType())
+        generalized_layer = QgsVectorLayer(
+            f"{QgsWkbTypes.displayString(wkb_type)}"
+            f"?crs={layer.crs().authid()}",
+            generalized_name,
+            "memory",
+        )
+        generalized_provider = generalized_layer.dataProvider()
+        generalized_provider.addAttributes(
+            [fields.at(index) for index in class_indexes]
+        )
+        generalized_layer.updateFields()
+
+        features = []
+        for (_, _, values), geometries in groups.items():
+            generalized_feature = QgsFeature(generalized_layer.fields())
+            generalized_feature.setGeometry(
+                QgsGeometry.collectGeometry(geometries)
+            )
+            generalized_feature.setAttributes(list(values))
+            features.append(generalized_feature)
+        generalized_provider.addFeatures(features)
+        generalized_layer.updateExtents()
+
+        if not self.gpkg_manager.add_layer(
+            generalized_layer, generalized_name, settings['alias']
+        ):
+            raise Exception(
+                self.tr("Failed to save %1.").replace("%1", generalized_name)
+            )
+
+        QgsMessageLog.logMessage(
+            self.tr("Generalized layer %1 created (%2 -> %3 features).")
+            .replace("%1", generalized_name)
+            .replace("%2", str(layer.featureCount()))
+            .replace("%3", str(len(features))),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
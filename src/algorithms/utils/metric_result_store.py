@@ -0,0 +1,254 @@
+"""
+/***************************************************************************
+ *
+ * 評価指標算出結果の管理
+ *
+ ***************************************************************************/
+"""
+
+import os
+import io
+import csv
+
+from qgis.core import QgsMessageLog, Qgis
+from PyQt5.QtCore import QCoreApplication
+from osgeo import ogr
+from .gpkg_manager import GpkgManager
+
+
+def round_or_na(value, decimal_places, threshold=None):
+    """丸め処理（値がない・閾値以下の場合は欠損値として None を返す）"""
+    if value is None or (threshold is not None and value <= threshold):
+        return None
+    return round(value, decimal_places)
+
+
+class MetricResultStore:
+    """
+    評価指標算出結果の管理
+    算出結果は出力先GeoPackageの属性テーブルに型付きで保存し、
+    評価指標ファイル（CSV）は保存した結果から作成する。
+    欠損値はテーブルでは NULL とし、CSVでのみ「―」で表す。
+    """
+    # 評価指標ファイルのIDとファイル名
+    RESULT_FILES = {
+        'IF101': 'IF101_居住誘導区域関連評価指標ファイル.csv',
+        'IF102': 'IF102_都市機能誘導区域関連評価指標ファイル.csv',
+        'IF103': 'IF103_防災関連評価指標ファイル.csv',
+        'IF104': 'IF104_公共交通関連評価指標ファイル.csv',
+        'IF105': 'IF105_土地利用関連評価指標ファイル.csv',
+        'IF106': 'IF106_財政関連評価指標ファイル.csv',
+    }
+
+    # 算出結果のテーブル名の接頭辞
+    TABLE_PREFIX = "metric_"
+
+    # 実数の列に含まれる整数値の位置を記録するテーブル名の接尾辞
+    # （CSVでは従来どおり整数として出力するため）
+    INT_CELLS_SUFFIX = "_int_cells"
+
+    # CSVでの欠損値の表記
+    NA_TEXT = '―'
+
+    def __init__(self, gpkg_manager=None):
+        # GeoPackageマネージャーを初期化
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate(self.__class__.__name__, message)
+
+    @classmethod
+    def get_table_name(cls, file_id):
+        """算出結果のテーブル名"""
+        return f"{cls.TABLE_PREFIX}{file_id.lower()}"
+
+    @classmethod
+    def get_file_id(cls, file_path):
+        """
+        評価指標ファイルのパスからIDを取得
+        :param file_path: 評価指標ファイルのパス（ファイル名のみでも可）
+        :return: ID（評価指標ファイルでない場合は None）
+        """
+        file_name = os.path.basename(file_path)
+        for file_id, result_file in cls.RESULT_FILES.items():
+            if result_file == file_name:
+                return file_id
+        return None
+
+    def save(self, file_id, rows, output_folder):
+        """
+        算出結果を保存し、評価指標ファイルを出力する
+        :param file_id: 評価指標ファイルのID（IF101 など）
+        :param rows: 算出結果（列名をキーとした辞書）のリスト
+        :param output_folder: 評価指標ファイルの出力先フォルダ
+        """
+        self.write(file_id, rows)
+        self.export_csv(
+            file_id,
+            os.path.join(output_folder, self.RESULT_FILES[file_id]),
+        )
+
+    def write(self, file_id, rows):
+        """
+        算出結果をGeoPackageのテーブルに一括で保存する
+        :param file_id: 評価指標ファイルのID（IF101 など）
+        :param rows: 算出結果（列名をキーとした辞書）のリスト
+        """
+        if not rows:
+            raise Exception(self.tr("The data to export is empty."))
+
+        # 先頭行の項目順を列の順とする
+        columns = list(rows[0].keys())
+        values = [[row.get(column) for column in columns] for row in rows]
+        fields = [
+            (column, self.__get_field_type([value[index] for value in values]))
+            for index, column in enumerate(columns)
+        ]
+        table_name = self.get_table_name(file_id)
+        self.gpkg_manager.write_table(table_name, fields, values)
+
+        # 実数の列の整数値（fid は書き込み順に 1 から）
+        int_cells = [
+            [column, row_index + 1]
+            for index, (column, field_type) in enumerate(fields)
+            if field_type == ogr.OFTReal
+            for row_index, value in enumerate(values)
+            if isinstance(value[index], int)
+            and not isinstance(value[index], bool)
+        ]
+        int_cells_table = f"{table_name}{self.INT_CELLS_SUFFIX}"
+        if int_cells:
+            self.gpkg_manager.write_table(
+                int_cells_table,
+                [
+                    ('column_name', ogr.OFTString),
+                    ('row_fid', ogr.OFTInteger64),
+                ],
+                int_cells,
+            )
+        else:
+            self.gpkg_manager.delete_layer(int_cells_table)
+
+    def read(self, file_id):
+        """
+        保存した算出結果を読み込む
+        :param file_id: 評価指標ファイルのID（IF101 など）
+        :return: (列名のリスト, 値のタプルのリスト)（未保存の場合は None）
+        """
+        table_name = self.get_table_name(file_id)
+        if not os.path.exists(self.gpkg_manager.geopackage_path):
+            return None
+        layers = self.gpkg_manager.get_layers()
+        if table_name not in layers:
+            return None
+
+        quoted = '"' + table_name.replace('"', '""') + '"'
+        columns = [
+            row[1]
+            for row in self.gpkg_manager.query(f"PRAGMA table_info({quoted})")
+            if not row[5]  # 主キー（fid）は除く
+        ]
+        select = ", ".join(
+            '"' + column.replace('"', '""') + '"' for column in columns
+        )
+        rows = self.gpkg_manager.query(
+            f"SELECT fid, {select} FROM {quoted} ORDER BY fid"
+        )
+
+        # 保存時に整数だった値は整数に戻す
+        int_cells_table = f"{table_name}{self.INT_CELLS_SUFFIX}"
+        int_cells = set()
+        if int_cells_table in layers:
+            int_cells = {
+                (column, row_fid)
+                for column, row_fid in self.gpkg_manager.query(
+                    f'SELECT column_name, row_fid FROM "{int_cells_table}"'
+                )
+            }
+        return columns, [
+            tuple(
+                int(value)
+                if isinstance(value, float) and (column, row[0]) in int_cells
+                else value
+                for column, value in zip(columns, row[1:])
+            )
+            for row in rows
+        ]
+
+    def write_csv(self, file_id, stream):
+        """
+        保存した算出結果をCSVとして書き込む
+        :param file_id: 評価指標ファイルのID（IF101 など）
+        :param stream: 書き込み先（テキストモード、改行の変換なし）
+        :return: 書き込んだ場合 True（未保存の場合は False）
+        """
+        result = self.read(file_id)
+        if result is None:
+            return False
+
+        columns, rows = result
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        writer.writerows(
+            [self.NA_TEXT if value is None else value for value in row]
+            for row in rows
+        )
+        return True
+
+    def get_csv_text(self, file_id):
+        """
+        保存した算出結果をCSVの文字列として取得する
+        :param file_id: 評価指標ファイルのID（IF101 など）
+        :return: CSVの文字列（未保存の場合は None）
+        """
+        stream = io.StringIO(newline='')
+        if not self.write_csv(file_id, stream):
+            return None
+        return stream.getvalue()
+
+    def export_csv(self, file_id, file_path):
+        """
+        保存した算出結果を評価指標ファイルとして出力する
+        :param file_id: 評価指標ファイルのID（IF101 など）
+        :param file_path: 出力先のパス
+        """
+        try:
+            with open(
+                file_path, mode='w', newline='', encoding='utf-8'
+            ) as csv_file:
+                if not self.write_csv(file_id, csv_file):
+                    raise Exception(self.tr("The data to export is empty."))
+
+            QgsMessageLog.logMessage(
+                self.tr("File export completed: %1.").replace(
+                    "%1", file_path
+                ),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+        except Exception as e:
+            # エラーメッセージのログ出力
+            QgsMessageLog.logMessage(
+                self.tr("An error occurred during file export: %1.").replace(
+                    "%1", str(e)
+                ),
+                self.tr("Plugin"),
+                Qgis.Critical,
+            )
+            raise e
+
+    def __get_field_type(self, values):
+        """列の値からフィールドの型を判定（欠損値は除く）"""
+        values = [value for value in values if value is not None]
+        if values and all(
+            isinstance(value, int) and not isinstance(value, bool)
+            for value in values
+        ):
+            return ogr.OFTInteger64
+        if values and all(
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+            for value in values
+        ):
+            return ogr.OFTReal
+        return ogr.OFTString
@@ -10,7 +10,6 @@ import os
 import csv
 import re
 
-import chardet
 import processing
 from qgis.core import (
     QgsMessageLog,
@@ -19,19 +18,25 @@ from qgis.core import (
     QgsFeatureRequest,
     QgsField,
     QgsFeature,
-    QgsSpatialIndex,
 )
 from PyQt5.QtCore import QCoreApplication, QVariant
 from PyQt5.QtWidgets import QApplication
 
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
 from ...models.population import PopulationModel
+from .progress_manager import ProgressManager
+from .spatial_index_registry import SpatialIndexRegistry
 
 class PopulationDataGenerator:
     """人口データ取り込み・作成"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
         # インプットデータパス
         self.base_path = base_path
 
@@ -46,7 +51,7 @@ class PopulationDataGenerator:
         try:
             # base_path 配下の「250mメッシュ」フォルダを再帰的に探索してShapefileを収集
             mesh_folder = os.path.join(self.base_path, "250mメッシュ")
-            shp_files = self._get_shapefiles(mesh_folder)
+            shp_files = self.source_catalog.get_shapefiles(mesh_folder)
 
             if not shp_files:
                 raise Exception(
@@ -192,15 +197,6 @@ class PopulationDataGenerator:
 
             return False
 
-    def _get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
     def rename_fields(self, layer, field_mapping):
         """指定されたフィールドマッピングを基にレイヤ内のフィールド名を変更する"""
         provider = layer.dataProvider()
@@ -215,15 +211,6 @@ class PopulationDataGenerator:
         """指定されたディレクトリ配下のすべての年度フォルダから人口データを再帰的に収集する"""
         population_data = []
 
-        def find_txt_files(directory):
-            txt_files = []
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    if file.endswith(".txt"):
-                        file_path = os.path.join(root, file)
-                        txt_files.append(file_path)
-            return txt_files
-
         for year_folder in os.listdir(base_path):
             if self.check_canceled():
                 return  # キャンセルチェック
@@ -239,39 +226,14 @@ class PopulationDataGenerator:
                     Qgis.Info,
                 )
 
-                txt_files = find_txt_files(year_path)
+                # テキストファイルとエンコードはカタログから取得
+                # （更新されていないファイルは再検出しない）
+                txt_files = self.source_catalog.get_files(year_path, ".txt")
 
                 for file_path in txt_files:
-                    # ファイルエンコード検出
-                    with open(file_path, 'rb') as f:
-                        raw_data = f.read()
-                        detected_encoding = chardet.detect(raw_data)['encoding']
-                        msg = self.tr(
-                            "Population data creation - Detected encoding: %1 "
-                            "for file: %2"
-                        ).replace(
-                            "%1", detected_encoding
-                        ).replace(
-                            "%2", file_path
-                        )
-
-                        QgsMessageLog.logMessage(
-                            msg,
-                            self.tr("Plugin"),
-                            Qgis.Info,
-                        )
-
-                    if detected_encoding is None:
-                        msg = self.tr(
-                            "Encoding detection error for file: %1. "
-                            "Attempting to detect using an alternative method."
-                        ).replace("%1", file_path)
-                        QgsMessageLog.logMessage(
-                            msg,
-                            self.tr("Plugin"),
-                            Qgis.Warning,
-                        )
-                        detected_encoding = self.__detect_encoding(file_path)
+                    detected_encoding = self.source_catalog.get_encoding(
+                        file_path
+                    )
 
                     msg = self.tr(
                         "Population data creation - Detected encoding: %1 "
@@ -394,6 +356,7 @@ class PopulationDataGenerator:
                 'PREFIX': '',
                 'OUTPUT': 'memory:',
             },
+            feedback=ProgressManager.get_feedback(),
         )
 
         return result['OUTPUT']
@@ -405,7 +368,9 @@ class PopulationDataGenerator:
             future_population_folder = os.path.join(
                 self.base_path, "500mメッシュ別将来人口", "H30国政局推計"
             )
-            shp_files = self._get_shapefiles(future_population_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                future_population_folder
+            )
 
             if not shp_files:
                 data_name = self.tr("future population")
@@ -467,6 +432,7 @@ class PopulationDataGenerator:
                 'CRS': layers[0].crs().authid(),
                 'OUTPUT': 'memory:merged_layer',
             },
+            feedback=ProgressManager.get_feedback(),
         )
 
         return result['OUTPUT']
@@ -530,11 +496,6 @@ class PopulationDataGenerator:
             # フィールド追加更新
             layer.updateFields()
 
-            # 空間インデックスを作成（250mメッシュレイヤに対して）
-            QgsSpatialIndex(
-                layer.getFeatures()
-            )  # 空間インデックスの作成
-
             # 最新年度の population キー
             latest_year = max(PopulationModel.year_mappings.keys())
 
@@ -847,30 +808,10 @@ class PopulationDataGenerator:
 
     def __extract(self, target_layer, buffer_layer):
         """バッファレイヤ内に存在するフィーチャを抽出"""
-        # 空間インデックスの作成
-        processing.run("native:createspatialindex", {'INPUT': target_layer})
-        processing.run("native:createspatialindex", {'INPUT': buffer_layer})
-
-        # バッファ内のフィーチャを抽出
-        result = processing.run(
-            "native:extractbylocation",
-            {
-                'INPUT': target_layer,
-                'PREDICATE': [0],  # intersect
-                'INTERSECT': buffer_layer,
-                'OUTPUT': 'TEMPORARY_OUTPUT',
-            },
-        )['OUTPUT']
-
-        return result
-
-    def __detect_encoding(self, file_path):
-        """エンコード検出"""
-        encodings = ['shift_jis', 'cp932', 'utf-8', 'utf-16']
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    f.read()
-                    return encoding
-            except UnicodeDecodeError:
-                continue
+        # 同じレイヤの空間インデックスは作成済みのものを再利用
+        spatial_index_registry = SpatialIndexRegistry._instance
+        return spatial_index_registry.extract_by_location(
+            target_layer,
+            buffer_layer,
+            SpatialIndexRegistry.PREDICATE_INTERSECTS,
+        )
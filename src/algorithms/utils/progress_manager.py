@@ -0,0 +1,88 @@
+"""
+/***************************************************************************
+ *
+ * 進捗・キャンセル管理
+ *
+ ***************************************************************************/
+"""
+
+from qgis.core import QgsProcessingFeedback
+from PyQt5.QtCore import QCoreApplication
+
+
+class ProgressManager:
+    """進捗・キャンセル管理（processing.run の進捗を処理段階の進捗に反映）"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ProgressManager, cls).__new__(cls)
+            cls._instance.progress_callback = None
+            cls._instance.feedback = QgsProcessingFeedback()
+            cls._instance.stage = None
+            cls._instance.stage_range = (0, 0)
+            cls._instance.progress = -1
+            cls._instance.run_start = 0
+            cls._instance.run_percent = 0
+        return cls._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("ProgressManager", message)
+
+    @classmethod
+    def get_feedback(cls):
+        """processing.run に渡すフィードバック（未初期化の場合は None）"""
+        if cls._instance is None:
+            return None
+        return cls._instance.feedback
+
+    def init(self, progress_callback=None):
+        """初期化"""
+        # キャンセル状態はフィードバック単位で保持されるため作り直す
+        self.progress_callback = progress_callback
+        self.feedback = QgsProcessingFeedback()
+        self.feedback.progressChanged.connect(self.__on_progress_changed)
+        self.stage = None
+        self.stage_range = (0, 0)
+        self.progress = -1
+        self.run_start = 0
+        self.run_percent = 0
+
+    def start_stage(self, stage, start, end):
+        """処理段階の開始（段階内の進捗を start～end の範囲に割り当て）"""
+        self.stage = stage
+        self.stage_range = (start, end)
+        self.run_start = start
+        self.run_percent = 0
+        self.set_progress(start)
+
+    def set_progress(self, value):
+        """全体の進捗を通知（減少する値は通知しない）"""
+        value = int(value)
+        if value <= self.progress:
+            return
+        self.progress = value
+        if self.progress_callback:
+            self.progress_callback(value, self.stage)
+
+    def cancel(self):
+        """実行中の processing.run を含めてキャンセル"""
+        self.feedback.cancel()
+
+    def is_canceled(self):
+        """キャンセル状態を確認"""
+        return self.feedback.isCanceled()
+
+    def __on_progress_changed(self, percent):
+        """processing.run の進捗を処理段階の範囲に換算"""
+        # 進捗が戻った場合は次のアルゴリズムの開始とみなす
+        if percent < self.run_percent:
+            self.run_start = self.progress
+        self.run_percent = percent
+
+        # 段階内で何回実行されても終了値を超えないよう、残りの半分を割り当て
+        _, end = self.stage_range
+        self.set_progress(
+            self.run_start + (end - self.run_start) * percent / 200
+        )
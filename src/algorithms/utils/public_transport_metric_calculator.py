@@ -7,27 +7,33 @@
 """
 
 import re
-import csv
 from qgis.core import (
     QgsMessageLog,
     Qgis,
     QgsVectorLayer,
     QgsFeature,
-    QgsAggregateCalculator,
 )
 from PyQt5.QtCore import QCoreApplication
 import processing
 from .gpkg_manager import GpkgManager
+from .metric_result_store import MetricResultStore, round_or_na
+from .scratch_manager import ScratchManager
+from .layer_aggregator import LayerAggregator
+from .progress_manager import ProgressManager
+from .spatial_index_registry import SpatialIndexRegistry
 
 
 class PublicTransportMetricCalculator:
     """公共交通関連評価指標算出"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         self.base_path = base_path
 
         self.check_canceled = check_canceled_callback
 
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.scratch_manager = ScratchManager._instance
 
     def tr(self, message):
         """翻訳用のメソッド"""
@@ -110,11 +116,13 @@ class PublicTransportMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': centroid_layer}
+                "native:createspatialindex",
+                {'INPUT': centroid_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            centroid_layer = self.gpkg_manager.add_layer(
-                centroid_layer, "tmp_building_centroids", None, False
+            centroid_layer = self.scratch_manager.add_layer(
+                centroid_layer, "tmp_building_centroids"
             )
             if not centroid_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -254,81 +262,98 @@ class PublicTransportMetricCalculator:
                 land_use_buildings, bus_stop_buffers_layer
             )
 
+            # 全年度の人口・交通流動を各レイヤ1回の走査でまとめて集計
+            pop_requests = [
+                (f"{year}_population", None) for year in unique_years
+            ]
+            pop_sums = {}
+            for name, layer in (
+                ('total', centroid_layer),
+                ('area01', urban_planning_buildings),
+                ('area02', land_use_buildings),
+                ('area03', urban_buildings),
+                ('area04', residential_buildings),
+                ('train00', railway_buildings),
+                ('train01', urban_planning_railway_buildings),
+                ('train02', land_use_railway_buildings),
+                ('train03', urban_railway_buildings),
+                ('train04', residential_railway_buildings),
+                ('buss00', bus_buildings),
+                ('buss01', urban_planning_bus_buildings),
+                ('buss02', land_use_bus_buildings),
+                ('buss03', urban_bus_buildings),
+                ('buss04', residential_bus_buildings),
+            ):
+                if self.check_canceled():
+                    return  # キャンセルチェック
+                pop_sums[name] = {
+                    sum_field: value
+                    for (sum_field, _), value in self.__aggregate_sums(
+                        layer, pop_requests
+                    ).items()
+                }
+
+            trip_fields = [
+                'total_trip_count',
+                'rail_total_trip_count',
+                'bus_total_trip_count',
+            ]
+            trip_sums = self.__aggregate_sums(
+                traffics_layer,
+                [
+                    (trip_field, f"survey_year = {year}")
+                    for year in unique_years
+                    for trip_field in trip_fields
+                ],
+            )
+
             for year in unique_years:
                 if self.check_canceled():
                     return  # キャンセルチェック
                 year_field = f"{year}_population"
 
                 # 総人口を集計
-                total_pop = self.__aggregate_sum(centroid_layer, year_field)
+                total_pop = pop_sums['total'][year_field]
 
                 # 都市計画区域内の人口
-                total_area01_pop = self.__aggregate_sum(
-                    urban_planning_buildings, year_field
-                )
+                total_area01_pop = pop_sums['area01'][year_field]
 
                 # 用途地域内の人口
-                total_area02_pop = self.__aggregate_sum(
-                    land_use_buildings, year_field
-                )
+                total_area02_pop = pop_sums['area02'][year_field]
 
                 # 都市機能誘導区域内の人口
-                total_area03_pop = self.__aggregate_sum(
-                    urban_buildings, year_field
-                )
+                total_area03_pop = pop_sums['area03'][year_field]
 
                 # 居住誘導区域内の人口
-                total_area04_pop = self.__aggregate_sum(
-                    residential_buildings, year_field
-                )
+                total_area04_pop = pop_sums['area04'][year_field]
 
                 if self.check_canceled():
                     return  # キャンセルチェック
                 # 鉄道カバー圏人口
                 # 市内の鉄道カバー圏人口
-                train_area00_pop = self.__aggregate_sum(
-                    railway_buildings, year_field
-                )
+                train_area00_pop = pop_sums['train00'][year_field]
                 # 都市計画区域内の鉄道カバー圏人口
-                train_area01_pop = self.__aggregate_sum(
-                    urban_planning_railway_buildings, year_field
-                )
+                train_area01_pop = pop_sums['train01'][year_field]
                 # 用途地域内の鉄道カバー圏人口
-                train_area02_pop = self.__aggregate_sum(
-                    land_use_railway_buildings, year_field
-                )
+                train_area02_pop = pop_sums['train02'][year_field]
                 # 都市機能誘導区域内の鉄道カバー圏人口
-                train_area03_pop = self.__aggregate_sum(
-                    urban_railway_buildings, year_field
-                )
+                train_area03_pop = pop_sums['train03'][year_field]
                 # 居住誘導区域内の鉄道カバー圏人口
-                train_area04_pop = self.__aggregate_sum(
-                    residential_railway_buildings, year_field
-                )
+                train_area04_pop = pop_sums['train04'][year_field]
 
                 if self.check_canceled():
                     return  # キャンセルチェック
                 # バスカバー圏人口
                 # 市内のバスカバー圏人口
-                buss_area00_pop = self.__aggregate_sum(
-                    bus_buildings, year_field
-                )
+                buss_area00_pop = pop_sums['buss00'][year_field]
                 # 都市計画区域内のバスカバー圏人口
-                buss_area01_pop = self.__aggregate_sum(
-                    urban_planning_bus_buildings, year_field
-                )
+                buss_area01_pop = pop_sums['buss01'][year_field]
                 # 用途地域内のバスカバー圏人口
-                buss_area02_pop = self.__aggregate_sum(
-                    land_use_bus_buildings, year_field
-                )
+                buss_area02_pop = pop_sums['buss02'][year_field]
                 # 都市機能誘導区域内のバスカバー圏人口
-                buss_area03_pop = self.__aggregate_sum(
-                    urban_bus_buildings, year_field
-                )
+                buss_area03_pop = pop_sums['buss03'][year_field]
                 # 居住誘導区域内のバスカバー圏人口
-                buss_area04_pop = self.__aggregate_sum(
-                    residential_bus_buildings, year_field
-                )
+                buss_area04_pop = pop_sums['buss04'][year_field]
 
                 if self.check_canceled():
                     return  # キャンセルチェック
@@ -351,19 +376,19 @@ class PublicTransportMetricCalculator:
                 rate_train_area00_pop = (
                     (train_area00_pop / total_pop) * 100
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
                 # 市内のバスカバー圏人口割合
                 rate_buss_area00_pop = (
                     (buss_area00_pop / total_pop) * 100
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
                 # 市内の公共交通カバー圏人口割合
                 rate_masstra_area00_pop = (
                     (masstra_area00_pop / total_pop) * 100
                     if total_pop > 0
-                    else '―'
+                    else None
                 )
 
                 if self.check_canceled():
@@ -372,19 +397,19 @@ class PublicTransportMetricCalculator:
                 rate_train_area01_pop = (
                     (train_area01_pop / total_area01_pop) * 100
                     if total_area01_pop > 0
-                    else '―'
+                    else None
                 )
                 # 都市計画区域内のバスカバー圏人口割合
                 rate_buss_area01_pop = (
                     (buss_area01_pop / total_area01_pop) * 100
                     if total_area01_pop > 0
-                    else '―'
+                    else None
                 )
                 # 都市計画区域内の公共交通カバー圏人口割合
                 rate_masstra_area01_pop = (
                     (masstra_area01_pop / total_area01_pop) * 100
                     if total_area01_pop > 0
-                    else '―'
+                    else None
                 )
 
                 if self.check_canceled():
@@ -393,19 +418,19 @@ class PublicTransportMetricCalculator:
                 rate_train_area02_pop = (
                     (train_area02_pop / total_area02_pop) * 100
                     if total_area02_pop > 0
-                    else '―'
+                    else None
                 )
                 # 用途地域内のバスカバー圏人口割合
                 rate_buss_area02_pop = (
                     (buss_area02_pop / total_area02_pop) * 100
                     if total_area02_pop > 0
-                    else '―'
+                    else None
                 )
                 # 用途地域内の公共交通カバー圏人口割合
                 rate_masstra_area02_pop = (
                     (masstra_area02_pop / total_area02_pop) * 100
                     if total_area02_pop > 0
-                    else '―'
+                    else None
                 )
 
                 if self.check_canceled():
@@ -414,19 +439,19 @@ class PublicTransportMetricCalculator:
                 rate_train_area03_pop = (
                     (train_area03_pop / total_area03_pop) * 100
                     if total_area03_pop > 0
-                    else '―'
+                    else None
                 )
                 # 都市機能誘導区域内のバスカバー圏人口割合
                 rate_buss_area03_pop = (
                     (buss_area03_pop / total_area03_pop) * 100
                     if total_area03_pop > 0
-                    else '―'
+                    else None
                 )
                 # 都市機能誘導区域内の公共交通カバー圏人口割合
                 rate_masstra_area03_pop = (
                     (masstra_area03_pop / total_area03_pop) * 100
                     if total_area03_pop > 0
-                    else '―'
+                    else None
                 )
 
                 if self.check_canceled():
@@ -435,32 +460,26 @@ class PublicTransportMetricCalculator:
                 rate_train_area04_pop = (
                     (train_area04_pop / total_area04_pop) * 100
                     if total_area04_pop > 0
-                    else '―'
+                    else None
                 )
                 # 居住誘導区域内のバスカバー圏人口割合
                 rate_buss_area04_pop = (
                     (buss_area04_pop / total_area04_pop) * 100
                     if total_area04_pop > 0
-                    else '―'
+                    else None
                 )
                 # 居住誘導区域内の公共交通カバー圏人口割合
                 rate_masstra_area04_pop = (
                     (masstra_area04_pop / total_area04_pop) * 100
                     if total_area04_pop > 0
-                    else '―'
+                    else None
                 )
 
                 # 交通流動
                 condition = f"survey_year = {year}"
-                total = self.__aggregate_sum(
-                    traffics_layer, 'total_trip_count', condition
-                )
-                train = self.__aggregate_sum(
-                    traffics_layer, 'rail_total_trip_count', condition
-                )
-                bus = self.__aggregate_sum(
-                    traffics_layer, 'bus_total_trip_count', condition
-                )
+                total = trip_sums[('total_trip_count', condition)]
+                train = trip_sums[('rail_total_trip_count', condition)]
+                bus = trip_sums[('bus_total_trip_count', condition)]
 
                 if total > 0:
                     # 公共交通分担率
@@ -470,9 +489,9 @@ class PublicTransportMetricCalculator:
                     # 公共交通分担率（バス）
                     share_public_transportation_bus = (bus / total) * 100
                 else:
-                    share_public_transportation = '―'
-                    share_public_transportation_train = '―'
-                    share_public_transportation_bus = '―'
+                    share_public_transportation = None
+                    share_public_transportation_train = None
+                    share_public_transportation_bus = None
 
                 # 前年度のデータがあれば、変化率を計算
                 if data_list:
@@ -486,7 +505,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_train_area01_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_train_area01_pop
@@ -502,10 +521,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Train_Area01_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_train_area01_pop_change = '―'
+                        rate_train_area01_pop_change = None
 
                     # 都市計画区域内のバスカバー圏人口割合の変化率
                     if isinstance(
@@ -515,7 +534,7 @@ class PublicTransportMetricCalculator:
                             int, float)
                     ):
                         rate_buss_area01_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_buss_area01_pop
@@ -529,10 +548,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Buss_Area01_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_buss_area01_pop_change = '―'
+                        rate_buss_area01_pop_change = None
 
                     # 都市計画区域内の公共交通カバー圏人口割合の変化率
                     if isinstance(
@@ -542,7 +561,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_masstra_area01_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_masstra_area01_pop
@@ -558,10 +577,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_MassTra_Area01_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_masstra_area01_pop_change = '―'
+                        rate_masstra_area01_pop_change = None
 
                     # 用途地域内の鉄道カバー圏人口割合の変化率
                     if isinstance(
@@ -571,7 +590,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_train_area02_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_train_area02_pop
@@ -587,10 +606,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Train_Area02_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_train_area02_pop_change = '―'
+                        rate_train_area02_pop_change = None
 
                     # 用途地域内のバスカバー圏人口割合の変化率
                     if isinstance(
@@ -600,7 +619,7 @@ class PublicTransportMetricCalculator:
                             int, float)
                     ):
                         rate_buss_area02_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_buss_area02_pop
@@ -614,10 +633,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Buss_Area02_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_buss_area02_pop_change = '―'
+                        rate_buss_area02_pop_change = None
 
                     # 用途地域内の公共交通カバー圏人口割合の変化率
                     if isinstance(
@@ -627,7 +646,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_masstra_area02_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_masstra_area02_pop
@@ -643,10 +662,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_MassTra_Area02_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_masstra_area02_pop_change = '―'
+                        rate_masstra_area02_pop_change = None
 
                     # 都市機能誘導区域内の鉄道カバー圏人口割合の変化率
                     if isinstance(
@@ -656,7 +675,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_train_area03_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_train_area03_pop
@@ -672,10 +691,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Train_Area03_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_train_area03_pop_change = '―'
+                        rate_train_area03_pop_change = None
 
                     # 都市機能誘導区域内のバスカバー圏人口割合の変化率
                     if isinstance(
@@ -685,7 +704,7 @@ class PublicTransportMetricCalculator:
                             int, float)
                     ):
                         rate_buss_area03_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_buss_area03_pop
@@ -699,10 +718,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Buss_Area03_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_buss_area03_pop_change = '―'
+                        rate_buss_area03_pop_change = None
 
                     # 都市機能誘導区域内の公共交通カバー圏人口割合の変化率
                     if isinstance(
@@ -712,7 +731,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_masstra_area03_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_masstra_area03_pop
@@ -728,10 +747,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_MassTra_Area03_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_masstra_area03_pop_change = '―'
+                        rate_masstra_area03_pop_change = None
 
                     # 居住誘導区域内の鉄道カバー圏人口割合の変化率
                     if isinstance(
@@ -741,7 +760,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_train_area04_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_train_area04_pop
@@ -757,10 +776,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Train_Area04_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_train_area04_pop_change = '―'
+                        rate_train_area04_pop_change = None
 
                     # 居住誘導区域内のバスカバー圏人口割合の変化率
                     if isinstance(
@@ -770,7 +789,7 @@ class PublicTransportMetricCalculator:
                             int, float)
                     ):
                         rate_buss_area04_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_buss_area04_pop
@@ -784,10 +803,10 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_Buss_Area04_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_buss_area04_pop_change = '―'
+                        rate_buss_area04_pop_change = None
 
                     # 居住誘導区域内の公共交通カバー圏人口割合の変化率
                     if isinstance(
@@ -797,7 +816,7 @@ class PublicTransportMetricCalculator:
                         (int, float),
                     ):
                         rate_masstra_area04_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         rate_masstra_area04_pop
@@ -813,24 +832,24 @@ class PublicTransportMetricCalculator:
                                 1,
                             )
                             if previous_year_data['Rate_MassTra_Area04_Pop'] > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_masstra_area04_pop_change = '―'
+                        rate_masstra_area04_pop_change = None
 
                 else:
-                    rate_train_area01_pop_change = '―'
-                    rate_buss_area01_pop_change = '―'
-                    rate_masstra_area01_pop_change = '―'
-                    rate_train_area02_pop_change = '―'
-                    rate_buss_area02_pop_change = '―'
-                    rate_masstra_area02_pop_change = '―'
-                    rate_train_area03_pop_change = '―'
-                    rate_buss_area03_pop_change = '―'
-                    rate_masstra_area03_pop_change = '―'
-                    rate_train_area04_pop_change = '―'
-                    rate_buss_area04_pop_change = '―'
-                    rate_masstra_area04_pop_change = '―'
+                    rate_train_area01_pop_change = None
+                    rate_buss_area01_pop_change = None
+                    rate_masstra_area01_pop_change = None
+                    rate_train_area02_pop_change = None
+                    rate_buss_area02_pop_change = None
+                    rate_masstra_area02_pop_change = None
+                    rate_train_area03_pop_change = None
+                    rate_buss_area03_pop_change = None
+                    rate_masstra_area03_pop_change = None
+                    rate_train_area04_pop_change = None
+                    rate_buss_area04_pop_change = None
+                    rate_masstra_area04_pop_change = None
 
                 # データを辞書にまとめる
                 year_data = {
@@ -941,10 +960,9 @@ class PublicTransportMetricCalculator:
                 # 辞書をリストに追加
                 data_list.append(year_data)
 
-            # ファイルパスを指定してエクスポート
-            self.export(
-                self.base_path + '\\IF104_公共交通関連評価指標ファイル.csv',
-                data_list,
+            # 算出結果を保存し、評価指標ファイルを出力
+            MetricResultStore(self.gpkg_manager).save(
+                'IF104', data_list, self.base_path
             )
 
             return
@@ -958,93 +976,22 @@ class PublicTransportMetricCalculator:
             )
             raise e
 
-    def export(self, file_path, data):
-        """エクスポート処理"""
-        try:
-            if not data:
-                raise Exception(self.tr("The data to export is empty."))
-
-            # データ項目からヘッダーを取得
-            headers = list(data[0].keys())
-
-            # CSVファイル書き込み
-            with open(
-                file_path, mode='w', newline='', encoding='utf-8'
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
-
-            msg = self.tr(
-                "File export completed: %1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
-            )
-            return True
-        except Exception as e:
-            # エラーメッセージのログ出力
-            msg = self.tr(
-                "An error occurred during file export: %1."
-            ).replace("%1", e)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Critical,
-            )
-            raise e
-
-    def round_or_na(self, value, decimal_places, threshold=None):
-        """丸め処理"""
-        if value is None or (threshold is not None and value <= threshold):
-            return '―'
-        else:
-            return round(value, decimal_places)
-
     def __extract(self, target_layer, buffer_layer):
         """バッファレイヤ内に存在するフィーチャを抽出"""
-        # 空間インデックスの作成
-        processing.run("native:createspatialindex", {'INPUT': target_layer})
-        processing.run("native:createspatialindex", {'INPUT': buffer_layer})
-
-        # バッファ内のフィーチャを抽出
-        result = processing.run(
-            "native:extractbylocation",
-            {
-                'INPUT': target_layer,
-                'PREDICATE': [6],  # within
-                'INTERSECT': buffer_layer,
-                'OUTPUT': 'TEMPORARY_OUTPUT',
-            },
-        )['OUTPUT']
-
-        return result
-
-    def __aggregate_sum(self, target_layer, sum_field, condition=None):
+        # 同じレイヤの空間インデックスは作成済みのものを再利用
+        spatial_index_registry = SpatialIndexRegistry._instance
+        return spatial_index_registry.extract_by_location(
+            target_layer,
+            buffer_layer,
+            SpatialIndexRegistry.PREDICATE_WITHIN,
+        )
+
+    def __aggregate_sums(self, target_layer, requests):
         """
-        条件に基づいて集計を行う
+        複数の集計を1回の走査でまとめて行う
         :param target_layer: 対象のレイヤ
-        :param sum_field: 集計するフィールド名
-        :param condition: フィルタリングする条件 (QgsExpression 形式の条件式)
-        :return: 集計結果
+        :param requests: (集計するフィールド名, フィルタリングする条件) のリスト
+        :return: (集計するフィールド名, 条件) をキーとした集計結果
         """
-        # 条件がある場合はフィルタリング
-        if condition is not None:
-            # フィルタリングされたレイヤを作成
-            target_layer.setSubsetString(condition)
-
-        # 集計
-        result = target_layer.aggregate(
-            QgsAggregateCalculator.Aggregate.Sum, sum_field
-        )
-        result = int(result[0]) if result[0] is not None else 0
-
-        # フィルタ解除
-        if condition is not None:
-            target_layer.setSubsetString('')
-
-        return result
+        sums = LayerAggregator(target_layer).sums(requests)
+        return {key: int(value) for key, value in sums.items()}
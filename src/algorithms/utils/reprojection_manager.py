@@ -0,0 +1,292 @@
+"""
+/***************************************************************************
+ *
+ * 座標変換管理
+ *
+ ***************************************************************************/
+"""
+
+import processing
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsProject,
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsGeometry,
+    QgsFeatureRequest,
+)
+from PyQt5.QtCore import QCoreApplication
+
+from .gpkg_manager import GpkgManager
+from .progress_manager import ProgressManager
+
+
+class ReprojectionManager:
+    """座標変換管理"""
+    _instance = None
+
+    # 距離・面積計算に使用するメートル単位の座標系（平面直角座標系の判定前）
+    DEFAULT_METRIC_CRS = "EPSG:3857"
+
+    # 平面直角座標系（JGD2011）の系番号ごとの原点（緯度, 経度）
+    # EPSGコードは 6668 + 系番号（第I系: EPSG:6669 ～ 第XIX系: EPSG:6687）
+    PLANE_ORIGINS = {
+        1: (33.0, 129.5),
+        2: (33.0, 131.0),
+        3: (36.0, 132.166667),
+        4: (33.0, 133.5),
+        5: (36.0, 134.333333),
+        6: (36.0, 136.0),
+        7: (36.0, 137.166667),
+        8: (36.0, 138.5),
+        9: (36.0, 139.833333),
+        10: (40.0, 140.833333),
+        11: (44.0, 140.25),
+        12: (44.0, 142.25),
+        13: (44.0, 144.25),
+        14: (26.0, 142.0),
+        15: (26.0, 127.5),
+        16: (26.0, 124.0),
+        17: (26.0, 131.0),
+        18: (20.0, 136.0),
+        19: (26.0, 154.0),
+    }
+
+    # 都道府県コード（JIS X 0401、zones の pref）ごとの適用系番号
+    # （複数系にまたがる場合は原点が最も近い系を採用）
+    PREFECTURE_ZONES = {
+        "01": [11, 12, 13],  # 北海道
+        "02": [10],  # 青森県
+        "03": [10],  # 岩手県
+        "04": [10],  # 宮城県
+        "05": [10],  # 秋田県
+        "06": [10],  # 山形県
+        "07": [9],  # 福島県
+        "08": [9],  # 茨城県
+        "09": [9],  # 栃木県
+        "10": [9],  # 群馬県
+        "11": [9],  # 埼玉県
+        "12": [9],  # 千葉県
+        "13": [9, 14, 18, 19],  # 東京都
+        "14": [9],  # 神奈川県
+        "15": [8],  # 新潟県
+        "16": [7],  # 富山県
+        "17": [7],  # 石川県
+        "18": [6],  # 福井県
+        "19": [8],  # 山梨県
+        "20": [8],  # 長野県
+        "21": [7],  # 岐阜県
+        "22": [8],  # 静岡県
+        "23": [7],  # 愛知県
+        "24": [6],  # 三重県
+        "25": [6],  # 滋賀県
+        "26": [6],  # 京都府
+        "27": [6],  # 大阪府
+        "28": [5],  # 兵庫県
+        "29": [6],  # 奈良県
+        "30": [6],  # 和歌山県
+        "31": [5],  # 鳥取県
+        "32": [3],  # 島根県
+        "33": [5],  # 岡山県
+        "34": [3],  # 広島県
+        "35": [3],  # 山口県
+        "36": [4],  # 徳島県
+        "37": [4],  # 香川県
+        "38": [4],  # 愛媛県
+        "39": [4],  # 高知県
+        "40": [2],  # 福岡県
+        "41": [2],  # 佐賀県
+        "42": [1],  # 長崎県
+        "43": [2],  # 熊本県
+        "44": [2],  # 大分県
+        "45": [2],  # 宮崎県
+        "46": [1, 2],  # 鹿児島県
+        "47": [15, 16, 17],  # 沖縄県
+    }
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ReprojectionManager, cls).__new__(cls)
+            cls._instance.transforms = {}
+            cls._instance.projected_layers = {}
+            cls._instance.gpkg_manager = None
+            cls._instance.metric_crs = QgsCoordinateReferenceSystem(
+                cls.DEFAULT_METRIC_CRS
+            )
+        return cls._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("ReprojectionManager", message)
+
+    def init(self, gpkg_manager=None):
+        """初期化（gpkg_manager は変換済みレイヤの保存先）"""
+        # 変換・投影済みレイヤのキャッシュを破棄
+        self.transforms = {}
+        self.projected_layers = {}
+        self.gpkg_manager = gpkg_manager
+        self.metric_crs = QgsCoordinateReferenceSystem(
+            self.DEFAULT_METRIC_CRS
+        )
+
+    def get_metric_crs(self):
+        """距離・面積計算に使用する座標系を取得"""
+        return self.metric_crs
+
+    def select_metric_crs(self):
+        """zonesレイヤの重心から平面直角座標系（JGD2011）を判定"""
+        try:
+            zones_layer = self.__get_gpkg_manager().load_layer(
+                'zones', None, withload_project=False
+            )
+            if not zones_layer:
+                raise Exception(self.tr("The %1 layer was not found.")
+                    .replace("%1", "zones"))
+
+            # ゾーンポリゴン全体の重心を経緯度（JGD2011）で取得
+            # （範囲の中心は離島・飛び地を含む場合に市街地から離れるため使用しない）
+            geographic_crs = QgsCoordinateReferenceSystem("EPSG:6668")
+            center = QgsGeometry.collectGeometry([
+                feature.geometry()
+                for feature in zones_layer.getFeatures(
+                    QgsFeatureRequest().setNoAttributes()
+                )
+                if feature.hasGeometry()
+            ]).centroid()
+            center.transform(
+                self.get_transform(zones_layer.crs(), geographic_crs)
+            )
+            center = center.asPoint()
+
+            # 都道府県コードから候補となる系番号を取得
+            pref_index = zones_layer.fields().indexOf("pref")
+            prefs = (
+                zones_layer.uniqueValues(pref_index)
+                if pref_index != -1 else set()
+            )
+            candidates = []
+            for pref in prefs:
+                candidates.extend(
+                    self.PREFECTURE_ZONES.get(self.__get_pref_code(pref), [])
+                )
+            if not candidates:
+                candidates = list(self.PLANE_ORIGINS.keys())
+
+            # 重心に原点が最も近い系を採用
+            zone = min(
+                candidates,
+                key=lambda z: (
+                    (self.PLANE_ORIGINS[z][0] - center.y()) ** 2
+                    + (self.PLANE_ORIGINS[z][1] - center.x()) ** 2
+                ),
+            )
+            self.metric_crs = QgsCoordinateReferenceSystem(
+                f"EPSG:{6668 + zone}"
+            )
+
+            QgsMessageLog.logMessage(
+                self.tr("Metric CRS selected: %1")
+                .replace("%1", self.metric_crs.authid()),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+            return self.metric_crs
+
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                self.tr("Failed to select metric CRS. Using %1: %2")
+                .replace("%1", self.metric_crs.authid())
+                .replace("%2", str(e)),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+            return self.metric_crs
+
+    def get_transform(self, source_crs, dest_crs):
+        """CRSの組み合わせごとに座標変換をキャッシュして取得"""
+        key = (source_crs.authid(), dest_crs.authid())
+        if key not in self.transforms:
+            self.transforms[key] = QgsCoordinateTransform(
+                source_crs, dest_crs, QgsProject.instance()
+            )
+        return self.transforms[key]
+
+    def transform_geometries(self, geometries, source_crs, dest_crs):
+        """ジオメトリのリストを一括で座標変換"""
+        if source_crs == dest_crs:
+            return geometries
+
+        transform = self.get_transform(source_crs, dest_crs)
+        for geometry in geometries:
+            geometry.transform(transform)
+        return geometries
+
+    def reproject_layer(self, layer, dest_crs):
+        """レイヤを指定した座標系のメモリレイヤに変換（同一CRSの場合は変換しない）"""
+        if layer.crs() == dest_crs:
+            return layer
+
+        return processing.run(
+            "native:reprojectlayer",
+            {
+                'INPUT': layer,
+                'TARGET_CRS': dest_crs,
+                'OUTPUT': 'memory:',  # 一時メモリレイヤとして出力
+            },
+            feedback=ProgressManager.get_feedback(),
+        )['OUTPUT']
+
+    def get_projected_layer(self, layer_name, dest_crs=None):
+        """GeoPackageレイヤを座標変換し、変換済みレイヤとして保存・再利用"""
+        if dest_crs is None:
+            dest_crs = self.metric_crs
+
+        gpkg_manager = self.__get_gpkg_manager()
+        projected_name = (
+            f"{layer_name}_{dest_crs.authid().split(':')[-1]}"
+        )
+
+        # 変換済みの場合は保存済みレイヤを使用
+        if projected_name in self.projected_layers:
+            layer = gpkg_manager.load_layer(
+                projected_name, None, withload_project=False
+            )
+            if layer:
+                return layer
+
+        source_layer = gpkg_manager.load_layer(
+            layer_name, None, withload_project=False
+        )
+        if not source_layer:
+            raise Exception(self.tr("The %1 layer was not found.")
+                .replace("%1", layer_name))
+
+        projected_layer = self.reproject_layer(source_layer, dest_crs)
+
+        projected_layer = gpkg_manager.add_layer(
+            projected_layer, projected_name, None, False
+        )
+        if not projected_layer:
+            raise Exception(self.tr("Failed to add layer to GeoPackage."))
+
+        self.projected_layers[projected_name] = layer_name
+
+        QgsMessageLog.logMessage(
+            self.tr("Projected layer %1 created.")
+            .replace("%1", projected_name),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+        return projected_layer
+
+    def __get_gpkg_manager(self):
+        """変換済みレイヤの保存先（未指定の場合は共有インスタンス）"""
+        return self.gpkg_manager or GpkgManager._instance
+
+    def __get_pref_code(self, pref):
+        """都道府県コードを2桁の文字列に変換（"13"、13、"13.0" など）"""
+        try:
+            return f"{int(float(str(pref).strip())):02d}"
+        except (TypeError, ValueError):
+            return None
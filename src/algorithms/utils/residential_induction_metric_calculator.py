@@ -7,27 +7,33 @@
 """
 
 import re
-import csv
 from qgis.core import (
     QgsMessageLog,
     Qgis,
-    QgsAggregateCalculator,
     QgsVectorLayer,
     QgsFeature,
-    QgsCoordinateReferenceSystem,
 )
 from PyQt5.QtCore import QCoreApplication
 import processing
 from .gpkg_manager import GpkgManager
+from .metric_result_store import MetricResultStore, round_or_na
+from .scratch_manager import ScratchManager
+from .reprojection_manager import ReprojectionManager
+from .layer_aggregator import LayerAggregator
+from .progress_manager import ProgressManager
 
 
 class ResidentialInductionMetricCalculator:
     """居住誘導関連評価指標算出機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         self.base_path = base_path
         self.check_canceled = check_canceled_callback
 
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.scratch_manager = ScratchManager._instance
+        self.reprojection_manager = ReprojectionManager._instance
 
     def tr(self, message):
         """翻訳用のメソッド"""
@@ -117,11 +123,13 @@ class ResidentialInductionMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': centroid_layer}
+                "native:createspatialindex",
+                {'INPUT': centroid_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            centroid_layer = self.gpkg_manager.add_layer(
-                centroid_layer, "tmp_building_centroids", None, False
+            centroid_layer = self.scratch_manager.add_layer(
+                centroid_layer, "tmp_building_centroids"
             )
             if not centroid_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -162,23 +170,15 @@ class ResidentialInductionMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': residential_area_layer}
+                "native:createspatialindex",
+                {'INPUT': residential_area_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            # CRS変換先（EPSG:3857）
-            crs_dest = QgsCoordinateReferenceSystem(
-                3857
-            )  # メートル単位の座標系 (EPSG:3857)
-
-            # CRS変換
-            transformed_layer = processing.run(
-                "native:reprojectlayer",
-                {
-                    'INPUT': induction_layer,
-                    'TARGET_CRS': crs_dest,
-                    'OUTPUT': 'memory:',  # メモリーレイヤとして変換後のレイヤを保持
-                },
-            )['OUTPUT']
+            # メートル単位の座標系に変換済みの誘導区域（計算済みの場合は再利用）
+            transformed_layer = self.reprojection_manager.get_projected_layer(
+                'induction_areas'
+            )
 
             # 面積計算
             area = 0  # 居住誘導区域の面積(ha)
@@ -195,8 +195,8 @@ class ResidentialInductionMetricCalculator:
                     # 面積計算 (ヘクタール単位へ変換)
                     outside_area += induction_feature.geometry().area() / 10000
 
-            area = self.round_or_na(area, 1)
-            outside_area = self.round_or_na(outside_area, 1)
+            area = round_or_na(area, 1)
+            outside_area = round_or_na(outside_area, 1)
 
             # 居住誘導区域内の建物を取得
             result = processing.run(
@@ -211,86 +211,99 @@ class ResidentialInductionMetricCalculator:
                     'DISCARD_NONMATCHING': True,
                     'PREFIX': 'induction_area_',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 結合結果の取得
             residential_buildings = result['OUTPUT']
 
-            for i, year in enumerate(unique_years):
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                area_pop = 0
-                outside_area_pop = 0
-
+            # 集計対象の年齢層
+            age_suffixes = {
+                "Age0-14s": "age_0_14",
+                "Age15-64s": "age_15_64",
+                "Age65AndOver": "age_65_",
+                "Age75AndOver": "age_75_total",
+                "Age85AndOver": "age_85_total",
+                "Age95AndOver": "age_95_total",
+            }
+
+            # 全年度の人口を各レイヤ1回の走査でまとめて集計
+            future_field = f"future_{comparative_year}_PT0"
+            total_requests = [(future_field, None)]
+            area_requests = [(future_field, None)]
+            for year in unique_years:
                 year_field = f"{year}_population"
 
-                # 総人口を集計
-                total_pop_result = buildings_layer.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                total_pop = (
-                    int(total_pop_result[0])
-                    if total_pop_result[0] is not None
-                    else 0
-                )
-
                 # SUMフィールドの確認
-                sum_field_name = f"{year_field}"  # フィールド名
                 sum_field_index = residential_buildings.fields().indexFromName(
-                    sum_field_name
+                    year_field
                 )
 
                 # フィールドが存在するか確認
                 if sum_field_index == -1:
                     raise Exception(
-                        f"集計フィールド {sum_field_name} が見つかりません"
+                        f"集計フィールド {year_field} が見つかりません"
                     )
 
-                # 居住誘導区域内人口
-                sum_result = residential_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    sum_field_name,
-                    QgsAggregateCalculator.AggregateParameters(),
-                )
-                area_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
+                total_requests.append((year_field, None))
+                area_requests.append((year_field, None))
+                area_requests.extend(
+                    (f"{year}_{suffix}", None)
+                    for suffix in age_suffixes.values()
                 )
 
+            if self.check_canceled():
+                return  # キャンセルチェック
+            total_sums = LayerAggregator(buildings_layer).sums(total_requests)
+            if self.check_canceled():
+                return  # キャンセルチェック
+            area_sums = LayerAggregator(residential_buildings).sums(
+                area_requests
+            )
+
+            for i, year in enumerate(unique_years):
+                if self.check_canceled():
+                    return  # キャンセルチェック
+                area_pop = 0
+                outside_area_pop = 0
+
+                year_field = f"{year}_population"
+
+                # 総人口を集計
+                total_pop = int(total_sums[(year_field, None)])
+
+                # 居住誘導区域内人口
+                area_pop = int(area_sums[(year_field, None)])
+
                 # 居住誘導区域外人口
                 outside_area_pop = total_pop - area_pop
 
                 # 居住誘導区域内人口割合（Rate_Pop）と居住誘導区域外人口割合（Outside TheArea_Rate_Pop）
                 rate_pop = (
-                    self.round_or_na((area_pop / total_pop) * 100, 2)
+                    round_or_na((area_pop / total_pop) * 100, 2)
                     if total_pop > 0
                     else 0
                 )
                 outside_rate_pop = (
-                    self.round_or_na((outside_area_pop / total_pop) * 100, 2)
+                    round_or_na((outside_area_pop / total_pop) * 100, 2)
                     if total_pop > 0
                     else 0
                 )
 
                 # 居住誘導区域内と外の人口密度を計算
                 pop_area_density = (
-                    self.round_or_na(area_pop / area, 2) if area > 0 else '―'
+                    round_or_na(area_pop / area, 2) if area > 0 else None
                 )  # haあたりの人口密度
                 pop_outside_area_density = (
-                    self.round_or_na(outside_area_pop / outside_area, 2)
+                    round_or_na(outside_area_pop / outside_area, 2)
                     if outside_area > 0
-                    else '―'
+                    else None
                 )
 
                 # 各年齢層のフィールド名を設定
                 age_fields = {
-                    "Age0-14s": f"{year}_age_0_14",
-                    "Age15-64s": f"{year}_age_15_64",
-                    "Age65AndOver": f"{year}_age_65_",
-                    "Age75AndOver": f"{year}_age_75_total",
-                    "Age85AndOver": f"{year}_age_85_total",
-                    "Age95AndOver": f"{year}_age_95_total",
+                    age_key: f"{year}_{suffix}"
+                    for age_key, suffix in age_suffixes.items()
                 }
 
                 area_pop_by_age = {}
@@ -299,33 +312,26 @@ class ResidentialInductionMetricCalculator:
                 for age_key, age_field in age_fields.items():
                     # 各年齢層の人口関連計算
                     # 人口
-                    age_pop_result = residential_buildings.aggregate(
-                        QgsAggregateCalculator.Aggregate.Sum,
-                        age_field,
-                        QgsAggregateCalculator.AggregateParameters(),
-                    )
-                    area_pop_by_age[f"Pop_Area_{age_key}"] = (
-                        int(age_pop_result[0])
-                        if age_pop_result[0] is not None
-                        else 0
+                    area_pop_by_age[f"Pop_Area_{age_key}"] = int(
+                        area_sums[(age_field, None)]
                     )
                     # 人口割合
                     rate_pop_by_age[f"Rate_Pop_Area_{age_key}"] = (
-                        self.round_or_na(
+                        round_or_na(
                             (area_pop_by_age[f"Pop_Area_{age_key}"] / total_pop)
                             * 100,
                             2,
                         )
                         if total_pop > 0
-                        else '―'
+                        else None
                     )
                     # 人口密度
                     density_pop_by_age[f"Rate_Pop_Area_Density_{age_key}"] = (
-                        self.round_or_na(
+                        round_or_na(
                             area_pop_by_age[f"Pop_Area_{age_key}"] / area, 1
                         )
                         if area > 0
-                        else '―'
+                        else None
                     )
 
                 # 前年度のデータがあれば、変化率を計算
@@ -349,7 +355,7 @@ class ResidentialInductionMetricCalculator:
                         previous_total_pop, (int, float)
                     ):
                         rate_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (total_pop - previous_total_pop)
                                     / previous_total_pop
@@ -358,17 +364,17 @@ class ResidentialInductionMetricCalculator:
                                 1,
                             )
                             if previous_total_pop > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_pop_change = '―'
+                        rate_pop_change = None
 
                     # 居住誘導区域内人口割合の変化率を計算
                     if isinstance(rate_pop, (int, float)) and isinstance(
                         previous_rate_pop, (int, float)
                     ):
                         rate_area_pop_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (rate_pop - previous_rate_pop)
                                     / previous_rate_pop
@@ -377,17 +383,17 @@ class ResidentialInductionMetricCalculator:
                                 1,
                             )
                             if previous_rate_pop > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_area_pop_change = '―'
+                        rate_area_pop_change = None
 
                     # 居住誘導区域内人口密度の変化率
                     if isinstance(
                         pop_area_density, (int, float)
                     ) and isinstance(previous_pop_area_density, (int, float)):
                         rate_density_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         pop_area_density
@@ -399,10 +405,10 @@ class ResidentialInductionMetricCalculator:
                                 1,
                             )
                             if previous_pop_area_density > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        rate_density_change = '―'
+                        rate_density_change = None
 
                     # 居住誘導区域外人口密度の変化率
                     if isinstance(
@@ -411,7 +417,7 @@ class ResidentialInductionMetricCalculator:
                         previous_pop_outside_area_density, (int, float)
                     ):
                         pop_outside_rate_density_change = (
-                            self.round_or_na(
+                            round_or_na(
                                 (
                                     (
                                         pop_outside_area_density
@@ -423,10 +429,10 @@ class ResidentialInductionMetricCalculator:
                                 1,
                             )
                             if previous_pop_outside_area_density > 0
-                            else '―'
+                            else None
                         )
                     else:
-                        pop_outside_rate_density_change = '―'
+                        pop_outside_rate_density_change = None
 
                     # 各年齢層の人口割合の変化率と人口密度の変化率
                     rate_pop_area_change_by_age = {}
@@ -450,7 +456,7 @@ class ResidentialInductionMetricCalculator:
                             rate_pop_area_change_by_age[
                                 f"Rate_Pop_Area_Change_{age_key}"
                             ] = (
-                                self.round_or_na(
+                                round_or_na(
                                     (
                                         (
                                             current_rate_pop_by_age
@@ -462,12 +468,12 @@ class ResidentialInductionMetricCalculator:
                                     1,
                                 )
                                 if previous_rate_pop_by_age > 0
-                                else '―'
+                                else None
                             )
                         else:
                             rate_pop_area_change_by_age[
                                 f"Rate_Pop_Area_Change_{age_key}"
-                            ] = '―'
+                            ] = None
 
                         # 前年度の人口密度を取得
                         previous_pop_area_density_by_age = (
@@ -488,7 +494,7 @@ class ResidentialInductionMetricCalculator:
                             rate_pop_area_density_change_by_age[
                                 f"Rate_Pop_Area_Change_Density_{age_key}"
                             ] = (
-                                self.round_or_na(
+                                round_or_na(
                                     (
                                         (
                                             current_density_pop_by_age
@@ -500,54 +506,38 @@ class ResidentialInductionMetricCalculator:
                                     1,
                                 )
                                 if previous_pop_area_density_by_age > 0
-                                else '―'
+                                else None
                             )
                         else:
                             rate_pop_area_density_change_by_age[
                                 f"Rate_Pop_Area_Change_Density_{age_key}"
-                            ] = '―'
+                            ] = None
 
                 else:
-                    rate_pop_change = '―'
-                    rate_area_pop_change = '―'
-                    rate_density_change = '―'
-                    pop_outside_rate_density_change = '―'
+                    rate_pop_change = None
+                    rate_area_pop_change = None
+                    rate_density_change = None
+                    pop_outside_rate_density_change = None
 
                     rate_pop_area_change_by_age = {
-                        f"Rate_Pop_Area_Change_{age_key}": '―'
+                        f"Rate_Pop_Area_Change_{age_key}": None
                         for age_key in age_fields.keys()
                     }
                     rate_pop_area_density_change_by_age = {
-                        f"Rate_Pop_Area_Change_Density_{age_key}": '―'
+                        f"Rate_Pop_Area_Change_Density_{age_key}": None
                         for age_key in age_fields.keys()
                     }
 
                 # 最後の年度だけ将来人口関連の計算を行う
                 if i == len(unique_years) - 1:
                     # 居住誘導区域内将来人口差（p）
-                    sum_result = residential_buildings.aggregate(
-                        QgsAggregateCalculator.Aggregate.Sum,
-                        f"future_{comparative_year}_PT0",
-                        QgsAggregateCalculator.AggregateParameters(),
-                    )
-                    future_area_pop = (
-                        int(sum_result[0]) if sum_result[0] is not None else 0
-                    )
+                    future_area_pop = int(area_sums[(future_field, None)])
 
                     # 現況人口と将来人口から、居住誘導区域内の減少人口：p を求める
                     area_pop_difference = area_pop - future_area_pop
 
                     # 市内将来人口
-                    sum_result = buildings_layer.aggregate(
-                        QgsAggregateCalculator.Aggregate.Sum,
-                        f"future_{comparative_year}_PT0",
-                        QgsAggregateCalculator.AggregateParameters(),
-                    )
-                    future_total_pop = (
-                        int(total_pop_result[0])
-                        if total_pop_result[0] is not None
-                        else 0
-                    )
+                    future_total_pop = int(total_sums[(future_field, None)])
 
                     # 市内将来人口と居住誘導区域将来人口から居住誘導区域外の将来人口：rを求める
                     outside_area_future_Pop = future_total_pop - future_area_pop
@@ -561,7 +551,7 @@ class ResidentialInductionMetricCalculator:
                             pop_s / target_population
                         ) * 100
                     else:
-                        rate_target_pop_difference = '―'
+                        rate_target_pop_difference = None
 
                     # 居住誘導区域の適切さ（S/p）
                     if area_pop_difference != 0:
@@ -569,7 +559,7 @@ class ResidentialInductionMetricCalculator:
                             pop_s / area_pop_difference
                         ) * 100
                     else:
-                        rate_area_appropriateness_sp = '―'
+                        rate_area_appropriateness_sp = None
 
                     # 居住誘導区域の適切さ（S/r）
                     if outside_area_future_Pop > 0:
@@ -577,14 +567,14 @@ class ResidentialInductionMetricCalculator:
                             pop_s / outside_area_future_Pop
                         ) * 100
                     else:
-                        rate_area_appropriateness_sr = '―'
+                        rate_area_appropriateness_sr = None
                 else:
-                    # 最終年度以外は '―'
-                    area_pop_difference = '―'
-                    rate_target_pop_difference = '―'
-                    outside_area_future_Pop = '―'
-                    rate_area_appropriateness_sp = '―'
-                    rate_area_appropriateness_sr = '―'
+                    # 最終年度以外は欠損値（None）
+                    area_pop_difference = None
+                    rate_target_pop_difference = None
+                    outside_area_future_Pop = None
+                    rate_area_appropriateness_sp = None
+                    rate_area_appropriateness_sr = None
 
                 # データを辞書にまとめる
                 year_data = {
@@ -650,10 +640,9 @@ class ResidentialInductionMetricCalculator:
                 # 辞書をリストに追加
                 data_list.append(year_data)
 
-            # ファイルパスを指定してエクスポート
-            self.export(
-                self.base_path + '\\IF101_居住誘導区域関連評価指標ファイル.csv',
-                data_list,
+            # 算出結果を保存し、評価指標ファイルを出力
+            MetricResultStore(self.gpkg_manager).save(
+                'IF101', data_list, self.base_path
             )
 
             return
@@ -666,50 +655,3 @@ class ResidentialInductionMetricCalculator:
                 Qgis.Critical,
             )
             raise e
-
-    def export(self, file_path, data):
-        """エクスポート処理"""
-        try:
-            if not data:
-                raise Exception(self.tr("The data to export is empty."))
-
-            # データ項目からヘッダーを取得
-            headers = list(data[0].keys())
-
-            # CSVファイル書き込み
-            with open(
-                file_path, mode='w', newline='', encoding='utf-8'
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
-
-            msg = self.tr(
-                "File export completed: %1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
-            )
-            return True
-        except Exception as e:
-            # エラーメッセージのログ出力
-            msg = self.tr(
-                "An error occurred during file export: %1."
-            ).replace("%1", e)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Critical,
-            )
-            raise e
-
-    def round_or_na(self, value, decimal_places, threshold=None):
-        """丸め処理"""
-        if value is None or (threshold is not None and value <= threshold):
-            return '―'
-        else:
-            return round(value, decimal_places)
@@ -0,0 +1,216 @@
+"""
+/***************************************************************************
+ *
+ * 一時レイヤ管理
+ *
+ ***************************************************************************/
+"""
+
+import os
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsProject,
+    QgsVectorLayer,
+    QgsVectorFileWriter,
+)
+from PyQt5.QtCore import QCoreApplication
+from osgeo import ogr
+
+
+class ScratchManager:
+    """一時レイヤ管理（中間データを出力用GeoPackageとは別の作業用フォルダに保存）"""
+    _instance = None
+
+    # 一時レイヤの保存形式（形式名: (OGRのドライバ名, 拡張子, レイヤ作成オプション)）
+    # GPKG は作業用GeoPackageにまとめて保存し、それ以外はレイヤごとに1ファイルとする
+    STORAGE_FORMATS = {
+        'GPKG': ('GPKG', '.gpkg', ['SPATIAL_INDEX=YES']),
+        # 空間インデックス（packed Hilbert R-tree）の順に地物を格納
+        'FlatGeobuf': ('FlatGeobuf', '.fgb', ['SPATIAL_INDEX=YES']),
+        'GeoParquet': ('Parquet', '.parquet', []),
+    }
+    DEFAULT_FORMAT = 'GPKG'
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ScratchManager, cls).__new__(cls)
+            cls._instance.scratch_folder = None
+            cls._instance.scratch_path = None
+            cls._instance.storage_format = cls.DEFAULT_FORMAT
+            cls._instance.workspaces = []
+        return cls._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("ScratchManager", message)
+
+    def init(self, storage_format=DEFAULT_FORMAT):
+        """
+        初期化（前回の作業用フォルダは削除）
+        :param storage_format: 一時レイヤの保存形式（STORAGE_FORMATS の形式名）
+        """
+        self.cleanup()
+        self.scratch_folder = tempfile.mkdtemp(prefix="plateau_scratch_")
+        self.scratch_path = os.path.join(self.scratch_folder, "scratch.gpkg")
+        self.workspaces = []
+
+        # ドライバがない形式（GDALのビルドによる）は GPKG で保存
+        if (
+            storage_format not in self.STORAGE_FORMATS
+            or ogr.GetDriverByName(self.STORAGE_FORMATS[storage_format][0])
+            is None
+        ):
+            QgsMessageLog.logMessage(
+                self.tr(
+                    "Scratch format %1 is not available. GPKG is used."
+                ).replace("%1", str(storage_format)),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+            storage_format = self.DEFAULT_FORMAT
+        self.storage_format = storage_format
+
+        QgsMessageLog.logMessage(
+            self.tr("Scratch Manager has been reset. New path: %1.").replace(
+                "%1", self.scratch_path
+            ),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+
+    @contextmanager
+    def workspace(self):
+        """作業領域（終了時に領域内で保存した一時レイヤを削除）"""
+        self.workspaces.append([])
+        try:
+            yield self
+        finally:
+            self.drop_layers(self.workspaces.pop())
+
+    def get_layer_path(self, layer_name):
+        """一時レイヤの保存先ファイルのパス"""
+        if self.storage_format == 'GPKG':
+            return self.scratch_path
+        extension = self.STORAGE_FORMATS[self.storage_format][1]
+        return os.path.join(self.scratch_folder, f"{layer_name}{extension}")
+
+    def add_layer(self, layer, layer_name):
+        """
+        一時レイヤを作業用フォルダに保存する
+        :param layer: 保存するレイヤ
+        :param layer_name: 一時レイヤ名
+        :return: 保存したレイヤ（失敗した場合は False）
+        """
+        try:
+            driver, _, layer_options = self.STORAGE_FORMATS[
+                self.storage_format
+            ]
+            path = self.get_layer_path(layer_name)
+
+            options = QgsVectorFileWriter.SaveVectorOptions()
+            options.driverName = driver
+            options.actionOnExistingFile = (
+                QgsVectorFileWriter.CreateOrOverwriteLayer
+                if self.storage_format == 'GPKG' and os.path.exists(path)
+                else QgsVectorFileWriter.CreateOrOverwriteFile
+            )
+            options.fileEncoding = 'UTF-8'
+            options.layerName = layer_name
+            options.layerOptions = layer_options
+
+            started = time.perf_counter()
+            error = QgsVectorFileWriter.writeAsVectorFormatV3(
+                layer,
+                path,
+                QgsProject.instance().transformContext(),
+                options,
+            )
+            if error[0] != QgsVectorFileWriter.NoError:
+                raise Exception(
+                    self.tr("Failed to save scratch layer %1: %2")
+                    .replace("%1", layer_name)
+                    .replace("%2", str(error[1]))
+                )
+
+            # 作業領域内の場合は領域終了時に削除
+            if self.workspaces and layer_name not in self.workspaces[-1]:
+                self.workspaces[-1].append(layer_name)
+
+            # 形式ごとの書き込み時間の比較用
+            QgsMessageLog.logMessage(
+                self.tr("Scratch layer %1 saved as %2 (%3 features, %4 s).")
+                .replace("%1", layer_name)
+                .replace("%2", self.storage_format)
+                .replace("%3", str(layer.featureCount()))
+                .replace("%4", f"{time.perf_counter() - started:.2f}"),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+
+            scratch_layer = QgsVectorLayer(
+                f"{path}|layername={layer_name}"
+                if self.storage_format == 'GPKG'
+                else path,
+                layer_name,
+                "ogr",
+            )
+            if not scratch_layer.isValid():
+                return False
+            return scratch_layer
+
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                self.tr("An error occurred: %1").replace("%1", str(e)),
+                self.tr("Plugin"),
+                Qgis.Critical,
+            )
+            return False
+
+    def drop_layers(self, layer_names):
+        """一時レイヤを作業用フォルダから削除"""
+        if not layer_names or not self.scratch_folder:
+            return
+
+        if self.storage_format == 'GPKG':
+            if not os.path.exists(self.scratch_path):
+                return
+
+            gpkg = ogr.Open(self.scratch_path, update=1)
+            if gpkg is None:
+                return
+
+            for layer_name in layer_names:
+                if gpkg.GetLayerByName(layer_name) is not None:
+                    gpkg.DeleteLayer(layer_name)
+            gpkg.Close()
+        else:
+            for layer_name in layer_names:
+                path = self.get_layer_path(layer_name)
+                if not os.path.exists(path):
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    # 読み込み中のファイルは cleanup 時に削除
+                    pass
+
+        QgsMessageLog.logMessage(
+            self.tr("Scratch layers dropped: %1").replace(
+                "%1", ", ".join(layer_names)
+            ),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+
+    def cleanup(self):
+        """作業用フォルダを削除"""
+        if self.scratch_folder:
+            shutil.rmtree(self.scratch_folder, ignore_errors=True)
+        self.scratch_folder = None
+        self.scratch_path = None
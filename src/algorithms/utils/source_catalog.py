@@ -0,0 +1,341 @@
+"""
+/***************************************************************************
+ *
+ * 入力データカタログ管理
+ *
+ ***************************************************************************/
+"""
+
+import os
+import json
+
+import chardet
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsVectorLayer,
+    QgsWkbTypes,
+)
+from PyQt5.QtCore import QCoreApplication
+
+from .dir_maker import DirMaker
+
+
+class SourceCatalog:
+    """入力データカタログ管理"""
+    _instance = None
+
+    # カタログ形式のバージョン（形式変更時は既存カタログを破棄）
+    CATALOG_VERSION = 1
+
+    # カタログに登録するファイルの拡張子（Shapefile・人口データなどのテキスト）
+    SOURCE_EXTENSIONS = (".shp", ".txt")
+
+    # 文字コードを検出できなかったテキストファイルで順に試すエンコーディング
+    FALLBACK_ENCODINGS = ['shift_jis', 'cp932', 'utf-8', 'utf-16']
+
+    def __new__(
+        cls,
+        base_path=None,
+        catalog_name="source_catalog.json",
+    ):
+        if cls._instance is None:
+            cls._instance = super(SourceCatalog, cls).__new__(cls)
+            cls._instance.base_path = base_path
+            cls._instance.catalog_name = catalog_name
+            cls._instance.catalog_path = os.path.join(base_path, catalog_name)
+            cls._instance.entries = {}
+            cls._instance.scanned_directories = set()
+        return cls._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("SourceCatalog", message)
+
+    def init(self, base_path, catalog_name="source_catalog.json"):
+        """初期化"""
+        # 最初期化
+        self.base_path = base_path
+        self.catalog_name = catalog_name
+        self.catalog_path = os.path.join(base_path, catalog_name)
+        self.entries = {}
+        self.scanned_directories = set()
+        QgsMessageLog.logMessage(
+            self.tr(
+                "Source catalog has been reset. New path: %1."
+            ).replace("%1", self.catalog_path),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+
+    def build(self):
+        """フォルダ構成配下の入力ファイルをカタログ化"""
+        try:
+            self.__load()
+
+            # 更新されていないエントリは再利用し、更新分のみ再スキャン
+            for directory in DirMaker.DIRECTORIES:
+                self.__scan_directory(
+                    os.path.join(self.base_path, directory)
+                )
+
+            # 削除されたファイルのエントリを破棄
+            for path in list(self.entries.keys()):
+                if not os.path.exists(path):
+                    del self.entries[path]
+
+            self.save()
+
+            QgsMessageLog.logMessage(
+                self.tr("Source catalog built. Files: %1")
+                .replace("%1", str(len(self.entries))),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+            return True
+
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                self.tr("Source catalog error: %1").replace("%1", str(e)),
+                self.tr("Plugin"),
+                Qgis.Critical,
+            )
+            return False
+
+    def save(self):
+        """カタログをファイルに保存"""
+        try:
+            with open(self.catalog_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {
+                        "version": self.CATALOG_VERSION,
+                        "entries": self.entries,
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=1,
+                )
+        except OSError as e:
+            # 入力フォルダが書き込み不可の場合はメモリ上のカタログのみ使用
+            QgsMessageLog.logMessage(
+                self.tr("Failed to save source catalog: %1")
+                .replace("%1", str(e)),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+
+    def get_shapefiles(self, directory):
+        """指定されたディレクトリ配下のすべてのShapefile (.shp) をカタログから取得する"""
+        return self.get_files(directory, ".shp")
+
+    def get_files(self, directory, extension):
+        """
+        指定されたディレクトリ配下の指定した拡張子のファイルをカタログから取得する
+        :param directory: ディレクトリ
+        :param extension: 拡張子（SOURCE_EXTENSIONS のいずれか）
+        :return: ファイルパスのリスト
+        """
+        msg = self.tr("Directory: %1").replace("%1", directory)
+        QgsMessageLog.logMessage(
+            msg,
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+
+        directory = os.path.normpath(directory)
+        if not self.__is_scanned(directory):
+            self.__scan_directory(directory)
+
+        prefix = directory + os.sep
+        return [
+            path for path in self.entries
+            if path.endswith(extension) and path.startswith(prefix)
+        ]
+
+    def get_entry(self, file_path):
+        """ファイルのカタログ情報を取得（更新されている場合は再スキャン）"""
+        path = os.path.normpath(file_path)
+        entry = self.entries.get(path)
+        if entry is None or self.__is_stale(path, entry):
+            entry = self.__scan_file(path)
+        return entry
+
+    def get_encoding(self, file_path):
+        """ファイルのエンコーディングを取得"""
+        entry = self.get_entry(file_path)
+        if entry is None:
+            msg = self.tr(
+                "No corresponding DBF file was found for the specified path: "
+                "%1."
+            ).replace("%1", file_path)
+            QgsMessageLog.logMessage(
+                msg,
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+            return 'UTF-8'
+        return entry["encoding"]
+
+    def get_fields(self, file_path):
+        """Shapefileの属性フィールド名一覧を取得"""
+        entry = self.get_entry(file_path)
+        if entry is None:
+            return []
+        return entry.get("fields", [])
+
+    def __is_scanned(self, directory):
+        """ディレクトリがスキャン済みかどうか"""
+        return any(
+            directory == scanned or directory.startswith(scanned + os.sep)
+            for scanned in self.scanned_directories
+        )
+
+    def __scan_directory(self, directory):
+        """ディレクトリ配下のファイルをカタログに登録"""
+        directory = os.path.normpath(directory)
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.endswith(self.SOURCE_EXTENSIONS):
+                    self.get_entry(os.path.join(root, file))
+        self.scanned_directories.add(directory)
+
+    def __load(self):
+        """保存済みカタログを読み込み"""
+        self.entries = {}
+        self.scanned_directories = set()
+        if not os.path.exists(self.catalog_path):
+            return
+
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.CATALOG_VERSION:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError):
+            msg = self.tr(
+                "Failed to load source catalog. Rebuilding: %1"
+            ).replace("%1", self.catalog_path)
+            QgsMessageLog.logMessage(
+                msg,
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+
+    def __get_stamp(self, path):
+        """ファイルの更新判定用スタンプ（サイズ・更新日時）を取得"""
+        stat = os.stat(path)
+        stamp = {"size": stat.st_size, "mtime": stat.st_mtime}
+
+        # Shapefileは属性・エンコーディングの取得元であるDBFの更新も判定
+        dbf_file = self.__get_dbf_path(path)
+        if dbf_file and os.path.exists(dbf_file):
+            stamp["dbf_mtime"] = os.stat(dbf_file).st_mtime
+        return stamp
+
+    def __is_stale(self, path, entry):
+        """エントリがファイル更新により無効化されているか"""
+        if not os.path.exists(path):
+            return True
+        stamp = self.__get_stamp(path)
+        return any(entry.get(key) != value for key, value in stamp.items())
+
+    def __get_dbf_path(self, path):
+        """Shapefile に対応する DBF ファイルのパス"""
+        if path.endswith(".shp"):
+            return path[:-len(".shp")] + ".dbf"
+        return None
+
+    def __scan_file(self, path):
+        """ファイルをスキャンしてカタログに登録"""
+        if not os.path.exists(path):
+            self.entries.pop(path, None)
+            return None
+
+        entry = {
+            "type": "shp" if path.endswith(".shp") else "file",
+            **self.__get_stamp(path),
+        }
+
+        if entry["type"] == "shp":
+            dbf_file = self.__get_dbf_path(path)
+            if not os.path.exists(dbf_file):
+                self.entries.pop(path, None)
+                return None
+            entry["encoding"] = self.__detect_encoding(dbf_file)
+
+            layer = QgsVectorLayer(path, os.path.basename(path), "ogr")
+            layer.setProviderEncoding(entry["encoding"])
+            entry["valid"] = layer.isValid()
+            if entry["valid"]:
+                extent = layer.extent()
+                entry["crs"] = layer.crs().authid()
+                entry["geometry_type"] = QgsWkbTypes.displayString(
+                    layer.wkbType()
+                )
+                entry["fields"] = layer.fields().names()
+                entry["feature_count"] = layer.featureCount()
+                entry["extent"] = [
+                    extent.xMinimum(),
+                    extent.yMinimum(),
+                    extent.xMaximum(),
+                    extent.yMaximum(),
+                ]
+        else:
+            entry["encoding"] = self.__detect_encoding(path)
+
+        self.entries[path] = entry
+        return entry
+
+    def __detect_encoding(self, file_path):
+        """ファイルのエンコーディングを検出"""
+        with open(file_path, 'rb') as f:
+            raw_data = f.read()
+            result = chardet.detect(raw_data)
+            encoding = result['encoding']
+
+        if file_path.endswith(".dbf") and encoding in (
+            'MacRoman', 'Windows-1254'
+        ):
+            msg = self.tr(
+                "%1 was detected. Using SHIFT_JIS for the file %2."
+            ).replace("%1", encoding).replace("%2", file_path)
+            QgsMessageLog.logMessage(
+                msg,
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+            encoding = 'SHIFT_JIS'
+
+        if encoding is None and not file_path.endswith(".dbf"):
+            # 検出できない場合は読み込めるエンコーディングを順に試す
+            msg = self.tr(
+                "Encoding detection error for file: %1. "
+                "Attempting to detect using an alternative method."
+            ).replace("%1", file_path)
+            QgsMessageLog.logMessage(
+                msg,
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+            encoding = self.__try_encodings(file_path)
+
+        msg = self.tr("Detected encoding: %1").replace(
+            "%1", str(encoding)
+        )
+        QgsMessageLog.logMessage(
+            msg,
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+        return encoding if encoding else 'SHIFT_JIS'
+
+    def __try_encodings(self, file_path):
+        """読み込めるエンコーディングを順に試す（いずれも失敗した場合は None）"""
+        for encoding in self.FALLBACK_ENCODINGS:
+            try:
+                with open(file_path, 'r', encoding=encoding) as f:
+                    f.read()
+                    return encoding
+            except UnicodeDecodeError:
+                continue
+        return None
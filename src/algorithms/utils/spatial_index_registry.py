@@ -0,0 +1,229 @@
+"""
+/***************************************************************************
+ *
+ * 空間インデックス管理
+ *
+ ***************************************************************************/
+"""
+
+import os
+
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsVectorLayer,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsSpatialIndex,
+    QgsWkbTypes,
+)
+from PyQt5.QtCore import QCoreApplication
+
+from .progress_manager import ProgressManager
+from .reprojection_manager import ReprojectionManager
+
+
+class SpatialIndexRegistry:
+    """空間インデックス管理（レイヤが更新されるまで同じインデックスを再利用）"""
+    _instance = None
+
+    # processing の native:extractbylocation と同じ空間条件の番号
+    PREDICATE_INTERSECTS = 0
+    PREDICATE_WITHIN = 6
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SpatialIndexRegistry, cls).__new__(cls)
+            cls._instance.indexes = {}
+            cls._instance.gpkg_manager = None
+        return cls._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("SpatialIndexRegistry", message)
+
+    def init(self, gpkg_manager=None):
+        """初期化（作成済みのインデックスを破棄、gpkg_manager は出力先）"""
+        self.indexes = {}
+        self.gpkg_manager = gpkg_manager
+
+    def drop_memory_indexes(self):
+        """
+        メモリレイヤのインデックスを破棄する
+        （ジオメトリを保持しているため、処理段階の終了時に呼び出して解放）
+        """
+        self.indexes = {
+            key: value
+            for key, value in self.indexes.items()
+            if not value[2]
+        }
+
+    def get_index(self, layer):
+        """
+        レイヤの空間インデックスを取得する
+        :param layer: 対象のレイヤ
+        :return: ジオメトリを保持した空間インデックス（未作成・更新時のみ作成）
+        """
+        key, stamp = self.__get_key(layer)
+        cached = self.indexes.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        # 作成中もキャンセルできるよう processing.run と同じフィードバックを渡す
+        index = QgsSpatialIndex(
+            layer.getFeatures(QgsFeatureRequest().setNoAttributes()),
+            ProgressManager.get_feedback(),
+            QgsSpatialIndex.FlagStoreFeatureGeometries,
+        )
+        if self.__is_canceled():
+            # 途中までのインデックスは保持しない
+            return index
+        self.indexes[key] = (
+            stamp, index, layer.dataProvider().name() == "memory"
+        )
+
+        QgsMessageLog.logMessage(
+            self.tr("Spatial index of %1 created.").replace(
+                "%1", layer.name()
+            ),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+        return index
+
+    def select_fids(
+        self, target_layer, overlay_layer, predicate=PREDICATE_INTERSECTS
+    ):
+        """
+        重ね合わせレイヤと空間条件を満たす地物のIDを取得する
+        :param target_layer: 抽出対象のレイヤ
+        :param overlay_layer: 重ね合わせるレイヤ
+        :param predicate: 空間条件（0: intersects, 6: within）
+        :return: 抽出対象のレイヤの地物IDの集合
+                 （キャンセルされた場合は判定済みの地物のみ）
+        """
+        if predicate not in (
+            self.PREDICATE_INTERSECTS,
+            self.PREDICATE_WITHIN,
+        ):
+            raise Exception(
+                self.tr("Unsupported spatial predicate: %1").replace(
+                    "%1", str(predicate)
+                )
+            )
+
+        index = self.get_index(target_layer)
+
+        # 重ね合わせレイヤのジオメトリを抽出対象の座標系に変換
+        overlay_geometries = [
+            QgsGeometry(feature.geometry())
+            for feature in overlay_layer.getFeatures(
+                QgsFeatureRequest().setNoAttributes()
+            )
+            if feature.hasGeometry()
+        ]
+        reprojection_manager = ReprojectionManager._instance
+        overlay_geometries = reprojection_manager.transform_geometries(
+            overlay_geometries, overlay_layer.crs(), target_layer.crs()
+        )
+
+        # インデックスで範囲内の候補のみ取得し、空間条件を判定
+        feedback = ProgressManager.get_feedback()
+        total = len(overlay_geometries)
+        fids = set()
+        for i, overlay_geometry in enumerate(overlay_geometries):
+            if self.__is_canceled():
+                break  # キャンセルチェック
+            if feedback is not None:
+                feedback.setProgress(i * 100 / total)
+            engine = QgsGeometry.createGeometryEngine(
+                overlay_geometry.constGet()
+            )
+            engine.prepareGeometry()
+            for fid in index.intersects(overlay_geometry.boundingBox()):
+                if fid in fids:
+                    continue
+                geometry = index.geometry(fid).constGet()
+                if predicate == self.PREDICATE_WITHIN:
+                    matched = engine.contains(geometry)
+                else:
+                    matched = engine.intersects(geometry)
+                if matched:
+                    fids.add(fid)
+
+        if feedback is not None and not self.__is_canceled():
+            feedback.setProgress(100)
+        return fids
+
+    def extract_by_location(
+        self, target_layer, overlay_layer, predicate=PREDICATE_INTERSECTS
+    ):
+        """
+        重ね合わせレイヤと空間条件を満たす地物を抽出する
+        :param target_layer: 抽出対象のレイヤ
+        :param overlay_layer: 重ね合わせるレイヤ
+        :param predicate: 空間条件（0: intersects, 6: within）
+        :return: 抽出した地物のメモリレイヤ
+        """
+        fids = self.select_fids(target_layer, overlay_layer, predicate)
+
+        extracted_layer = QgsVectorLayer(
+            f"{QgsWkbTypes.displayString(target_layer.wkbType())}"
+            f"?crs={target_layer.crs().authid()}",
+            target_layer.name(),
+            "memory",
+        )
+        extracted_provider = extracted_layer.dataProvider()
+        extracted_provider.addAttributes(target_layer.fields())
+        extracted_layer.updateFields()
+        if fids and not self.__is_canceled():
+            extracted_provider.addFeatures(
+                list(
+                    target_layer.getFeatures(
+                        QgsFeatureRequest().setFilterFids(sorted(fids))
+                    )
+                )
+            )
+        extracted_layer.updateExtents()
+        return extracted_layer
+
+    def __is_canceled(self):
+        """キャンセル状態を確認（進捗・キャンセル管理の未初期化時は False）"""
+        progress_manager = ProgressManager._instance
+        return progress_manager is not None and progress_manager.is_canceled()
+
+    def __get_key(self, layer):
+        """インデックスのキー（データソース）と更新判定用の情報"""
+        # メモリレイヤはデータソースが一意でないためレイヤIDで識別
+        if layer.dataProvider().name() == "memory":
+            return layer.id(), (
+                layer.featureCount(),
+                layer.extent().toString(),
+            )
+
+        source = layer.source()
+        path, _, options = source.partition("|")
+
+        # 出力先GeoPackageのレイヤはWALモードのためファイルの更新日時が
+        # 変わらない場合があり、GpkgManager のレイヤの更新回数で判定
+        gpkg_manager = self.gpkg_manager
+        if (
+            gpkg_manager is not None
+            and os.path.abspath(path)
+            == os.path.abspath(gpkg_manager.geopackage_path)
+        ):
+            layer_name = ""
+            for option in options.split("|"):
+                if option.startswith("layername="):
+                    layer_name = option[len("layername="):]
+            return source, (
+                gpkg_manager.get_layer_version(layer_name),
+                layer.featureCount(),
+            )
+
+        # その他のファイルは本体とWALファイルの更新日時で判定
+        mtimes = tuple(
+            os.path.getmtime(file_path) if os.path.exists(file_path) else None
+            for file_path in (path, f"{path}-wal")
+        )
+        return source, (mtimes, layer.featureCount())
@@ -0,0 +1,278 @@
+"""
+/***************************************************************************
+ *
+ * 広域データ共有管理
+ *
+ ***************************************************************************/
+"""
+
+import os
+import json
+import glob
+import time
+
+import processing
+from qgis.core import (
+    QgsMessageLog,
+    Qgis,
+    QgsProject,
+    QgsVectorLayer,
+    QgsVectorFileWriter,
+    QgsFeatureRequest,
+    QgsGeometry,
+    QgsWkbTypes,
+)
+from PyQt5.QtCore import QCoreApplication
+
+from .reprojection_manager import ReprojectionManager
+from .progress_manager import ProgressManager
+
+
+class StagingManager:
+    """広域データ共有管理（複数自治体の一括処理で全国・都道府県データを共有）"""
+    _instance = None
+
+    # 共有データ形式のバージョン（形式変更時は既存データを破棄）
+    STAGING_VERSION = 2
+
+    def __new__(cls, base_path=None):
+        if cls._instance is None:
+            cls._instance = super(StagingManager, cls).__new__(cls)
+            cls._instance.base_path = base_path
+        return cls._instance
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate("StagingManager", message)
+
+    def init(self, base_path=None):
+        """初期化（base_path が None の場合は共有しない）"""
+        self.base_path = base_path
+        if self.base_path:
+            os.makedirs(self.base_path, exist_ok=True)
+            QgsMessageLog.logMessage(
+                self.tr(
+                    "Staging Manager has been reset. New path: %1."
+                ).replace("%1", self.base_path),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+
+    def is_enabled(self):
+        """共有データを使用するかどうか"""
+        return bool(self.base_path)
+
+    def load_layer(self, source_name, source_files):
+        """
+        共有データを読み込む
+        :param source_name: 共有データ名
+        :param source_files: 共有データの作成元ファイル
+        :return: 作成元ファイルが更新されていない場合は共有レイヤ、それ以外は None
+        """
+        if not self.is_enabled():
+            return None
+
+        signature_path = self.__get_signature_path(source_name)
+        if not os.path.exists(signature_path):
+            return None
+
+        try:
+            with open(signature_path, 'r', encoding='utf-8') as f:
+                signature = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            not isinstance(signature, dict)
+            or {
+                key: signature.get(key) for key in ("version", "files")
+            } != self.__get_signature(source_files)
+        ):
+            return None
+
+        # 公開済みのGeoPackage（保存ごとに別ファイル）
+        gpkg_path = os.path.join(
+            self.base_path, os.path.basename(signature.get("gpkg", ""))
+        )
+        if not os.path.isfile(gpkg_path):
+            return None
+
+        layer = QgsVectorLayer(
+            f"{gpkg_path}|layername={source_name}", source_name, "ogr"
+        )
+        if not layer.isValid():
+            return None
+
+        QgsMessageLog.logMessage(
+            self.tr("Staged layer %1 reused.").replace("%1", source_name),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+        return layer
+
+    def save_layer(self, source_name, source_files, layer):
+        """
+        作成したレイヤを共有データとして保存する
+        :param source_name: 共有データ名
+        :param source_files: 共有データの作成元ファイル
+        :param layer: 保存するレイヤ
+        :return: 共有レイヤ（共有しない場合は指定したレイヤ）
+        """
+        if not self.is_enabled():
+            return layer
+
+        signature_path = self.__get_signature_path(source_name)
+
+        # 並列実行中の他プロセスが読み込み中のファイルは置き換えられない
+        # （Windows）ため、保存ごとに別のファイル名で作成して公開する
+        gpkg_name = f"{source_name}.{int(time.time() * 1000)}.{os.getpid()}"
+        gpkg_path = os.path.join(self.base_path, f"{gpkg_name}.gpkg")
+        temp_path = f"{gpkg_path}.tmp.gpkg"
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = "GPKG"
+        options.fileEncoding = 'UTF-8'
+        options.layerName = source_name
+        options.layerOptions = ['SPATIAL_INDEX=YES']
+
+        error = QgsVectorFileWriter.writeAsVectorFormatV3(
+            layer,
+            temp_path,
+            QgsProject.instance().transformContext(),
+            options,
+        )
+        if error[0] != QgsVectorFileWriter.NoError:
+            raise Exception(
+                self.tr("Failed to save staged layer %1: %2")
+                .replace("%1", source_name)
+                .replace("%2", str(error[1]))
+            )
+
+        # 書き込み完了後に新しいファイル名へ移動（移動先は存在しない）
+        os.rename(temp_path, gpkg_path)
+
+        # 作成元情報に公開するファイル名を記録して切り替え
+        signature = self.__get_signature(source_files)
+        signature["gpkg"] = os.path.basename(gpkg_path)
+        temp_signature_path = f"{signature_path}.{os.getpid()}.tmp"
+        with open(temp_signature_path, 'w', encoding='utf-8') as f:
+            json.dump(signature, f, ensure_ascii=False, indent=1)
+        self.__publish(temp_signature_path, signature_path)
+
+        # 以前のファイルを削除（読み込み中で削除できない場合は次回の保存時）
+        for old_path in glob.glob(
+            os.path.join(glob.escape(self.base_path), f"{source_name}.*.gpkg")
+        ):
+            # 他プロセスが書き込み中の一時ファイルは除く
+            if old_path == gpkg_path or old_path.endswith(".tmp.gpkg"):
+                continue
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+        QgsMessageLog.logMessage(
+            self.tr("Staged layer %1 created.").replace("%1", source_name),
+            self.tr("Plugin"),
+            Qgis.Info,
+        )
+        return QgsVectorLayer(
+            f"{gpkg_path}|layername={source_name}", source_name, "ogr"
+        )
+
+    def extract_by_zones(self, layer, zones_layer):
+        """ゾーンポリゴン範囲と交差する地物のみを抽出"""
+        if not self.is_enabled():
+            # 空間インデックス作成
+            processing.run(
+                "native:createspatialindex",
+                {'INPUT': layer},
+                feedback=ProgressManager.get_feedback(),
+            )
+
+            return processing.run(
+                "native:extractbylocation",
+                {
+                    'INPUT': layer,
+                    'PREDICATE': [0],  # intersects
+                    'INTERSECT': zones_layer,
+                    'OUTPUT': 'TEMPORARY_OUTPUT',
+                },
+                feedback=ProgressManager.get_feedback(),
+            )['OUTPUT']
+
+        # ゾーンポリゴンを共有レイヤの座標系で結合
+        transform = ReprojectionManager._instance.get_transform(
+            zones_layer.crs(), layer.crs()
+        )
+        zone_geometries = []
+        for zone_feature in zones_layer.getFeatures():
+            geometry = QgsGeometry(zone_feature.geometry())
+            if zones_layer.crs() != layer.crs():
+                geometry.transform(transform)
+            zone_geometries.append(geometry)
+        zone_geometry = QgsGeometry.unaryUnion(zone_geometries)
+
+        extracted_layer = QgsVectorLayer(
+            f"{QgsWkbTypes.displayString(layer.wkbType())}"
+            f"?crs={layer.crs().authid()}",
+            layer.name(),
+            "memory",
+        )
+        extracted_provider = extracted_layer.dataProvider()
+        extracted_provider.addAttributes(layer.fields())
+        extracted_layer.updateFields()
+        if zone_geometry.isEmpty():
+            return extracted_layer
+
+        # 共有レイヤの空間インデックスで範囲内の候補のみ取得し、交差判定
+        engine = QgsGeometry.createGeometryEngine(zone_geometry.constGet())
+        engine.prepareGeometry()
+        request = QgsFeatureRequest().setFilterRect(
+            zone_geometry.boundingBox()
+        )
+        extracted_provider.addFeatures(
+            [
+                feature
+                for feature in layer.getFeatures(request)
+                if feature.hasGeometry()
+                and engine.intersects(feature.geometry().constGet())
+            ]
+        )
+        extracted_layer.updateExtents()
+        return extracted_layer
+
+    def __get_signature_path(self, source_name):
+        """共有データの作成元情報のパス"""
+        return os.path.join(self.base_path, f"{source_name}.json")
+
+    def __publish(self, temp_path, path, retries=5):
+        """
+        一時ファイルで作成元情報を置き換える
+        （他プロセスが読み込み中で置き換えられない場合は待機して再試行）
+        """
+        for retry in range(retries):
+            try:
+                os.replace(temp_path, path)
+                return
+            except PermissionError:
+                if retry == retries - 1:
+                    os.remove(temp_path)
+                    raise
+                time.sleep(0.1 * (retry + 1))
+
+    def __get_signature(self, source_files):
+        """作成元ファイルの同一性判定用情報（ファイル名・サイズ・更新日時）"""
+        files = []
+        for source_file in sorted(
+            source_files, key=lambda path: os.path.basename(path)
+        ):
+            stats = [os.stat(source_file)]
+            dbf_file = os.path.splitext(source_file)[0] + ".dbf"
+            if os.path.exists(dbf_file):
+                stats.append(os.stat(dbf_file))
+            files.append([
+                os.path.basename(source_file),
+                [stat.st_size for stat in stats],
+                [stat.st_mtime for stat in stats],
+            ])
+        return {"version": self.STAGING_VERSION, "files": files}
@@ -11,7 +11,6 @@ import csv
 import re
 
 import processing
-import chardet
 from qgis.core import (
     QgsMessageLog,
     Qgis,
@@ -24,12 +23,21 @@ from qgis.core import (
 from PyQt5.QtCore import QCoreApplication, QVariant
 
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
+from .staging_manager import StagingManager
+from .progress_manager import ProgressManager
 
 class TransportationDataGenerator:
     """交通関連データ作成機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
+        # 広域データ共有
+        self.staging_manager = StagingManager._instance
         # インプットデータパス
         self.base_path = base_path
 
@@ -73,7 +81,9 @@ class TransportationDataGenerator:
             road_network_folder = os.path.join(
                 self.base_path, "道路ネットワーク"
             )
-            shp_files = self.__get_shapefiles(road_network_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                road_network_folder
+            )
 
             if not shp_files:
                 raise Exception(
@@ -85,75 +95,75 @@ class TransportationDataGenerator:
                 'zones', None, withload_project=False
             )
 
-            # レイヤリストを作成
-            layers = []
-            required_fields = {
-                "osm_id",
-                "code",
-                "fclass",
-                "name",
-                "ref",
-                "oneway",
-                "maxspeed",
-                "layer",
-                "bridge",
-                "tunnel",
-            }
-
-            for shp_file in shp_files:
-                # Shapefile読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-
-                # レイヤの属性項目チェック
-                layer_fields = set(layer.fields().names())
-                if required_fields.issubset(layer_fields):
-                    layers.append(layer)
-                    # 取り込み対象のファイルパスをログ出力
-                    msg = self.tr(
-                        "Shapefile to be imported: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
+            # 共有データがあれば再利用（一括処理時）
+            merged_layer = self.staging_manager.load_layer(
+                "road_networks", shp_files
+            )
+            if merged_layer is None:
+                # レイヤリストを作成
+                layers = []
+                required_fields = {
+                    "osm_id",
+                    "code",
+                    "fclass",
+                    "name",
+                    "ref",
+                    "oneway",
+                    "maxspeed",
+                    "layer",
+                    "bridge",
+                    "tunnel",
+                }
+
+                for shp_file in shp_files:
+                    # レイヤの属性項目チェック
+                    layer_fields = set(
+                        self.source_catalog.get_fields(shp_file)
                     )
+                    if required_fields.issubset(layer_fields):
+                        # Shapefile読み込み
+                        layer = QgsVectorLayer(
+                            shp_file, os.path.basename(shp_file), "ogr"
+                        )
+                        layers.append(layer)
+                        # 取り込み対象のファイルパスをログ出力
+                        msg = self.tr(
+                            "Shapefile to be imported: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Info,
+                        )
 
-                else:
-                    data_name = self.tr("road network")
-                    msg = (
-                        self.tr("%1 cannot be loaded as %2 data.")
-                        .replace("%1", shp_file)
-                        .replace("%2", data_name)
-                    )
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                    else:
+                        data_name = self.tr("road network")
+                        msg = (
+                            self.tr("%1 cannot be loaded as %2 data.")
+                            .replace("%1", shp_file)
+                            .replace("%2", data_name)
+                        )
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+
+                if not layers:
+                    # 道路ネットワークのshpファイルが無い場合
+                    raise Exception(
+                        "必要な道路ネットワークのShapefileが見つかりませんでした。"
                     )
 
-            if not layers:
-                # 道路ネットワークのshpファイルが無い場合
-                raise Exception(
-                    "必要な道路ネットワークのShapefileが見つかりませんでした。"
+                merged_layer = self.__merge_layers(layers)
+                merged_layer = self.staging_manager.save_layer(
+                    "road_networks", shp_files, merged_layer
                 )
 
-            merged_layer = self.__merge_layers(layers)
-
-            processing.run("native:createspatialindex",
-                           {'INPUT': merged_layer})
-
             # ゾーンポリゴン範囲と交差する道路のみを抽出
-            extracted_layer = processing.run(
-                "native:extractbylocation",
-                {
-                    'INPUT': merged_layer,
-                    'PREDICATE': [0],  # intersects
-                    'INTERSECT': zones_layer,
-                    'OUTPUT': 'TEMPORARY_OUTPUT',
-                },
-            )['OUTPUT']
+            extracted_layer = self.staging_manager.extract_by_zones(
+                merged_layer, zones_layer
+            )
 
             # road_networksレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -187,7 +197,9 @@ class TransportationDataGenerator:
         try:
             # base_path 配下の「鉄道駅位置」フォルダを再帰的に探索してShapefileを収集
             railway_station_folder = os.path.join(self.base_path, "鉄道駅位置")
-            shp_files = self.__get_shapefiles(railway_station_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                railway_station_folder
+            )
 
             if not shp_files:
                 data_name = self.tr("railway station")
@@ -206,27 +218,8 @@ class TransportationDataGenerator:
 
             for shp_file in shp_files:
                 year = self.__extract_year_from_path(shp_file)
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
                 # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
+                layer_fields = set(self.source_catalog.get_fields(shp_file))
                 required_fields = {
                     "N02_001",
                     "N02_002",
@@ -248,6 +241,25 @@ class TransportationDataGenerator:
                     )
                     continue
 
+                encoding = self.source_catalog.get_encoding(shp_file)
+
+                # Shapefile 読み込み
+                layer = QgsVectorLayer(
+                    shp_file, os.path.basename(shp_file), "ogr"
+                )
+                layer.setProviderEncoding(encoding)
+
+                if not layer.isValid():
+                    msg = self.tr(
+                        "Failed to load layer: %1"
+                    ).replace("%1", shp_file)
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Warning,
+                    )
+                    continue
+
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
                     f"MultiLineString?crs={layer.crs().authid()}",
@@ -342,7 +354,9 @@ class TransportationDataGenerator:
             railway_network_folder = os.path.join(
                 self.base_path, "鉄道ネットワーク"
             )
-            shp_files = self.__get_shapefiles(railway_network_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                railway_network_folder
+            )
 
             if not shp_files:
                 data_name = self.tr("railway network")
@@ -361,27 +375,8 @@ class TransportationDataGenerator:
 
             for shp_file in shp_files:
                 year = self.__extract_year_from_path(shp_file)
-                encoding = self.__detect_encoding(shp_file)
-
-                # Shapefile 読み込み
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
-                layer.setProviderEncoding(encoding)
-
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
-                    )
-                    continue
-
                 # Shapefileの属性フィールドバリデーション
-                layer_fields = set(layer.fields().names())
+                layer_fields = set(self.source_catalog.get_fields(shp_file))
                 required_fields = {
                     "N02_001",
                     "N02_002",
@@ -405,6 +400,25 @@ class TransportationDataGenerator:
                     )
                     continue
 
+                encoding = self.source_catalog.get_encoding(shp_file)
+
+                # Shapefile 読み込み
+                layer = QgsVectorLayer(
+                    shp_file, os.path.basename(shp_file), "ogr"
+                )
+                layer.setProviderEncoding(encoding)
+
+                if not layer.isValid():
+                    msg = self.tr(
+                        "Failed to load layer: %1"
+                    ).replace("%1", shp_file)
+                    QgsMessageLog.logMessage(
+                        msg,
+                        self.tr("Plugin"),
+                        Qgis.Warning,
+                    )
+                    continue
+
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
                     f"MultiLineString?crs={layer.crs().authid()}",
@@ -556,8 +570,10 @@ class TransportationDataGenerator:
                 shapes_file = os.path.join(gtfs_folder, "shapes.txt")
 
                 # エンコードの検出
-                stops_encoding = self.__detect_encoding(stops_file)
-                stop_times_encoding = self.__detect_encoding(stop_times_file)
+                stops_encoding = self.source_catalog.get_encoding(stops_file)
+                stop_times_encoding = self.source_catalog.get_encoding(
+                    stop_times_file
+                )
 
                 # 停車回数を集計
                 stop_times_count = {}
@@ -714,7 +730,9 @@ class TransportationDataGenerator:
         try:
             # base_path 配下の「交通流動」フォルダを再帰的に探索してShapefileを収集
             traffic_flow_folder = os.path.join(self.base_path, "交通流動")
-            shp_files = self.__get_shapefiles(traffic_flow_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                traffic_flow_folder
+            )
 
             if not shp_files:
                 raise Exception(self.tr("The %1 layer was not found.")
@@ -759,52 +777,61 @@ class TransportationDataGenerator:
                 "S05a_035": "total_trip_count",
             }
 
-            # traffic_flowレイヤの作成
-            traffic_flow_layer = QgsVectorLayer(
-                "Polygon?crs=EPSG:4326", "traffics", "memory"
+            # 共有データがあれば再利用（一括処理時）
+            traffic_flow_layer = self.staging_manager.load_layer(
+                "traffics", shp_files
             )
-            traffic_provider = traffic_flow_layer.dataProvider()
-
-            # フィールド追加
-            fields = [
-                (
-                    QgsField(name, QVariant.Int)
-                    if "count" in name
-                    else QgsField(name, QVariant.String)
+            if traffic_flow_layer is None:
+                # traffic_flowレイヤの作成
+                traffic_flow_layer = QgsVectorLayer(
+                    "Polygon?crs=EPSG:4326", "traffics", "memory"
                 )
-                for name in field_mappings.values()
-            ]
-            traffic_provider.addAttributes(fields)
-            traffic_flow_layer.updateFields()
+                traffic_provider = traffic_flow_layer.dataProvider()
 
-            # 各Shapefileを処理
-            for shp_file in shp_files:
-                layer = QgsVectorLayer(
-                    shp_file, os.path.basename(shp_file), "ogr"
-                )
+                # フィールド追加
+                fields = [
+                    (
+                        QgsField(name, QVariant.Int)
+                        if "count" in name
+                        else QgsField(name, QVariant.String)
+                    )
+                    for name in field_mappings.values()
+                ]
+                traffic_provider.addAttributes(fields)
+                traffic_flow_layer.updateFields()
 
-                if not layer.isValid():
-                    msg = self.tr(
-                        "Failed to load layer: %1"
-                    ).replace("%1", shp_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Warning,
+                # 各Shapefileを処理
+                for shp_file in shp_files:
+                    layer = QgsVectorLayer(
+                        shp_file, os.path.basename(shp_file), "ogr"
                     )
-                    continue
 
-                # フィーチャの追加
-                for feature in layer.getFeatures():
-                    new_feature = QgsFeature()
-                    new_feature.setGeometry(feature.geometry())
+                    if not layer.isValid():
+                        msg = self.tr(
+                            "Failed to load layer: %1"
+                        ).replace("%1", shp_file)
+                        QgsMessageLog.logMessage(
+                            msg,
+                            self.tr("Plugin"),
+                            Qgis.Warning,
+                        )
+                        continue
 
-                    # マッピングに沿ってフィールドコピー
-                    attributes = [
-                        feature[field] for field in field_mappings.keys()
-                    ]
-                    new_feature.setAttributes(attributes)
-                    traffic_provider.addFeature(new_feature)
+                    # フィーチャの追加
+                    for feature in layer.getFeatures():
+                        new_feature = QgsFeature()
+                        new_feature.setGeometry(feature.geometry())
+
+                        # マッピングに沿ってフィールドコピー
+                        attributes = [
+                            feature[field] for field in field_mappings.keys()
+                        ]
+                        new_feature.setAttributes(attributes)
+                        traffic_provider.addFeature(new_feature)
+
+                traffic_flow_layer = self.staging_manager.save_layer(
+                    "traffics", shp_files, traffic_flow_layer
+                )
 
             # trafficsレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(
@@ -833,22 +860,6 @@ class TransportationDataGenerator:
             )
             return False
 
-    def __get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        msg = self.tr("Directory: %1").replace("%1", directory)
-        QgsMessageLog.logMessage(
-            msg,
-            self.tr("Plugin"),
-            Qgis.Info,
-        )
-
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
     def __merge_layers(self, layers):
         """複数のレイヤを1つにマージ"""
         result = processing.run(
@@ -858,6 +869,7 @@ class TransportationDataGenerator:
                 'CRS': layers[0].crs().authid(),
                 'OUTPUT': 'memory:merged_layer',
             },
+            feedback=ProgressManager.get_feedback(),
         )
 
         return result['OUTPUT']
@@ -893,35 +905,12 @@ class TransportationDataGenerator:
             )
             return None
 
-    def __detect_encoding(self, file_path):
-        """Shapefile に対応する DBF ファイルのエンコーディングを検出"""
-        dbf_file = file_path.replace(
-            '.shp', '.dbf'
-        )  # shpに対応する .dbf ファイルのパス
-        if os.path.exists(dbf_file):
-            with open(dbf_file, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                return encoding if encoding else 'SHIFT_JIS'
-        else:
-            msg = self.tr(
-                "No corresponding DBF file was found for the specified path: "
-                "%1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Warning,
-            )
-            return 'UTF-8'
-
     def __load_csv(self, file_path):
         """CSVファイルを読み込む"""
         data = []
         try:
             # ファイルのエンコーディングを検出
-            encoding = self.__detect_encoding(file_path)
+            encoding = self.source_catalog.get_encoding(file_path)
 
             # 検出したエンコーディングでファイルを読み込む
             with open(file_path, 'r', encoding=encoding) as csv_file:
@@ -7,30 +7,37 @@
 """
 
 import re
-import csv
+import bisect
 from qgis.core import (
     QgsMessageLog,
     Qgis,
-    QgsExpressionContext,
-    QgsExpressionContextUtils,
-    QgsAggregateCalculator,
     QgsVectorLayer,
     QgsFeature,
-    QgsCoordinateReferenceSystem,
+    QgsFeatureRequest,
+    NULL,
 )
 from PyQt5.QtCore import QCoreApplication
 import processing
 from .gpkg_manager import GpkgManager
+from .metric_result_store import MetricResultStore, round_or_na
+from .scratch_manager import ScratchManager
+from .reprojection_manager import ReprojectionManager
+from .layer_aggregator import LayerAggregator
+from .progress_manager import ProgressManager
 
 
 class UrbanFunctionInductionMetricCalculator:
     """都市機能誘導関連評価指標算出機能"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         self.base_path = base_path
 
         self.check_canceled = check_canceled_callback
 
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        self.scratch_manager = ScratchManager._instance
+        self.reprojection_manager = ReprojectionManager._instance
 
     def tr(self, message):
         """翻訳用のメソッド"""
@@ -93,11 +100,13 @@ class UrbanFunctionInductionMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': centroid_layer}
+                "native:createspatialindex",
+                {'INPUT': centroid_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            centroid_layer = self.gpkg_manager.add_layer(
-                centroid_layer, "tmp_building_centroids", None, False
+            centroid_layer = self.scratch_manager.add_layer(
+                centroid_layer, "tmp_building_centroids"
             )
             if not centroid_layer:
                 raise Exception(self.tr("Failed to add layer to GeoPackage."))
@@ -138,23 +147,15 @@ class UrbanFunctionInductionMetricCalculator:
 
             # 空間インデックス作成
             processing.run(
-                "native:createspatialindex", {'INPUT': urban_area_layer}
+                "native:createspatialindex",
+                {'INPUT': urban_area_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
-            # CRS変換先（EPSG:3857）
-            crs_dest = QgsCoordinateReferenceSystem(
-                3857
-            )  # メートル単位の座標系 (EPSG:3857)
-
-            # CRS変換
-            transformed_layer = processing.run(
-                "native:reprojectlayer",
-                {
-                    'INPUT': induction_layer,
-                    'TARGET_CRS': crs_dest,
-                    'OUTPUT': 'memory:',  # メモリーレイヤとして変換後のレイヤを保持
-                },
-            )['OUTPUT']
+            # メートル単位の座標系に変換済みの誘導区域（計算済みの場合は再利用）
+            transformed_layer = self.reprojection_manager.get_projected_layer(
+                'induction_areas'
+            )
 
             # 面積計算
             area = 0  # 居住誘導区域の面積(ha)
@@ -165,7 +166,7 @@ class UrbanFunctionInductionMetricCalculator:
                     # 面積計算 (ヘクタール単位へ変換: 1ヘクタール = 10,000平方メートル)
                     area += induction_feature.geometry().area() / 10000
 
-            area = self.round_or_na(area, 1)
+            area = round_or_na(area, 1)
 
             # 都市機能誘導区域内の建物を取得
             result = processing.run(
@@ -180,28 +181,17 @@ class UrbanFunctionInductionMetricCalculator:
                     'DISCARD_NONMATCHING': True,
                     'PREFIX': 'induction_area_',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 結合結果の取得
             urban_buildings = result['OUTPUT']
 
-            buildings_context = QgsExpressionContext()
-            buildings_context.appendScopes(
-                QgsExpressionContextUtils.globalProjectLayerScopes(
-                    buildings_layer
-                )
-            )
-
-            urban_context = QgsExpressionContext()
-            urban_context.appendScopes(
-                QgsExpressionContextUtils.globalProjectLayerScopes(
-                    urban_buildings
-                )
-            )
-
             # 空間インデックス作成(施設)
             processing.run(
-                "native:createspatialindex", {'INPUT': facilities_layer}
+                "native:createspatialindex",
+                {'INPUT': facilities_layer},
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 都市機能誘導区域内の施設を取得
@@ -217,53 +207,66 @@ class UrbanFunctionInductionMetricCalculator:
                     'DISCARD_NONMATCHING': True,
                     'PREFIX': 'induction_area_',
                 },
+                feedback=ProgressManager.get_feedback(),
             )
 
             # 結合結果の取得
             urban_facilities = result['OUTPUT']
 
-            for year in unique_years:
-                if self.check_canceled():
-                    return  # キャンセルチェック
-                area_pop = 0
+            # 施設を種別・年度・都市機能誘導区域内外ごとに集計
+            facility_counts = {}
+            self.__count_facilities(facilities_layer, False, facility_counts)
+            self.__count_facilities(urban_facilities, True, facility_counts)
+
+            # 種別ごとの年度一覧（昇順）
+            facility_years = {}
+            for facility_type, facility_year, _ in facility_counts:
+                if facility_year is not None:
+                    facility_years.setdefault(facility_type, set()).add(
+                        facility_year
+                    )
+            facility_years = {
+                facility_type: sorted(years)
+                for facility_type, years in facility_years.items()
+            }
 
+            # 全年度の人口を各レイヤ1回の走査でまとめて集計
+            pop_requests = []
+            for year in unique_years:
                 year_field = f"{year}_population"
 
-                # 総人口を集計
-                total_pop_result = buildings_layer.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    year_field,
-                    QgsAggregateCalculator.AggregateParameters(),
-                    buildings_context,
-                )
-                total_pop = (
-                    int(total_pop_result[0])
-                    if total_pop_result[0] is not None
-                    else 0
-                )
-
                 # SUMフィールドの確認
-                sum_field_name = f"{year_field}"
                 sum_field_index = urban_buildings.fields().indexFromName(
-                    sum_field_name
+                    year_field
                 )
 
                 # フィールドが存在するか確認
                 if sum_field_index == -1:
                     raise Exception(
-                        f"集計フィールド {sum_field_name} が見つかりません"
+                        f"集計フィールド {year_field} が見つかりません"
                     )
 
+                pop_requests.append((year_field, None))
+
+            if self.check_canceled():
+                return  # キャンセルチェック
+            total_sums = LayerAggregator(buildings_layer).sums(pop_requests)
+            if self.check_canceled():
+                return  # キャンセルチェック
+            urban_sums = LayerAggregator(urban_buildings).sums(pop_requests)
+
+            for year in unique_years:
+                if self.check_canceled():
+                    return  # キャンセルチェック
+                area_pop = 0
+
+                year_field = f"{year}_population"
+
+                # 総人口を集計
+                total_pop = int(total_sums[(year_field, None)])
+
                 # 都市機能区域内人口
-                sum_result = urban_buildings.aggregate(
-                    QgsAggregateCalculator.Aggregate.Sum,
-                    sum_field_name,
-                    QgsAggregateCalculator.AggregateParameters(),
-                    urban_context,
-                )
-                area_pop = (
-                    int(sum_result[0]) if sum_result[0] is not None else 0
-                )
+                area_pop = int(urban_sums[(year_field, None)])
 
                 # 各施設種別の市内および都市機能誘導区域内の立地数を集計
                 facility_types = [1, 2, 3, 4, 5, 6, 7]  # type属性の定義
@@ -271,81 +274,32 @@ class UrbanFunctionInductionMetricCalculator:
                 total_qty_facilities = {}
                 qty_facilities_in_urban_area = {}
                 for facility_type in facility_types:
-                    # 市内の各施設種別の立地数をフィルタリングして集計
-                    expression = (
-                        f'"type" = {facility_type} AND "year" IS NOT NULL'
-                    )
-                    facilities_layer.selectByExpression(
-                        expression, QgsVectorLayer.SetSelection
-                    )
-
-                    # フィルタリングされたフィーチャから年度をユニークに取得
-                    year_values = set(
-                        feature["year"]
-                        for feature in facilities_layer.getSelectedFeatures()
-                        if feature["year"] is not None
-                    )
-
-                    year_num = int(year)
-                    # ループ対象の 年度 が存在するかを確認
-                    if year_num in year_values:
-                        # ループ対象の 年度 が存在する場合は、その 年度 を条件にする
-                        expression = (
-                            f'"type" = {facility_type} AND "year" = {year}'
+                    # 市内の各施設種別の立地数を集計
+                    total_qty_facilities[facility_type] = (
+                        self.__get_total_facility_count(
+                            facility_counts, facility_years,
+                            facility_type, int(year),
                         )
-                    elif year_values:
-                        # 存在しない場合、過去の年で最も新しい年度を選択
-                        closest_year = max(year_values)
-
-                        expression = (
-                            f'"type" = {facility_type} '
-                            f'AND "year" = {closest_year}'
-                        )
-
-                    else:
-                        # 年度がない場合、NULL を条件にする
-                        expression = (
-                            f'"type" = {facility_type} AND "year" IS NULL'
-                        )
-
-                    # フィルタに基づいて条件に一致するフィーチャを取得
-                    facilities_layer.selectByExpression(
-                        expression, QgsVectorLayer.SetSelection
-                    )
-
-                    # 一致するフィーチャの数を取得
-                    total_qty_facility = facilities_layer.selectedFeatureCount()
-                    total_qty_facilities[facility_type] = total_qty_facility
-
-                    # 都市機能誘導区域内の各施設種別の立地数をフィルタリングして集計
-                    # 同様に、都市機能誘導区域内のフィーチャをフィルタリング
-                    urban_expression = (
-                        f'"type" = {facility_type} AND '
-                        f'("year" IS NULL OR "year" <= {year})'
-                    )
-
-                    # フィルタリングしてフィーチャ数を取得
-                    urban_facilities.selectByExpression(
-                        urban_expression, QgsVectorLayer.SetSelection
                     )
 
-                    qty_facility_in_urban_area = (
-                        urban_facilities.selectedFeatureCount()
-                    )
+                    # 都市機能誘導区域内の各施設種別の立地数を集計
                     qty_facilities_in_urban_area[facility_type] = (
-                        qty_facility_in_urban_area
+                        self.__get_urban_facility_count(
+                            facility_counts, facility_years,
+                            facility_type, int(year),
+                        )
                     )
 
                 # 都市機能誘導区域内人口割合
                 rate_pop = (
-                    self.round_or_na((area_pop / total_pop) * 100, 2)
+                    round_or_na((area_pop / total_pop) * 100, 2)
                     if total_pop > 0
                     else 0
                 )
 
                 # 都市機能誘導区域内人口密度を計算
                 pop_area_density = (
-                    self.round_or_na(area_pop / area, 2) if area > 0 else '―'
+                    round_or_na(area_pop / area, 2) if area > 0 else None
                 )  # haあたりの人口密度
 
                 rate_qty_facilities = {}
@@ -363,7 +317,7 @@ class UrbanFunctionInductionMetricCalculator:
 
                     # 総人口の変化率
                     rate_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (total_pop - previous_total_pop)
                                 / previous_total_pop
@@ -372,23 +326,23 @@ class UrbanFunctionInductionMetricCalculator:
                             1,
                         )
                         if previous_total_pop > 0
-                        else '―'
+                        else None
                     )
 
                     # 都市機能誘導区域内人口割合の変化率
                     rate_area_pop_change = (
-                        self.round_or_na(
+                        round_or_na(
                             ((rate_pop - previous_rate_pop) / previous_rate_pop)
                             * 100,
                             1,
                         )
                         if previous_rate_pop > 0
-                        else '―'
+                        else None
                     )
 
                     # 都市機能誘導区域内人口密度の変化率
                     rate_density_change = (
-                        self.round_or_na(
+                        round_or_na(
                             (
                                 (pop_area_density - previous_pop_area_density)
                                 / previous_pop_area_density
@@ -397,7 +351,7 @@ class UrbanFunctionInductionMetricCalculator:
                             1,
                         )
                         if previous_pop_area_density > 0
-                        else '―'
+                        else None
                     )
 
                     # 施設の変化を算出
@@ -411,7 +365,7 @@ class UrbanFunctionInductionMetricCalculator:
 
                         # 立地数の変化率を計算（都市機能誘導区域内）
                         if previous_qty_facility > 0:
-                            rate_qty_facility = self.round_or_na(
+                            rate_qty_facility = round_or_na(
                                 (
                                     (
                                         qty_facilities_in_urban_area[
@@ -429,7 +383,7 @@ class UrbanFunctionInductionMetricCalculator:
 
                         # 前年度の変化率との差を計算
                         if isinstance(previous_rate_qty_facility, (int, float)):
-                            rate_qty_change_for_type = self.round_or_na(
+                            rate_qty_change_for_type = round_or_na(
                                 (
                                     rate_qty_facility
                                     - previous_rate_qty_facility
@@ -437,7 +391,7 @@ class UrbanFunctionInductionMetricCalculator:
                                 2,
                             )
                         else:
-                            rate_qty_change_for_type = '―'
+                            rate_qty_change_for_type = None
 
                         rate_qty_facilities[facility_type] = rate_qty_facility
                         rate_qty_change[facility_type] = (
@@ -445,13 +399,13 @@ class UrbanFunctionInductionMetricCalculator:
                         )
 
                 else:
-                    rate_pop_change = '―'
-                    rate_area_pop_change = '―'
-                    rate_density_change = '―'
+                    rate_pop_change = None
+                    rate_area_pop_change = None
+                    rate_density_change = None
 
                     for facility_type in facility_types:
-                        rate_qty_facilities[facility_type] = '―'
-                        rate_qty_change[facility_type] = '―'
+                        rate_qty_facilities[facility_type] = None
+                        rate_qty_change[facility_type] = None
 
                 # データを辞書にまとめる
                 year_data = {
@@ -497,7 +451,7 @@ class UrbanFunctionInductionMetricCalculator:
                 if total_urban_facilities > 0:
                     # 各施設種別の割合を計算
                     for facility_type in facility_types:
-                        rate_all_facility = self.round_or_na(
+                        rate_all_facility = round_or_na(
                             (
                                 qty_facilities_in_urban_area[facility_type]
                                 / total_urban_facilities
@@ -512,14 +466,14 @@ class UrbanFunctionInductionMetricCalculator:
 
                     # 誤差チェック
                     total_rate = sum(rate_all_facility_list)
-                    rounding_error = self.round_or_na(100 - total_rate, 2)
+                    rounding_error = round_or_na(100 - total_rate, 2)
 
                     # 誤差調整
                     if rounding_error != 0:
                         max_index = rate_all_facility_list.index(
                             max(rate_all_facility_list)
                         )
-                        adjusted_value = self.round_or_na(
+                        adjusted_value = round_or_na(
                             rate_all_facility_list[max_index] + rounding_error,
                             2,
                         )
@@ -530,7 +484,9 @@ class UrbanFunctionInductionMetricCalculator:
                 else:
                     # 全施設数が0の場合
                     for facility_type in facility_types:
-                        year_data[f'Rate_ALLFacility_{facility_type:02}'] = '―'
+                        year_data[
+                            f'Rate_ALLFacility_{facility_type:02}'
+                        ] = None
 
                 # 前年度からの施設立地数の変化率を計算
                 if (
@@ -544,7 +500,7 @@ class UrbanFunctionInductionMetricCalculator:
 
                     if previous_qty_facility > 0:
                         # 前年度との変化率を計算
-                        rate_qty_facility_change = self.round_or_na(
+                        rate_qty_facility_change = round_or_na(
                             (
                                 (current_qty_facility - previous_qty_facility)
                                 / previous_qty_facility
@@ -553,14 +509,14 @@ class UrbanFunctionInductionMetricCalculator:
                             2,
                         )
                     else:
-                        # 前年度の施設数が 0 の場合は変化率を計算できないので '―' にする
-                        rate_qty_facility_change = '―'
+                        # 前年度の施設数が 0 の場合は変化率を計算できないので欠損値（None）にする
+                        rate_qty_facility_change = None
 
                     year_data['Rate_Qty_Facility_00'] = (
                         rate_qty_facility_change
                     )
                 else:
-                    year_data['Rate_Qty_Facility_00'] = '―'
+                    year_data['Rate_Qty_Facility_00'] = None
 
                 # 前年度からの施設立地数の変化率
                 for facility_type in facility_types:
@@ -575,27 +531,25 @@ class UrbanFunctionInductionMetricCalculator:
                     ] = rate_qty_change[facility_type]
 
                 # TODO:都市機能誘導区域内の施設利用者総数 次年度向け
-                year_data['User_Facility_00'] = '―'
+                year_data['User_Facility_00'] = None
 
                 for facility_type in facility_types:
                     # TODO:都市機能誘導区域内の施設種別利用者数 次年度向け
-                    year_data[f'User_Facility_{facility_type:02}'] = '―'
+                    year_data[f'User_Facility_{facility_type:02}'] = None
 
                 # TODO:前年度からの施設利用者数の変化率 次年度向け
-                year_data['Rate_User_Facility_00'] = '―'
+                year_data['Rate_User_Facility_00'] = None
 
                 for facility_type in facility_types:
                     # TODO:都市機能誘導区域内の施設種別利用者数の変化 次年度向け
-                    year_data[f'Rate_User_Facility_{facility_type:02}'] = '―'
+                    year_data[f'Rate_User_Facility_{facility_type:02}'] = None
 
                 # 辞書をリストに追加
                 data_list.append(year_data)
 
-            # ファイルパスを指定してエクスポート
-            self.export(
-                self.base_path
-                + '\\IF102_都市機能誘導区域関連評価指標ファイル.csv',
-                data_list,
+            # 算出結果を保存し、評価指標ファイルを出力
+            MetricResultStore(self.gpkg_manager).save(
+                'IF102', data_list, self.base_path
             )
 
             return
@@ -609,49 +563,49 @@ class UrbanFunctionInductionMetricCalculator:
             )
             raise e
 
-    def export(self, file_path, data):
-        """エクスポート処理"""
-        try:
-            if not data:
-                raise Exception(self.tr("The data to export is empty."))
-
-            # データ項目からヘッダーを取得
-            headers = list(data[0].keys())
-
-            # CSVファイル書き込み
-            with open(
-                file_path, mode='w', newline='', encoding='utf-8'
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=headers)
-                writer.writeheader()
-
-                for row in data:
-                    writer.writerow(row)
-
-            msg = self.tr(
-                "File export completed: %1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
+    def __count_facilities(self, layer, in_urban_area, facility_counts):
+        """施設を (種別, 年度, 都市機能誘導区域内) ごとに1回の走査で集計"""
+        type_index = layer.fields().indexOf("type")
+        year_index = layer.fields().indexOf("year")
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes([type_index, year_index])
+
+        for feature in layer.getFeatures(request):
+            facility_type = feature.attribute(type_index)
+            if facility_type is None or facility_type == NULL:
+                continue
+            facility_year = feature.attribute(year_index)
+            if facility_year is None or facility_year == NULL:
+                facility_year = None
+            else:
+                facility_year = int(facility_year)
+
+            key = (int(facility_type), facility_year, in_urban_area)
+            facility_counts[key] = facility_counts.get(key, 0) + 1
+
+    def __get_total_facility_count(
+        self, facility_counts, facility_years, facility_type, year
+    ):
+        """市内の施設立地数を取得（対象年度がない場合は直近の過去年度を使用）"""
+        years = facility_years.get(facility_type, [])
+        if not years:
+            # 年度がない場合、年度が NULL の施設を集計
+            return facility_counts.get((facility_type, None, False), 0)
+
+        # 対象年度以前で最も新しい年度（過去の年度がない場合は最新年度）
+        index = bisect.bisect_right(years, year)
+        closest_year = years[index - 1] if index > 0 else years[-1]
+        return facility_counts.get((facility_type, closest_year, False), 0)
+
+    def __get_urban_facility_count(
+        self, facility_counts, facility_years, facility_type, year
+    ):
+        """都市機能誘導区域内の施設立地数を取得（年度が NULL または対象年度以前）"""
+        years = facility_years.get(facility_type, [])
+        count = facility_counts.get((facility_type, None, True), 0)
+        for facility_year in years[:bisect.bisect_right(years, year)]:
+            count += facility_counts.get(
+                (facility_type, facility_year, True), 0
             )
-            return True
-        except Exception as e:
-            # エラーメッセージのログ出力
-            msg = self.tr(
-                "An error occurred during file export: %1."
-            ).replace("%1", e)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Critical,
-            )
-            raise e
-
-    def round_or_na(self, value, decimal_places, threshold=None):
-        """丸め処理"""
-        if value is None or (threshold is not None and value <= threshold):
-            return '―'
-        else:
-            return round(value, decimal_places)
+        return count
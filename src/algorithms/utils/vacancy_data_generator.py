@@ -7,7 +7,6 @@
 """
 
 import os
-import chardet
 from qgis.core import (
     QgsMessageLog,
     Qgis,
@@ -17,16 +16,23 @@ from qgis.core import (
     QgsProject,
 )
 from PyQt5.QtCore import QCoreApplication, QVariant
-import processing
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
+from .reprojection_manager import ReprojectionManager
 
 
 class VacancyDataGenerator:
     """空き家データ作成"""
 
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
+        # 座標変換管理
+        self.reprojection_manager = ReprojectionManager._instance
         # インプットデータパス
         self.base_path = base_path
 
@@ -41,7 +47,7 @@ class VacancyDataGenerator:
         try:
             # base_path 配下の「空き家ポイント」フォルダを再帰的に探索してShapefileを収集
             vacancy_folder = os.path.join(self.base_path, "空き家ポイント")
-            shp_files = self.__get_shapefiles(vacancy_folder)
+            shp_files = self.source_catalog.get_shapefiles(vacancy_folder)
 
             # プロジェクトのCRSを取得
             project_crs = QgsProject.instance().crs()
@@ -55,17 +61,8 @@ class VacancyDataGenerator:
                     "ogr"
                 )
                 if layer.isValid():
-                    # ShapefileのCRSがプロジェクトのCRSと異なる場合、再投影
-                    if layer.crs() != project_crs:
-                        layer = processing.run(
-                            "native:reprojectlayer",
-                            {
-                                'INPUT': layer,
-                                'TARGET_CRS': project_crs,
-                                'OUTPUT': 'memory:'
-                            }
-                        )['OUTPUT']
-                    crs = layer.crs()
+                    # 各Shapefileはプロジェクトの CRS に再投影して取り込む
+                    crs = project_crs
                 else:
                     msg = self.tr(
                         "Failed to load layer: %1"
@@ -106,7 +103,7 @@ class VacancyDataGenerator:
                 year_str = folder.replace('年', '')
                 year = int(year_str) if year_str.isdigit() else None
 
-                encoding = self.__detect_encoding(shp_file)
+                encoding = self.source_catalog.get_encoding(shp_file)
                 layer = QgsVectorLayer(
                     shp_file,
                     os.path.basename(shp_file),
@@ -127,15 +124,9 @@ class VacancyDataGenerator:
                     continue
 
                 # ShapefileのCRSがプロジェクトのCRSと異なる場合、再投影
-                if layer.crs() != project_crs:
-                    layer = processing.run(
-                        "native:reprojectlayer",
-                        {
-                            'INPUT': layer,
-                            'TARGET_CRS': project_crs,
-                            'OUTPUT': 'memory:'
-                        }
-                    )['OUTPUT']
+                layer = self.reprojection_manager.reproject_layer(
+                    layer, project_crs
+                )
 
                 # フィーチャの追加
                 for feature in layer.getFeatures():
@@ -171,70 +162,3 @@ class VacancyDataGenerator:
                 Qgis.Critical,
             )
             return False
-
-    def __get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        msg = self.tr("Directory: %1").replace("%1", directory)
-        QgsMessageLog.logMessage(
-            msg,
-            self.tr("Plugin"),
-            Qgis.Info,
-        )
-
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
-    def __detect_encoding(self, file_path):
-        """Shapefile に対応する DBF ファイルのエンコーディングを検出"""
-        dbf_file = file_path.replace(
-            '.shp', '.dbf'
-        )  # shpに対応する .dbf ファイルのパス
-        if os.path.exists(dbf_file):
-            with open(dbf_file, 'rb') as file:
-                raw_data = file.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                if encoding == 'MacRoman':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "MacRoman").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                if encoding == 'Windows-1254':
-                    msg = self.tr(
-                        "%1 was detected. Using SHIFT_JIS for the file %2."
-                    ).replace("%1", "Windows-1254").replace("%2", dbf_file)
-                    QgsMessageLog.logMessage(
-                        msg,
-                        self.tr("Plugin"),
-                        Qgis.Info,
-                    )
-                    encoding = 'SHIFT_JIS'
-
-                msg = self.tr("Detected encoding: %1").replace("%1", encoding)
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
-                return encoding if encoding else 'SHIFT_JIS'
-        else:
-            msg = self.tr(
-                "No corresponding DBF file was found for the specified path: "
-                "%1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Warning,
-            )
-            return 'UTF-8'
@@ -8,7 +8,6 @@
 
 import os
 import processing
-import chardet
 from qgis.core import (
     QgsMessageLog,
     Qgis,
@@ -19,13 +18,22 @@ from qgis.core import (
 )
 from PyQt5.QtCore import QCoreApplication, QVariant
 from .gpkg_manager import GpkgManager
+from .source_catalog import SourceCatalog
+from .reprojection_manager import ReprojectionManager
+from .progress_manager import ProgressManager
 
 
 class ZoneDataGenerator:
     """ゾーンポリゴンデータ取り込み・レイヤ作成"""
-    def __init__(self, base_path, check_canceled_callback=None):
+    def __init__(
+        self, base_path, check_canceled_callback=None, gpkg_manager=None
+    ):
         # GeoPackageマネージャーを初期化
-        self.gpkg_manager = GpkgManager._instance
+        self.gpkg_manager = gpkg_manager or GpkgManager._instance
+        # 入力データカタログ
+        self.source_catalog = SourceCatalog._instance
+        # 座標変換管理
+        self.reprojection_manager = ReprojectionManager._instance
         # インプットデータパス
         self.base_path = base_path
 
@@ -40,7 +48,9 @@ class ZoneDataGenerator:
         try:
             # base_path 配下の「ゾーンポリゴン」フォルダを再帰的に探索してShapefileを収集
             induction_area_folder = os.path.join(self.base_path, "ゾーンポリゴン")
-            shp_files = self.__get_shapefiles(induction_area_folder)
+            shp_files = self.source_catalog.get_shapefiles(
+                induction_area_folder
+            )
 
             # プロジェクトのCRSを取得
             project_crs = QgsProject.instance().crs()
@@ -51,7 +61,7 @@ class ZoneDataGenerator:
             for shp_file in shp_files:
                 if self.check_canceled():
                     return False  # キャンセルチェック
-                encoding = self.__detect_encoding(shp_file)
+                encoding = self.source_catalog.get_encoding(shp_file)
 
                 # Shapefile 読み込み
                 layer = QgsVectorLayer(
@@ -73,12 +83,9 @@ class ZoneDataGenerator:
                     continue
 
                 # プロジェクトのCRSに再投影
-                if layer.crs() != project_crs:
-                    layer = processing.run("native:reprojectlayer", {
-                        'INPUT': layer,
-                        'TARGET_CRS': project_crs,
-                        'OUTPUT': 'memory:'
-                    })['OUTPUT']
+                layer = self.reprojection_manager.reproject_layer(
+                    layer, project_crs
+                )
 
                 # 一時メモリレイヤを作成し、Shapefileのデータを取り込み
                 temp_layer = QgsVectorLayer(
@@ -131,7 +138,11 @@ class ZoneDataGenerator:
             merged_layer = self.__fix_invalid_geometries(merged_layer)
 
             # 空間インデックス作成
-            processing.run("native:createspatialindex", {'INPUT': merged_layer})
+            processing.run(
+                "native:createspatialindex",
+                {'INPUT': merged_layer},
+                feedback=ProgressManager.get_feedback(),
+            )
 
             # zonesレイヤをGeoPackageに保存
             if not self.gpkg_manager.add_layer(merged_layer, "zones", "行政区域"):
@@ -165,77 +176,11 @@ class ZoneDataGenerator:
                 'CRS': layers[0].crs().authid(),
                 'OUTPUT': 'memory:merged_layer',
             },
+            feedback=ProgressManager.get_feedback(),
         )
 
         return result['OUTPUT']
 
-    def __get_shapefiles(self, directory):
-        """指定されたディレクトリ配下のすべてのShapefile (.shp) を再帰的に取得する"""
-        msg = self.tr("Directory: %1").replace("%1", directory)
-        QgsMessageLog.logMessage(
-            msg,
-            self.tr("Plugin"),
-            Qgis.Info,
-        )
-
-        shp_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith(".shp"):
-                    shp_files.append(os.path.join(root, file))
-        return shp_files
-
-    def __detect_encoding(self, file_path):
-        """Shapefile に対応する DBF ファイルのエンコーディングを検出"""
-        dbf_file = file_path.replace(
-            '.shp', '.dbf'
-        )  # shpに対応する .dbf ファイルのパス
-        if os.path.exists(dbf_file):
-            with open(dbf_file, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-            if encoding == 'MacRoman':
-                msg = self.tr(
-                    "%1 was detected. Using SHIFT_JIS for the file %2."
-                ).replace("%1", "MacRoman").replace("%2", dbf_file)
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
-                encoding = 'SHIFT_JIS'
-
-            if encoding == 'Windows-1254':
-                msg = self.tr(
-                    "%1 was detected. Using SHIFT_JIS for the file %2."
-                ).replace("%1", "Windows-1254").replace("%2", dbf_file)
-                QgsMessageLog.logMessage(
-                    msg,
-                    self.tr("Plugin"),
-                    Qgis.Info,
-                )
-                encoding = 'SHIFT_JIS'
-
-            msg = self.tr("Detected encoding: %1").replace("%1", encoding)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Info,
-            )
-            return encoding if encoding else 'SHIFT_JIS'
-        else:
-            msg = self.tr(
-                "No corresponding DBF file was found for the specified path: "
-                "%1."
-            ).replace("%1", file_path)
-            QgsMessageLog.logMessage(
-                msg,
-                self.tr("Plugin"),
-                Qgis.Warning,
-            )
-            return 'UTF-8'
-
     def __fix_invalid_geometries(self, layer):
         """Fix invalid geometries in the layer"""
         msg_start = self.tr(
@@ -249,6 +194,7 @@ class ZoneDataGenerator:
         result = processing.run(
             "native:fixgeometries",
             {'INPUT': layer, 'OUTPUT': 'memory:fixed_layer'},
+            feedback=ProgressManager.get_feedback(),
         )
         msg_complete = self.tr(
             "Completed fixing invalid geometries in layer: %1."
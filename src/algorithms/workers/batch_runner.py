@@ -0,0 +1,341 @@
+"""
+/***************************************************************************
+ *
+ * 評価指標算出バッチ実行（GUIなし）
+ *
+ * 使用例（プラグインの親フォルダで実行）:
+ *   python -m <plugin>.algorithms.workers.batch_runner config.xml
+ *   python -m <plugin>.algorithms.workers.batch_runner manifest.xml \
+ *       --processes 4
+ *   python -m <plugin>.algorithms.workers.batch_runner config.xml \
+ *       --render-charts --chart-processes 4
+ *   python -m <plugin>.algorithms.workers.batch_runner config.xml \
+ *       --scratch-format FlatGeobuf
+ *
+ * 設定ファイルはダイアログと同じ MetricCalculationConfig.xml 形式、
+ * または複数自治体分の config 要素を batch 要素にまとめたマニフェスト。
+ * batch 直下のしきい値は各 config の既定値として使用する。
+ * staging_folder を指定すると、道路・ハザード・地価公示・交通流動などの
+ * 広域データを初回のみ取り込んで共有し、各自治体では範囲内のみ抽出する。
+ *
+ *   <batch>
+ *     <staging_folder>/data/staging</staging_folder>
+ *     <threshold_bus>500</threshold_bus>
+ *     <threshold_railway>500</threshold_railway>
+ *     <threshold_shelter>500</threshold_shelter>
+ *     <config>
+ *       <name>city_a</name>
+ *       <input_folder>/data/city_a/input</input_folder>
+ *       <output_folder>/data/city_a/output</output_folder>
+ *     </config>
+ *   </batch>
+ *
+ * --render-charts を指定すると、算出後に可視化用のグラフ画像を出力フォルダの
+ * charts フォルダに作成する（--chart-processes のプロセス数で並列作成）。
+ *
+ * --scratch-format で中間データ（一時レイヤ）の保存形式を指定する。
+ * GPKG（既定）は作業用GeoPackageにまとめて保存し、FlatGeobuf・GeoParquet は
+ * レイヤごとに1ファイルとして保存する（書き込み時間はログで比較できる）。
+ *
+ * 進捗は1行1件のJSONとして標準出力に出力する。
+ * Ctrl+C で実行中の処理をキャンセルする。
+ *
+ ***************************************************************************/
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+import xml.etree.ElementTree as ET
+
+
+# 設定ファイルの必須項目
+REQUIRED_SETTINGS = [
+    'input_folder',
+    'output_folder',
+    'threshold_bus',
+    'threshold_railway',
+    'threshold_shelter',
+]
+
+
+def emit(event, **values):
+    """進捗イベントをJSON形式で標準出力に出力"""
+    values['event'] = event
+    values['time'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    print(json.dumps(values, ensure_ascii=False), flush=True)
+
+
+def load_jobs(config_path):
+    """設定ファイル（単一設定またはマニフェスト）から処理対象を読み込む"""
+    root = ET.parse(config_path).getroot()
+    if root.tag == 'config':
+        elements = [root]
+        defaults = {}
+    elif root.tag == 'batch':
+        elements = root.findall('config')
+        defaults = {
+            child.tag: child.text
+            for child in root
+            if child.tag != 'config' and child.text
+        }
+    else:
+        raise Exception(f"Unsupported configuration root: {root.tag}")
+
+    jobs = []
+    for index, element in enumerate(elements):
+        job = dict(defaults)
+        job.update(
+            {child.tag: child.text for child in element if child.text}
+        )
+        missing = [key for key in REQUIRED_SETTINGS if not job.get(key)]
+        if missing:
+            raise Exception(
+                f"Missing settings in job {index}: {', '.join(missing)}"
+            )
+        job.setdefault(
+            'name', os.path.basename(os.path.normpath(job['input_folder']))
+        )
+        jobs.append(job)
+
+    # 並列実行時に GeoPackage を共有しないよう出力フォルダの重複を禁止
+    output_folders = [
+        os.path.normcase(os.path.abspath(job['output_folder']))
+        for job in jobs
+    ]
+    if len(set(output_folders)) != len(output_folders):
+        raise Exception("Output folders must be unique for each job.")
+
+    return jobs
+
+
+def init_qgis():
+    """GUIなしでQGISとProcessingを初期化"""
+    from qgis.core import QgsApplication
+
+    QgsApplication.setPrefixPath(
+        os.environ.get('QGIS_PREFIX_PATH', '/usr'), True
+    )
+    qgs = QgsApplication([], False)
+    qgs.initQgis()
+
+    # processing プラグインを読み込めるようにする
+    plugins_path = os.path.join(
+        QgsApplication.pkgDataPath(), 'python', 'plugins'
+    )
+    if plugins_path not in sys.path:
+        sys.path.append(plugins_path)
+
+    from processing.core.Processing import Processing
+    from qgis.analysis import QgsNativeAlgorithms
+
+    Processing.initialize()
+    QgsApplication.processingRegistry().addProvider(QgsNativeAlgorithms())
+    return qgs
+
+
+def forward_log_messages(verbose):
+    """QGISのメッセージログを進捗イベントとして出力"""
+    from qgis.core import Qgis, QgsApplication
+
+    def on_message(message, tag, level):
+        if verbose or level in (Qgis.Warning, Qgis.Critical):
+            emit('log', tag=tag, level=int(level), message=message)
+
+    QgsApplication.messageLog().messageReceived.connect(on_message)
+    return on_message
+
+
+def cancel_on_interrupt():
+    """Ctrl+C で実行中の processing.run を含めてキャンセル"""
+    from ..utils import ProgressManager
+
+    def on_interrupt(signum, frame):
+        if ProgressManager._instance:
+            ProgressManager._instance.cancel()
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+
+def release_output(output_folder):
+    """
+    プロジェクトから出力レイヤを外し、出力先GeoPackageを単一ファイルに戻す
+    （GUIなしではレイヤを表示しないため、WALの解除を妨げる接続を閉じる）
+    """
+    from qgis.core import QgsProject
+    from ..utils import GpkgManager
+
+    QgsProject.instance().removeAllMapLayers()
+    session = GpkgManager(output_folder, shared=False)
+    session.get_connection()
+    session.close()
+
+
+def run_job(
+    job, render_charts=False, chart_processes=1, scratch_format='GPKG'
+):
+    """1自治体分の評価指標算出を実行"""
+    from .metric_calculation_pipeline import MetricCalculationPipeline
+    from ...functions.chart_cache import ChartCache
+
+    name = job['name']
+    emit('start', job=name)
+    started = time.time()
+    try:
+        pipeline = MetricCalculationPipeline(
+            job['input_folder'],
+            job['output_folder'],
+            job['threshold_bus'],
+            job['threshold_railway'],
+            job['threshold_shelter'],
+            progress_callback=lambda value, stage: emit(
+                'progress', job=name, stage=stage, value=value
+            ),
+            staging_folder=job.get('staging_folder'),
+            scratch_format=scratch_format,
+        )
+        completed = pipeline.run()
+        release_output(job['output_folder'])
+        if not completed:
+            emit('canceled', job=name)
+            return False
+        if render_charts:
+            emit('progress', job=name, stage='charts', value=100)
+            count = ChartCache(job['output_folder']).render(chart_processes)
+            emit('charts', job=name, images=count)
+        emit(
+            'finished',
+            job=name,
+            elapsed=round(time.time() - started, 1),
+        )
+        return True
+
+    except Exception as e:
+        emit('error', job=name, message=str(e))
+        return False
+
+
+def run_processes(config_path, jobs, processes, verbose, job_options):
+    """各自治体を別プロセスで並列実行（GeoPackage・シングルトンは分離）"""
+    module = __spec__.name if __name__ == '__main__' else __name__
+    pending = list(range(len(jobs)))
+    running = {}
+    failed = 0
+
+    # 広域データを共有する場合は、最初の自治体で共有データを作成してから並列実行
+    staging_first = bool(jobs[0].get('staging_folder'))
+
+    while pending or running:
+        limit = 1 if staging_first else processes
+        while pending and len(running) < limit:
+            index = pending.pop(0)
+            command = [
+                sys.executable, '-m', module, config_path,
+                '--job', str(index),
+            ]
+            if verbose:
+                command.append('--verbose')
+            command.extend(job_options)
+            running[index] = subprocess.Popen(command)
+
+        for index, process in list(running.items()):
+            if process.poll() is not None:
+                if process.returncode != 0:
+                    failed += 1
+                del running[index]
+                staging_first = False
+        time.sleep(1)
+
+    return failed
+
+
+def main(argv=None):
+    """コマンドライン実行"""
+    parser = argparse.ArgumentParser(
+        description='Run the metric calculation pipeline without the GUI.'
+    )
+    parser.add_argument(
+        'config',
+        help='MetricCalculationConfig.xml or batch manifest',
+    )
+    parser.add_argument(
+        '--processes', type=int, default=1,
+        help='number of municipalities processed in parallel',
+    )
+    parser.add_argument(
+        '--job', type=int, default=None,
+        help='index of the single job to run in the manifest',
+    )
+    parser.add_argument(
+        '--verbose', action='store_true',
+        help='output all QGIS log messages',
+    )
+    parser.add_argument(
+        '--render-charts', action='store_true',
+        help='render chart images after the calculation',
+    )
+    parser.add_argument(
+        '--chart-processes', type=int, default=1,
+        help='number of processes rendering chart images',
+    )
+    parser.add_argument(
+        '--scratch-format', default='GPKG',
+        choices=['GPKG', 'FlatGeobuf', 'GeoParquet'],
+        help='storage format of intermediate layers',
+    )
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.config)
+    if args.job is not None:
+        jobs = [jobs[args.job]]
+
+    # 複数自治体の並列実行は自治体ごとに別プロセスで実行
+    if args.processes > 1 and len(jobs) > 1:
+        job_options = ['--scratch-format', args.scratch_format]
+        if args.render_charts:
+            job_options.extend([
+                '--render-charts',
+                '--chart-processes', str(args.chart_processes),
+            ])
+        failed = run_processes(
+            args.config, jobs, args.processes, args.verbose, job_options
+        )
+        emit('summary', jobs=len(jobs), failed=failed)
+        return 1 if failed else 0
+
+    qgs = init_qgis()
+    log_handler = forward_log_messages(args.verbose)
+    cancel_on_interrupt()
+    failed = 0
+    try:
+        from ..utils import ProgressManager
+
+        for job in jobs:
+            if not run_job(
+                job,
+                args.render_charts,
+                args.chart_processes,
+                args.scratch_format,
+            ):
+                failed += 1
+            # キャンセルされた場合は残りの自治体を実行しない
+            # （実行前に失敗した場合は進捗・キャンセル管理が未作成）
+            pm = ProgressManager._instance
+            if pm is not None and pm.is_canceled():
+                break
+    finally:
+        from qgis.core import QgsApplication
+
+        QgsApplication.messageLog().messageReceived.disconnect(log_handler)
+        qgs.exitQgis()
+
+    if args.job is None:
+        emit('summary', jobs=len(jobs), failed=failed)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
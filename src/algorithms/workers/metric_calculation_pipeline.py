@@ -0,0 +1,310 @@
+"""
+/***************************************************************************
+ *
+ * 評価指標算出処理
+ *
+ ***************************************************************************/
+"""
+import threading
+
+from PyQt5.QtCore import QCoreApplication
+from ..utils import (
+    GpkgManager,
+    SourceCatalog,
+    ReprojectionManager,
+    StagingManager,
+    ProgressManager,
+    SpatialIndexRegistry,
+    ScratchManager,
+    ZoneDataGenerator,
+    VacancyDataGenerator,
+    DataLoader,
+    PopulationDataGenerator,
+    FacilityDataGenerator,
+    TransportationDataGenerator,
+    BuildingDataAssigner,
+    AreaDataGenerator,
+    FinancialDataGenerator,
+    LayerClassifier,
+    LayerGeneralizer,
+    ResidentialInductionMetricCalculator,
+    UrbanFunctionInductionMetricCalculator,
+    PublicTransportMetricCalculator,
+    FiscalMetricCalculator,
+    LandUseMetricCalculator,
+    DisasterPreventionMetricCalculator,
+)
+
+
+class MetricCalculationPipeline:
+    """
+    評価指標算出処理（GUIに依存しない各機能の順次実行）
+    GeoPackageのセッションは実行ごとに作成するが、進捗・キャンセル管理、
+    座標変換管理、一時レイヤ管理、空間インデックス管理などはプロセス内で
+    共有するため、同じプロセスでは1件ずつ実行する
+    （複数自治体の並列実行は batch_runner で自治体ごとに別プロセスとする）。
+    """
+    # 同じプロセス内での実行を直列化するロック
+    _run_lock = threading.Lock()
+    def __init__(
+        self,
+        input_folder,
+        output_folder,
+        threshold_bus,
+        threshold_railway,
+        threshold_shelter,
+        check_canceled_callback=None,
+        progress_callback=None,
+        staging_folder=None,
+        scratch_format=ScratchManager.DEFAULT_FORMAT,
+    ):
+        self.input_folder = input_folder
+        self.output_folder = output_folder
+        self.threshold_bus = threshold_bus
+        self.threshold_railway = threshold_railway
+        self.threshold_shelter = threshold_shelter
+        self.check_canceled_callback = check_canceled_callback
+        self.progress_callback = progress_callback
+        # 広域データの共有フォルダ（複数自治体の一括処理時のみ指定）
+        self.staging_folder = staging_folder
+        # 一時レイヤの保存形式（ScratchManager.STORAGE_FORMATS の形式名）
+        self.scratch_format = scratch_format
+        # 出力先GeoPackageのセッション（実行ごとに作成し、各機能に渡す）
+        self.gpkg_manager = None
+
+    def tr(self, message):
+        """翻訳用のメソッド"""
+        return QCoreApplication.translate(self.__class__.__name__, message)
+
+    def check_canceled(self):
+        """キャンセル状態を確認（実行中の processing.run にも反映）"""
+        progress_manager = ProgressManager._instance
+        if self.check_canceled_callback and self.check_canceled_callback():
+            progress_manager.cancel()
+        return progress_manager.is_canceled()
+
+    def get_stages(self):
+        """処理段階の一覧（段階名, 処理, 完了時の進捗）"""
+        return [
+            ("zone", self.__create_zone, 10),
+            ("vacancy", self.__create_vacancy, 15),
+            ("buildings", self.__load_buildings, 20),
+            ("population", self.__load_population, 25),
+            ("facilities", self.__load_facilities, 30),
+            ("transportations", self.__load_transportations, 35),
+            ("building_data", self.__assign_building_data, 40),
+            ("areas", self.__create_area_data, 45),
+            ("land_price", self.__create_land_price, 50),
+            (
+                "residential_induction",
+                self.__calc(ResidentialInductionMetricCalculator),
+                55,
+            ),
+            (
+                "urban_function_induction",
+                self.__calc(UrbanFunctionInductionMetricCalculator),
+                65,
+            ),
+            (
+                "disaster_prevention",
+                self.__calc(DisasterPreventionMetricCalculator),
+                75,
+            ),
+            (
+                "public_transport",
+                self.__calc(PublicTransportMetricCalculator),
+                85,
+            ),
+            ("land_use", self.__calc(LandUseMetricCalculator), 94),
+            ("fiscal", self.__calc(FiscalMetricCalculator), 97),
+            ("classification", self.__classify_layers, 98),
+            ("generalization", self.__generalize_layers, 100),
+        ]
+
+    def run(self):
+        """
+        評価指標算出機能に含まれる各機能を順次実行します。
+        同じプロセスで実行中の処理がある場合は、終了まで待機します。
+        :return: 最後まで実行した場合 True、キャンセルされた場合 False
+        """
+        with MetricCalculationPipeline._run_lock:
+            return self.__run()
+
+    def __run(self):
+        """各機能の順次実行"""
+        # 進捗・キャンセル管理の初期化
+        progress_manager = ProgressManager()
+        progress_manager.init(self.progress_callback)
+        progress_manager.start_stage("init", 0, 5)
+
+        # データ作成
+        # GeoPackageの初期化（他の実行と共有しないセッションを作成）
+        self.gpkg_manager = GpkgManager(self.output_folder, shared=False)
+        self.gpkg_manager.make_gpkg()
+
+        # 入力データカタログの作成（更新されたファイルのみ再スキャン）
+        source_catalog = SourceCatalog(self.input_folder)
+        source_catalog.init(self.input_folder)
+        source_catalog.build()
+
+        # 座標変換管理の初期化
+        reprojection_manager = ReprojectionManager()
+        reprojection_manager.init(self.gpkg_manager)
+
+        # 広域データ共有管理の初期化（共有フォルダ未指定の場合は共有しない）
+        staging_manager = StagingManager(self.staging_folder)
+        staging_manager.init(self.staging_folder)
+
+        # 空間インデックス管理の初期化
+        spatial_index_registry = SpatialIndexRegistry()
+        spatial_index_registry.init(self.gpkg_manager)
+
+        # 一時レイヤ管理の初期化（中間データは作業用フォルダに保存）
+        scratch_manager = ScratchManager()
+        scratch_manager.init(self.scratch_format)
+        progress_manager.set_progress(5)
+
+        try:
+            # 各段階の進捗は前段階の完了値から自段階の完了値までの範囲で通知
+            start = 5
+            for stage, process, progress in self.get_stages():
+                if self.check_canceled():
+                    return False  # キャンセルチェック
+                progress_manager.start_stage(stage, start, progress)
+                # 段階内で作成した一時レイヤとメモリレイヤのインデックスは
+                # 段階終了時に削除
+                try:
+                    with scratch_manager.workspace():
+                        process()
+                finally:
+                    spatial_index_registry.drop_memory_indexes()
+                if self.check_canceled():
+                    return False  # キャンセルチェック
+                progress_manager.set_progress(progress)
+                start = progress
+
+            self.__compact_gpkg()
+        finally:
+            scratch_manager.cleanup()
+            # 接続を閉じてWALの内容をGeoPackageに書き戻す
+            self.gpkg_manager.close()
+
+        return True
+
+    def __compact_gpkg(self):
+        """出力用GeoPackageの整理（旧バージョンの一時レイヤを削除して最適化）"""
+        gpkg_manager = self.gpkg_manager
+        for layer_name in gpkg_manager.get_layers():
+            if layer_name.startswith("tmp_"):
+                gpkg_manager.delete_layer(layer_name)
+        gpkg_manager.vacuum()
+
+    def __create_zone(self):
+        """ゾーンポリゴン作成"""
+        zone_data_generator = ZoneDataGenerator(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        zone_data_generator.create_zone()
+
+        # 距離・面積計算に使用する平面直角座標系を判定
+        ReprojectionManager._instance.select_metric_crs()
+
+    def __create_vacancy(self):
+        """空き家データ作成"""
+        vacancy_data_generator = VacancyDataGenerator(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        vacancy_data_generator.create_vacancy()
+
+    def __load_buildings(self):
+        """データ読み込み機能"""
+        data_loader = DataLoader(
+            self.check_canceled, gpkg_manager=self.gpkg_manager
+        )
+        data_loader.load_buildings()
+
+    def __load_population(self):
+        """人口データ作成機能"""
+        population_data_generator = PopulationDataGenerator(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        population_data_generator.load_population_meshes()
+
+    def __load_facilities(self):
+        """施設関連データ作成機能"""
+        facility_data_generator = FacilityDataGenerator(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        facility_data_generator.load_facilities()
+
+    def __load_transportations(self):
+        """交通関連データ作成機能"""
+        transportation_data_generator = TransportationDataGenerator(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        transportation_data_generator.load_transportations()
+
+    def __assign_building_data(self):
+        """建築物LOD1へのデータ付与機能"""
+        building_data_assigner = BuildingDataAssigner(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        building_data_assigner.exec()
+
+    def __create_area_data(self):
+        """圏域作成機能"""
+        area_data_generator = AreaDataGenerator(
+            self.input_folder,
+            self.threshold_bus,
+            self.threshold_railway,
+            self.threshold_shelter,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        area_data_generator.create_area_data()
+
+    def __create_land_price(self):
+        """財政関連データ作成機能"""
+        financial_data_generator = FinancialDataGenerator(
+            self.input_folder,
+            self.check_canceled,
+            gpkg_manager=self.gpkg_manager,
+        )
+        financial_data_generator.create_land_price()
+
+    def __classify_layers(self):
+        """地図表示用の分類コード作成"""
+        layer_classifier = LayerClassifier(
+            self.check_canceled, gpkg_manager=self.gpkg_manager
+        )
+        layer_classifier.classify()
+
+    def __generalize_layers(self):
+        """小縮尺表示用の概略レイヤ作成（分類番号を保持するため分類後に実行）"""
+        layer_generalizer = LayerGeneralizer(
+            self.check_canceled, gpkg_manager=self.gpkg_manager
+        )
+        layer_generalizer.generalize()
+
+    def __calc(self, calculator_class):
+        """評価指標算出機能の実行処理を作成"""
+        def calc():
+            calclator = calculator_class(
+                self.output_folder,
+                self.check_canceled,
+                gpkg_manager=self.gpkg_manager,
+            )
+            calclator.calc()
+        return calc
@@ -5,26 +5,11 @@
  *
  ***************************************************************************/
 """
-from qgis.core import QgsProject, QgsRasterLayer
+from qgis.core import QgsProject, QgsRasterLayer, QgsMessageLog, Qgis
 from PyQt5.QtCore import QThread, pyqtSignal
-from ..utils import (
-    GpkgManager,
-    ZoneDataGenerator,
-    VacancyDataGenerator,
-    DataLoader,
-    PopulationDataGenerator,
-    FacilityDataGenerator,
-    TransportationDataGenerator,
-    BuildingDataAssigner,
-    AreaDataGenerator,
-    FinancialDataGenerator,
-    ResidentialInductionMetricCalculator,
-    UrbanFunctionInductionMetricCalculator,
-    PublicTransportMetricCalculator,
-    FiscalMetricCalculator,
-    LandUseMetricCalculator,
-    DisasterPreventionMetricCalculator,
-)
+from ...functions.chart_cache import ChartCache
+from ..utils import ProgressManager
+from .metric_calculation_pipeline import MetricCalculationPipeline
 
 
 class MetricCalculationWorker(QThread):
@@ -43,6 +28,7 @@ class MetricCalculationWorker(QThread):
         threshold_bus,
         threshold_railway,
         threshold_shelter,
+        render_charts=False,
     ):
         super().__init__()
         self.input_folder = input_folder
@@ -50,6 +36,8 @@ class MetricCalculationWorker(QThread):
         self.threshold_bus = threshold_bus
         self.threshold_railway = threshold_railway
         self.threshold_shelter = threshold_shelter
+        # 算出後に可視化用のグラフ画像を作成するかどうか
+        self.render_charts = render_charts
         self.is_canceled = False
 
     def run(self):
@@ -103,136 +91,18 @@ class MetricCalculationWorker(QThread):
                 else:
                     print(self.tr("Failed to add %1").replace("%1", layer_name))
 
-            # データ作成
-            # GeoPackageの初期化
-            self.progress.emit(0)
-            gpkg_manager = GpkgManager(self.output_folder)
-            gpkg_manager.init(self.output_folder)
-            gpkg_manager.make_gpkg()
-            self.progress.emit(5)
-
-            # ゾーンポリゴン作成
-            if not self.check_canceled():
-                zone_data_generator = ZoneDataGenerator(
-                    self.input_folder, self.check_canceled
-                )
-                zone_data_generator.create_zone()
-                self.progress.emit(10)
-
-            # 空き家データ作成
-            if not self.check_canceled():
-                vacancy_data_generator = VacancyDataGenerator(
-                    self.input_folder, self.check_canceled
-                )
-                vacancy_data_generator.create_vacancy()
-                self.progress.emit(15)
-
-            # データ読み込み機能
-            if not self.check_canceled():
-                data_loader = DataLoader(self.check_canceled)
-                data_loader.load_buildings()
-                self.progress.emit(20)
-
-            # 人口データ作成機能
-            if not self.check_canceled():
-                population_data_generator = PopulationDataGenerator(
-                    self.input_folder, self.check_canceled
-                )
-                population_data_generator.load_population_meshes()
-                self.progress.emit(25)
-
-            # 施設関連データ作成機能
-            if not self.check_canceled():
-                facility_data_generator = FacilityDataGenerator(
-                    self.input_folder, self.check_canceled
-                )
-                facility_data_generator.load_facilities()
-                self.progress.emit(30)
-
-            # 交通関連データ作成機能
-            if not self.check_canceled():
-                transportation_data_generator = TransportationDataGenerator(
-                    self.input_folder, self.check_canceled
-                )
-                transportation_data_generator.load_transportations()
-                self.progress.emit(35)
-
-            # 建築物LOD1へのデータ付与機能
-            if not self.check_canceled():
-                building_data_assigner = BuildingDataAssigner(
-                    self.input_folder, self.check_canceled
-                )
-                building_data_assigner.exec()
-                self.progress.emit(40)
-
-            # 圏域作成機能
-            if not self.check_canceled():
-                area_data_generator = AreaDataGenerator(
-                    self.input_folder,
-                    self.threshold_bus,
-                    self.threshold_railway,
-                    self.threshold_shelter,
-                    self.check_canceled,
-                )
-                area_data_generator.create_area_data()
-                self.progress.emit(45)
-
-            # 財政関連データ作成機能
-            if not self.check_canceled():
-                financial_data_generator = FinancialDataGenerator(
-                    self.input_folder, self.check_canceled
-                )
-                financial_data_generator.create_land_price()
-                self.progress.emit(50)
-
-            # 評価指標算出
-            # 居住誘導関連評価指標算出機能
-            if not self.check_canceled():
-                calclator = ResidentialInductionMetricCalculator(
-                    self.output_folder, self.check_canceled
-                )
-                calclator.calc()
-                self.progress.emit(55)
-
-            # 都市機能誘導関連評価指標算出機能
-            if not self.check_canceled():
-                calclator = UrbanFunctionInductionMetricCalculator(
-                    self.output_folder, self.check_canceled
-                )
-                calclator.calc()
-                self.progress.emit(65)
-
-            # 防災関連評価指標算出機能
-            if not self.check_canceled():
-                calclator = DisasterPreventionMetricCalculator(
-                    self.output_folder, self.check_canceled
-                )
-                calclator.calc()
-                self.progress.emit(75)
-
-            # 公共交通関連評価指標算出機能
-            if not self.check_canceled():
-                calclator = PublicTransportMetricCalculator(
-                    self.output_folder, self.check_canceled
-                )
-                calclator.calc()
-                self.progress.emit(85)
-
-            # 土地利用関連評価指標算出機能
-            if not self.check_canceled():
-                calclator = LandUseMetricCalculator(
-                    self.output_folder, self.check_canceled
-                )
-                calclator.calc()
-                self.progress.emit(95)
-
-            # 財政関連評価指標算出機能
-            if not self.check_canceled():
-                calclator = FiscalMetricCalculator(
-                    self.output_folder, self.check_canceled
-                )
-                calclator.calc()
-                self.progress.emit(100)
+            # データ作成・評価指標算出
+            pipeline = MetricCalculationPipeline(
+                self.input_folder,
+                self.output_folder,
+                self.threshold_bus,
+                self.threshold_railway,
+                self.threshold_shelter,
+                self.check_canceled,
+                lambda value, stage: self.progress.emit(value),
+            )
+            if pipeline.run() and self.render_charts:
+                self.render_chart_images()
 
             if not self.is_canceled:
                 self.finished.emit(self.tr("Processing completed"))
@@ -240,10 +110,30 @@ class MetricCalculationWorker(QThread):
                 self.finished.emit(self.tr("Processing was canceled"))
 
         except Exception as e:
-            msg = self.tr("An error occurred: %1").replace("%1", e)
+            msg = self.tr("An error occurred: %1").replace("%1", str(e))
             self.error.emit(msg)
 
 
+    def render_chart_images(self):
+        """可視化用のグラフ画像を作成（失敗しても算出結果は有効なため警告のみ）"""
+        try:
+            count = ChartCache(self.output_folder).render()
+            QgsMessageLog.logMessage(
+                self.tr("%1 chart images rendered.").replace(
+                    "%1", str(count)
+                ),
+                self.tr("Plugin"),
+                Qgis.Info,
+            )
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                self.tr("Failed to render chart images: %1").replace(
+                    "%1", str(e)
+                ),
+                self.tr("Plugin"),
+                Qgis.Warning,
+            )
+
     def check_canceled(self):
         """キャンセル状態を確認"""
         return self.is_canceled
@@ -251,3 +141,6 @@ class MetricCalculationWorker(QThread):
     def cancel(self):
         """キャンセル"""
         self.is_canceled = True
+        # 実行中の processing.run も即座にキャンセル
+        if ProgressManager._instance:
+            ProgressManager._instance.cancel()
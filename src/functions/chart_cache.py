@@ -0,0 +1,271 @@
+"""
+/***************************************************************************
+ PlateauStatisticsVisualizationPlugin
+                                 A QGIS plugin
+ Urban Structure Assessment Dashboard
+ Generated by Plugin Builder: http://g-sherman.github.io/Qgis-Plugin-Builder/
+                              -------------------
+        begin                : 2024-08-29
+        git sha              : $Format:%H$
+        copyright            : (C) 2024 by Author
+        email                : mail
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+def render_item(item_val, datalist, chart_folder, image_formats, dpi):
+    """
+    データ項目のグラフを画像として保存する
+
+    並列実行時は別プロセスで実行されるため、モジュールの関数として定義する。
+
+    :param item_val: データ項目
+    :type item_val: str
+    :param datalist: データ項目のグラフの設定
+    :type datalist: list
+    :param chart_folder: 画像の保存先フォルダ
+    :type chart_folder: str
+    :param image_formats: 保存する画像形式
+    :type image_formats: tuple
+    :param dpi: 画像の解像度
+    :type dpi: int
+
+    :return: データ項目と保存したグラフ画像の情報
+    :rtype: tuple[str, list]
+    """
+    # 循環参照を避け、画像の参照のみの場合にmatplotlibを読み込まないよう
+    # 描画処理は実行時に読み込む
+    from matplotlib.backends.backend_agg import FigureCanvasAgg # pylint: disable=import-outside-toplevel
+    from matplotlib.figure import Figure # pylint: disable=import-outside-toplevel
+    from .visualization import ChartPlotter # pylint: disable=import-outside-toplevel
+
+    plotter = ChartPlotter()
+    entries = []
+    for index, data in enumerate(datalist):
+        if not data['path'] or not os.path.exists(data['path']):
+            continue
+
+        # GUIを使用しないため、画像出力用のキャンバスで描画
+        figure = Figure(figsize=(4, 3), dpi=100)
+        FigureCanvasAgg(figure)
+        if not plotter.draw_chart(figure, data):
+            continue
+        figure.tight_layout()
+
+        files = {}
+        for image_format in image_formats:
+            file_name = f"{item_val}_{index:02d}.{image_format}"
+            figure.savefig(os.path.join(chart_folder, file_name), dpi=dpi)
+            files[image_format] = file_name
+
+        entries.append({
+            'index': index,
+            'files': files,
+            'source': [
+                os.path.basename(data['path']),
+                os.path.getmtime(data['path']),
+            ],
+        })
+
+    return item_val, entries
+
+
+class ChartCache:
+    """
+    作成済みグラフ画像の管理クラス
+
+    評価指標算出後に可視化設定の全グラフを画像として出力フォルダに保存し、
+    一覧（manifest.json）に作成元CSVの更新日時を記録します。
+    作成元CSVが更新された場合、そのデータ項目の画像は使用しません。
+
+    属性:
+        output_folder (str): 評価指標のCSVを出力したフォルダ。
+        chart_folder (str): グラフ画像の保存先フォルダ。
+        manifest_path (str): グラフ画像の一覧のパス。
+
+    メソッド:
+        render(processes=1): 可視化設定の全グラフを画像として保存します。
+        load_manifest(): グラフ画像の一覧を読み込みます。
+        get_mtime(): グラフ画像の一覧の更新日時を取得します。
+        get_images(item_val, image_format='png'): データ項目のグラフ画像を取得します。
+        get_files(): 保存したグラフ画像と一覧のパスを取得します。
+    """
+    FOLDER_NAME = 'charts'
+    MANIFEST_NAME = 'manifest.json'
+    # 一覧の形式のバージョン（形式変更時は既存の画像を使用しない）
+    MANIFEST_VERSION = 1
+    IMAGE_FORMATS = ('png', 'svg')
+    # 表示時に縮小しても劣化しないよう、画面表示より高い解像度で保存
+    DPI = 200
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.chart_folder = os.path.join(output_folder, self.FOLDER_NAME)
+        self.manifest_path = os.path.join(
+            self.chart_folder, self.MANIFEST_NAME
+        )
+
+    def render(self, processes=1):
+        """
+        可視化設定の全グラフを画像として保存する
+
+        :param processes: 並列実行するプロセス数（1の場合は呼び出し元で実行）
+        :type processes: int
+
+        :return: 保存したグラフ画像の数
+        :rtype: int
+        """
+        # 循環参照を避けるため、設定の読み込み処理は実行時に読み込む
+        from .visualization import ( # pylint: disable=import-outside-toplevel
+            _config_file, _datalist_file, load_config, merge_colors
+        )
+
+        _, _, datasets = load_config(_datalist_file, _config_file)
+        merge_colors(datasets)
+
+        # 設定のパスに関わらず出力フォルダのCSVを参照
+        for datalist in datasets.values():
+            for data in datalist:
+                if data['path']:
+                    data['path'] = os.path.join(
+                        self.output_folder, os.path.basename(data['path'])
+                    )
+
+        os.makedirs(self.chart_folder, exist_ok=True)
+        for file_name in os.listdir(self.chart_folder):
+            if file_name.endswith(self.IMAGE_FORMATS):
+                os.remove(os.path.join(self.chart_folder, file_name))
+
+        tasks = [
+            (item_val, datalist, self.chart_folder, self.IMAGE_FORMATS,
+             self.DPI)
+            for item_val, datalist in datasets.items()
+        ]
+        if processes > 1:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+            ) as executor:
+                results = list(executor.map(render_item, *zip(*tasks)))
+        else:
+            results = [render_item(*task) for task in tasks]
+
+        manifest = {
+            'version': self.MANIFEST_VERSION,
+            'created': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+            'formats': list(self.IMAGE_FORMATS),
+            'items': dict(results),
+        }
+
+        # 表示中のGraphDockが書き込み途中の一覧を読み込まないよう置き換えで保存
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.manifest_path)
+
+        return sum(len(entries) for _, entries in results)
+
+    def load_manifest(self):
+        """
+        グラフ画像の一覧を読み込む
+
+        :return: グラフ画像の一覧（未作成・形式が異なる場合はNone）
+        :rtype: dict
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get('version') != self.MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def get_mtime(self):
+        """
+        グラフ画像の一覧の更新日時を取得する
+
+        :return: 更新日時（未作成の場合はNone）
+        :rtype: float
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        return os.path.getmtime(self.manifest_path)
+
+    def get_images(self, item_val, image_format='png'):
+        """
+        データ項目のグラフ画像を取得する
+
+        :param item_val: データ項目
+        :type item_val: str
+        :param image_format: 画像形式
+        :type image_format: str
+
+        :return: グラフ画像のパス（未作成・作成元CSVが更新された場合はNone）
+        :rtype: list
+        """
+        manifest = self.load_manifest()
+        if manifest is None:
+            return None
+
+        entries = manifest['items'].get(item_val)
+        if not entries:
+            return None
+
+        images = []
+        for entry in entries:
+            source_name, source_mtime = entry['source']
+            source_path = os.path.join(self.output_folder, source_name)
+            if (
+                not os.path.exists(source_path)
+                or os.path.getmtime(source_path) != source_mtime
+            ):
+                return None
+
+            file_name = entry['files'].get(image_format)
+            if not file_name:
+                return None
+            image_path = os.path.join(self.chart_folder, file_name)
+            if not os.path.exists(image_path):
+                return None
+            images.append(image_path)
+
+        return images
+
+    def get_files(self):
+        """
+        保存したグラフ画像と一覧のパスを取得する
+
+        :return: グラフ画像と一覧のパス（未作成の場合は空）
+        :rtype: list
+        """
+        manifest = self.load_manifest()
+        if manifest is None:
+            return []
+
+        files = [self.manifest_path]
+        for entries in manifest['items'].values():
+            for entry in entries:
+                for file_name in entry['files'].values():
+                    file_path = os.path.join(self.chart_folder, file_name)
+                    if os.path.exists(file_path):
+                        files.append(file_path)
+        return files
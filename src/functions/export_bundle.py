@@ -0,0 +1,355 @@
+"""
+/***************************************************************************
+ PlateauStatisticsVisualizationPlugin
+                                 A QGIS plugin
+ Urban Structure Assessment Dashboard
+ Generated by Plugin Builder: http://g-sherman.github.io/Qgis-Plugin-Builder/
+                              -------------------
+        begin                : 2024-08-29
+        git sha              : $Format:%H$
+        copyright            : (C) 2024 by Author
+        email                : mail
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from osgeo import gdal
+
+from ..algorithms.utils.gpkg_manager import GpkgManager
+from ..algorithms.utils.metric_result_store import MetricResultStore
+from .chart_cache import ChartCache
+
+
+class ExportBundle:
+    """
+    評価指標ファイル・グラフ画像・GeoPackageのレイヤをまとめたZIPの作成クラス
+
+    レイヤはレイヤごとにFlatGeobufまたはGeoParquetに変換し、
+    メモリ上（/vsimem/）からZIPに書き込みます（推定サイズが MEMORY_LIMIT を
+    超えるレイヤのみ一時ファイル）。
+    レイヤの変換は別スレッドで1件ずつ行い、前のファイルのZIPへの書き込みと
+    並行させます（変換待ちは常に1件までのため、メモリ上のレイヤは最大2件）。
+
+    属性:
+        csv_folder (str): 評価指標のCSVを出力したフォルダ。
+        gpkg_manager (GpkgManager): 出力先GeoPackageの読み込み用セッション。
+        result_store (MetricResultStore): 評価指標算出結果の管理。
+
+    メソッド:
+        get_layer_formats(): 使用できるレイヤの出力形式を取得します。
+        get_layers(): 出力できるGeoPackageのレイヤ名を取得します。
+        get_csv_files(): 出力フォルダ内のCSVファイルのパスを取得します。
+        write(filename, layer_names=None, layer_format='FlatGeobuf'):
+            ZIPファイルを作成します。
+        close(): GeoPackageの読み込み用の接続を閉じます。
+    """
+    # レイヤの出力形式（表示名: (GDALのドライバ名, 拡張子)）
+    LAYER_FORMATS = {
+        'FlatGeobuf': ('FlatGeobuf', '.fgb'),
+        'GeoParquet': ('Parquet', '.parquet'),
+    }
+    # ZIP内のレイヤの保存先フォルダ
+    LAYER_FOLDER = 'layers'
+    # 圧縮済みの形式は圧縮せずに格納
+    STORED_EXTENSIONS = ('.parquet', '.png')
+    # ZIPへの書き込み単位
+    CHUNK_SIZE = 1024 * 1024
+    # 推定サイズがこの大きさを超えるレイヤはメモリ上ではなく一時ファイルに変換
+    MEMORY_LIMIT = 512 * 1024 * 1024
+
+    def __init__(self, csv_folder):
+        self.csv_folder = csv_folder
+        self.gpkg_manager = GpkgManager(csv_folder, shared=False)
+        self.result_store = MetricResultStore(self.gpkg_manager)
+
+    @classmethod
+    def get_layer_formats(cls):
+        """
+        使用できるレイヤの出力形式を取得する
+
+        :return: 出力形式の表示名（GDALにドライバがない形式は除く）
+        :rtype: list
+        """
+        return [
+            name for name, (driver, _) in cls.LAYER_FORMATS.items()
+            if gdal.GetDriverByName(driver) is not None
+        ]
+
+    def get_layers(self):
+        """
+        出力できるGeoPackageのレイヤ名を取得する
+
+        :return: ジオメトリを持つレイヤ名（GeoPackageがない場合は空）
+        :rtype: list
+        """
+        if not os.path.exists(self.gpkg_manager.geopackage_path):
+            return []
+        return [
+            row[0]
+            for row in self.gpkg_manager.query(
+                "SELECT table_name FROM gpkg_contents "
+                "WHERE data_type = 'features' ORDER BY table_name"
+            )
+            if not row[0].startswith("tmp_")
+        ]
+
+    def get_csv_files(self):
+        """
+        出力フォルダ内のCSVファイルのパスを取得する
+
+        :return: CSVファイルのパス
+        :rtype: list
+        """
+        return [
+            os.path.join(root, f) for root, _,
+            files in os.walk(self.csv_folder) for f in files
+            if f.endswith('.csv')
+        ]
+
+    def write(self, filename, layer_names=None, layer_format='FlatGeobuf'):
+        """
+        ZIPファイルを作成する
+
+        :param filename: 作成するZIPファイルのパス
+        :type filename: str
+        :param layer_names: 出力するGeoPackageのレイヤ名
+        :type layer_names: list
+        :param layer_format: レイヤの出力形式（LAYER_FORMATSの表示名）
+        :type layer_format: str
+
+        :return: ファイルごとの出力結果（name, size, compressed, seconds,
+                 error）
+        :rtype: list[dict]
+        """
+        tasks = []
+        for file_path in self.get_csv_files():
+            arcname = os.path.relpath(file_path, self.csv_folder)
+            file_id = MetricResultStore.get_file_id(arcname)
+            if file_id and arcname == os.path.basename(file_path):
+                # 評価指標ファイルはGeoPackageに保存した算出結果から作成
+                tasks.append(
+                    (arcname, self.__read_metric, (file_id, file_path))
+                )
+            else:
+                tasks.append((arcname, self.__read_file, (file_path,)))
+
+        # 作成済みのグラフ画像（charts フォルダ）を追加
+        for file_path in ChartCache(self.csv_folder).get_files():
+            arcname = os.path.relpath(file_path, self.csv_folder)
+            tasks.append((arcname, self.__read_file, (file_path,)))
+
+        layer_tasks = []
+        if layer_names:
+            driver, extension = self.LAYER_FORMATS[layer_format]
+            layer_sizes = self.__estimate_layer_sizes(layer_names)
+            for layer_name in layer_names:
+                arcname = f"{self.LAYER_FOLDER}/{layer_name}{extension}"
+                layer_tasks.append((
+                    arcname,
+                    self.__export_layer,
+                    (
+                        layer_name,
+                        driver,
+                        extension,
+                        layer_sizes.get(layer_name, 0) > self.MEMORY_LIMIT,
+                    ),
+                ))
+
+        report = []
+        with zipfile.ZipFile(
+            filename, 'w', zipfile.ZIP_DEFLATED, allowZip64=True
+        ) as zipf, ThreadPoolExecutor(max_workers=1) as executor:
+            # 次に書き込むレイヤを1件だけ先に変換し、前のファイルの書き込みと
+            # 並行させる（最初のレイヤはCSV・画像の書き込み中に変換）
+            layer_tasks = iter(layer_tasks)
+            pending = self.__submit_next(executor, layer_tasks)
+
+            # CSV・画像はファイルから読み込みながら書き込むため、書き込み時に用意
+            for arcname, reader, args in tasks:
+                report.append(self.__write_member(
+                    zipf, arcname,
+                    lambda reader=reader, args=args: self.__prepare(
+                        reader, args
+                    ),
+                ))
+
+            while pending is not None:
+                arcname, future = pending
+                pending = self.__submit_next(executor, layer_tasks)
+                report.append(
+                    self.__write_member(zipf, arcname, future.result)
+                )
+
+        return report
+
+    def close(self):
+        """GeoPackageの読み込み用の接続を閉じる"""
+        self.gpkg_manager.close()
+
+    def __submit_next(self, executor, layer_tasks):
+        """次のレイヤの変換を開始（残りがない場合は None）"""
+        task = next(layer_tasks, None)
+        if task is None:
+            return None
+        arcname, reader, args = task
+        return arcname, executor.submit(self.__prepare, reader, args)
+
+    def __estimate_layer_sizes(self, layer_names):
+        """
+        レイヤの推定サイズ（GeoPackageのサイズを地物数で按分）
+        変換後のサイズはジオメトリ・属性により異なるため目安とする
+        """
+        counts = {}
+        for (table_name,) in self.gpkg_manager.query(
+            "SELECT table_name FROM gpkg_contents "
+            "WHERE data_type = 'features'"
+        ):
+            counts[table_name] = self.__get_feature_count(table_name)
+
+        total = sum(counts.values())
+        if not total:
+            return {}
+        row_size = os.path.getsize(self.gpkg_manager.geopackage_path) / total
+        return {
+            layer_name: counts.get(layer_name, 0) * row_size
+            for layer_name in layer_names
+        }
+
+    def __get_feature_count(self, table_name):
+        """地物数（OGRが記録した件数がない場合は集計）"""
+        try:
+            rows = self.gpkg_manager.query(
+                "SELECT feature_count FROM gpkg_ogr_contents "
+                "WHERE table_name = ?",
+                (table_name,),
+            )
+        except sqlite3.Error:
+            rows = []
+        if rows and rows[0][0] is not None:
+            return rows[0][0]
+
+        quoted = '"' + table_name.replace('"', '""') + '"'
+        return self.gpkg_manager.query(f"SELECT COUNT(*) FROM {quoted}")[0][0]
+
+    def __prepare(self, reader, args):
+        """書き込むデータを用意し、処理時間と合わせて返す"""
+        started = time.perf_counter()
+        kind, source = reader(*args)
+        return kind, source, time.perf_counter() - started
+
+    def __read_metric(self, file_id, file_path):
+        """評価指標ファイルの内容（未保存の場合はCSVファイル）"""
+        csv_text = self.result_store.get_csv_text(file_id)
+        if csv_text is None:
+            return self.__read_file(file_path)
+        return ('bytes', csv_text.encode('utf-8'))
+
+    def __read_file(self, file_path):
+        """ファイルのパス（書き込み時に読み込む）"""
+        return ('file', file_path)
+
+    def __export_layer(self, layer_name, driver, extension, use_temp):
+        """レイヤをメモリ上のファイル（use_temp の場合は一時ファイル）に変換"""
+        gpkg_path = self.gpkg_manager.geopackage_path
+        if use_temp:
+            kind = 'temp'
+            path = os.path.join(
+                tempfile.mkdtemp(prefix="plateau_export_"),
+                f"{layer_name}{extension}",
+            )
+        else:
+            kind = 'vsimem'
+            path = f"/vsimem/{uuid.uuid4().hex}{extension}"
+
+        dataset = gdal.VectorTranslate(
+            path,
+            gpkg_path,
+            format=driver,
+            layers=[layer_name],
+            layerName=layer_name,
+        )
+        if dataset is None:
+            self.__remove_export(kind, path)
+            raise Exception(f"Failed to export layer: {layer_name}")
+        # 閉じて書き込みを完了させる
+        dataset = None
+        return (kind, path)
+
+    def __remove_export(self, kind, path):
+        """変換したレイヤのファイルを削除"""
+        if kind == 'vsimem':
+            gdal.Unlink(path)
+        else:
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+    def __write_member(self, zipf, arcname, prepare):
+        """
+        変換・読み込みが完了したデータをZIPに書き込む
+        （prepare は変換結果を返す関数、変換に失敗したファイルは書き込まず、
+        結果にエラーを記録）
+        """
+        try:
+            kind, source, seconds = prepare()
+        except Exception as e:
+            return {
+                'name': arcname, 'size': 0, 'compressed': 0, 'seconds': 0.0,
+                'error': str(e),
+            }
+
+        started = time.perf_counter()
+        zinfo = zipfile.ZipInfo(
+            arcname, date_time=time.localtime(time.time())[:6]
+        )
+        zinfo.compress_type = (
+            zipfile.ZIP_STORED
+            if arcname.endswith(self.STORED_EXTENSIONS)
+            else zipfile.ZIP_DEFLATED
+        )
+
+        if kind == 'bytes':
+            zipf.writestr(zinfo, source)
+        elif kind in ('file', 'temp'):
+            try:
+                with open(source, 'rb') as src, zipf.open(
+                    zinfo, 'w', force_zip64=True
+                ) as dst:
+                    shutil.copyfileobj(src, dst, self.CHUNK_SIZE)
+            finally:
+                if kind == 'temp':
+                    self.__remove_export(kind, source)
+        else:
+            src = gdal.VSIFOpenL(source, 'rb')
+            try:
+                with zipf.open(zinfo, 'w', force_zip64=True) as dst:
+                    while True:
+                        chunk = gdal.VSIFReadL(1, self.CHUNK_SIZE, src)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+            finally:
+                gdal.VSIFCloseL(src)
+                self.__remove_export(kind, source)
+
+        return {
+            'name': arcname,
+            'size': zinfo.file_size,
+            'compressed': zinfo.compress_size,
+            'seconds': seconds + time.perf_counter() - started,
+            'error': None,
+        }
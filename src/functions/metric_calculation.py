@@ -25,7 +25,7 @@ import sys
 import xml.etree.ElementTree as ET
 
 from PyQt5.QtCore import QCoreApplication, QSize, Qt # pylint: disable=import-error, no-name-in-module
-from PyQt5.QtWidgets import (QApplication, QDialog, QFileDialog, # pylint: disable=import-error, no-name-in-module
+from PyQt5.QtWidgets import (QApplication, QCheckBox, QDialog, QFileDialog, # pylint: disable=import-error, no-name-in-module
                              QHBoxLayout, QLabel, QLineEdit,
                              QPushButton, QVBoxLayout, QMessageBox,
                              QProgressDialog)
@@ -127,6 +127,10 @@ class MetricCalculation(QDialog):
         self.threshold_shelter = QLineEdit()
         layout.addWidget(self.threshold_shelter)
 
+        self.render_charts = QCheckBox(self.tr('Render Chart Images'))
+        self.render_charts.setChecked(False)
+        layout.addWidget(self.render_charts)
+
         button_layout = QHBoxLayout()
         ok_button = QPushButton(self.tr('OK'))
         ok_button.clicked.connect(self.accept)
@@ -195,6 +199,9 @@ class MetricCalculation(QDialog):
             self.threshold_bus.setText(root.find('threshold_bus').text)
             self.threshold_railway.setText(root.find('threshold_railway').text)
             self.threshold_shelter.setText(root.find('threshold_shelter').text)
+            render_charts = root.find('render_charts')
+            if render_charts is not None:
+                self.render_charts.setChecked(render_charts.text == 'true')
         except FileNotFoundError:
             print(self.tr(
                 "Configuration file not found. Using default values."
@@ -219,6 +226,9 @@ class MetricCalculation(QDialog):
         ET.SubElement(
             root, 'threshold_shelter'
         ).text = self.threshold_shelter.text()
+        ET.SubElement(root, 'render_charts').text = (
+            'true' if self.render_charts.isChecked() else 'false'
+        )
 
         tree = ET.ElementTree(root)
         tree.write(self.config_file, encoding='utf-8', xml_declaration=True)
@@ -287,7 +297,8 @@ class MetricCalculation(QDialog):
         # QThreadワーカーの作成
         self.worker = MetricCalculationWorker(
             input_folder_path, output_folder_path, threshold_bus,
-            threshold_railway, threshold_shelter
+            threshold_railway, threshold_shelter,
+            render_charts=self.render_charts.isChecked()
         )
         self.worker.progress.connect(self.update_progress)
         self.worker.finished.connect(self.finish_process)
@@ -21,14 +21,15 @@
  ***************************************************************************/
 """
 import os
+import time
 import xml.etree.ElementTree as ET
-import zipfile
 from datetime import datetime
 
 from qgis.PyQt.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, # pylint: disable=import-error
                                 QMessageBox, QSizePolicy,QPushButton,
-                                QLineEdit, QFileDialog, QDialogButtonBox)
-from qgis.PyQt.QtCore import QCoreApplication # pylint: disable=import-error
+                                QLineEdit, QFileDialog, QDialogButtonBox,
+                                QListWidget, QListWidgetItem, QComboBox)
+from qgis.PyQt.QtCore import QCoreApplication, Qt # pylint: disable=import-error
 from PyQt5.QtGui import QFontMetrics # pylint: disable=import-error, no-name-in-module
 
 
@@ -44,9 +45,12 @@ class Output(QDialog):
     このクラスは、出力フォルダを選択し、その中にCSVファイルを圧縮して
     ZIPファイルを生成するダイアログを提供します。ユーザーがフォルダを
     選択し、CSVファイルをZIPとして出力する処理を行います。
+    選択したGeoPackageのレイヤも、指定した形式に変換してZIPに含めます。
 
     属性:
         folderEdit (QLineEdit): 出力フォルダのパスを入力するためのLineEdit。
+        layerList (QListWidget): 出力するGeoPackageのレイヤを選択するリスト。
+        formatCombo (QComboBox): レイヤの出力形式を選択するコンボボックス。
     メソッド:
         __init__(self, parent=None, translator=None): ダイアログを初期化し、翻訳を設定します。
         load_folder_config(self): XML構成ファイルを読み込み、レイヤー情報を取得する関数。
@@ -54,7 +58,10 @@ class Output(QDialog):
         initUI(self): 出力ダイアログのユーザーインターフェースを初期化する関数。
         selectFolder(self): 出力フォルダを選択するダイアログを開く関数。
         accept(self): ダイアログの受け入れを処理し、ZIPファイルを生成してダイアログを閉じる関数。
-        generateZIP(self, output_folder): 指定されたフォルダ内のCSVファイルを含むZIPファイルを生成する関数。
+        generateZIP(self, output_folder):
+            指定されたフォルダ内のCSVファイルと作成済みのグラフ画像を含むZIPファイルを生成する関数。
+        get_selected_layers(self): 選択されたGeoPackageのレイヤ名を取得する関数。
+        format_report(self, report, elapsed): ZIPファイルの作成結果を表示用に整形する関数。
     """
     def __init__(self, parent=None, translator=None):
         super(Output, self).__init__(parent)
@@ -119,6 +126,37 @@ class Output(QDialog):
 
         layout.addLayout(folderLayout)
 
+        # GeoPackageのレイヤ（選択したレイヤのみZIPに含める）
+        # ZIP作成機能（GDAL・GeoPackage）はダイアログを開くまで読み込まない
+        from .export_bundle import ExportBundle # pylint: disable=import-outside-toplevel
+        bundle = ExportBundle(output_folder)
+        try:
+            layer_names = bundle.get_layers()
+        finally:
+            bundle.close()
+
+        layout.addWidget(QLabel(self.tr("GeoPackage Layers:")))
+        self.layerList = QListWidget()
+        for layer_name in layer_names:
+            item = QListWidgetItem(layer_name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.layerList.addItem(item)
+        layout.addWidget(self.layerList)
+
+        formatLayout = QHBoxLayout()
+        formatLabel = QLabel(self.tr("Layer Format:"))
+        self.formatCombo = QComboBox()
+        self.formatCombo.addItems(ExportBundle.get_layer_formats())
+        formatLayout.addWidget(formatLabel)
+        formatLayout.addWidget(self.formatCombo)
+        layout.addLayout(formatLayout)
+
+        # レイヤまたは出力形式がない場合は選択不可
+        enabled = bool(layer_names) and self.formatCombo.count() > 0
+        self.layerList.setEnabled(enabled)
+        self.formatCombo.setEnabled(enabled)
+
         buttonBox = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel
         )
@@ -149,47 +187,124 @@ class Output(QDialog):
         """
         指定されたフォルダ内のすべてのCSVファイルを含むZIPファイルを生成する関数
 
+        評価指標ファイルは、GeoPackageに保存した算出結果がある場合は
+        算出結果から作成します。
+        評価指標算出時に作成したグラフ画像がある場合は、画像と一覧も含めます。
+        選択したGeoPackageのレイヤは、指定した形式に変換して layers フォルダに
+        含めます。完了時にファイルごとのサイズと処理時間を表示します。
+
         :param output_folder: 出力するZIPファイルのフォルダ
         :type output_folder: str
         """
         print(f"Executing output: Folder = {output_folder}, Format = ZIP")
         csvFolder = self.load_folder_config()
 
-        csv_files = [
-            os.path.join(root, f) for root, _,
-            files in os.walk(csvFolder) for f in files if f.endswith('.csv')
-        ]
+        from .export_bundle import ExportBundle # pylint: disable=import-outside-toplevel
+        bundle = ExportBundle(csvFolder)
+        try:
+            if not bundle.get_csv_files():
+                QMessageBox.warning(
+                    None,
+                    self.tr("ERROR"),
+                    self.tr(
+                        "No CSV files were found in the selected folder:<br>%1"
+                    ).replace("%1", csvFolder)
+                )
+                return
 
-        if not csv_files:
-            QMessageBox.warning(
-                None,
-                self.tr("ERROR"),
-                self.tr(
-                    "No CSV files were found in the selected folder:<br>%1"
-                ).replace("%1", csvFolder)
+            filename = os.path.join(
+                output_folder,
+                self.tr("valuation index_%1.zip").replace(
+                    "%1", datetime.now().strftime('%Y%m%d_%H%M%S')
+                )
             )
-            return
 
-        filename = os.path.join(
-            output_folder,
-            self.tr("valuation index_%1.zip").replace(
-                "%1", datetime.now().strftime('%Y%m%d_%H%M%S')
+            started = time.perf_counter()
+            report = bundle.write(
+                filename,
+                self.get_selected_layers(),
+                self.formatCombo.currentText(),
             )
-        )
-
-        zipf = None
-        try:
-            zipf = zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED)
-            for file_path in csv_files:
-                arcname = os.path.relpath(file_path, csvFolder)
-                zipf.write(file_path, arcname)
-                print(f"Added {file_path} to ZIP")
+            elapsed = time.perf_counter() - started
         except Exception as e:
             print(f"Error occurred while generating ZIP file: {e}")
+            QMessageBox.critical(
+                None,
+                self.tr("ERROR"),
+                self.tr("Failed to generate file:<br>%1").replace(
+                    "%1", str(e)
+                )
+            )
+            return
         finally:
-            if zipf:
-                zipf.close()
+            bundle.close()
+
+        for entry in report:
+            print(f"Added {entry['name']} to ZIP")
 
-        QMessageBox.information(None, self.tr("Success"),
-                                self.tr("file generated successfully"))
+        QMessageBox.information(
+            None,
+            self.tr("Success"),
+            self.tr("file generated successfully")
+            + "<br><br>" + self.format_report(report, elapsed)
+        )
         print(f"ZIP file generated successfully: {filename}")
+
+    def get_selected_layers(self):
+        """
+        選択されたGeoPackageのレイヤ名を取得する関数
+
+        :returns: 選択されたレイヤ名
+        :rtype: list
+        """
+        if not self.layerList.isEnabled():
+            return []
+        return [
+            self.layerList.item(i).text()
+            for i in range(self.layerList.count())
+            if self.layerList.item(i).checkState() == Qt.Checked
+        ]
+
+    def format_report(self, report, elapsed):
+        """
+        ZIPファイルの作成結果を表示用に整形する関数
+
+        :param report: ファイルごとの出力結果
+        :type report: list[dict]
+        :param elapsed: 全体の処理時間（秒）
+        :type elapsed: float
+
+        :returns: 作成結果（HTML）
+        :rtype: str
+        """
+        def format_size(size):
+            return f"{size / (1024 * 1024):.1f} MB"
+
+        lines = []
+        for entry in report:
+            if entry['error']:
+                lines.append(
+                    self.tr("%1: failed (%2)")
+                    .replace("%1", entry['name'])
+                    .replace("%2", entry['error'])
+                )
+                continue
+            lines.append(
+                f"{entry['name']}: {format_size(entry['size'])} → "
+                f"{format_size(entry['compressed'])} "
+                f"({entry['seconds']:.1f} s)"
+            )
+
+        written = [entry for entry in report if not entry['error']]
+        lines.append(
+            self.tr("Total: %1 files, %2 → %3 (%4 s)")
+            .replace("%1", str(len(written)))
+            .replace("%2", format_size(
+                sum(entry['size'] for entry in written)
+            ))
+            .replace("%3", format_size(
+                sum(entry['compressed'] for entry in written)
+            ))
+            .replace("%4", f"{elapsed:.1f}")
+        )
+        return "<br>".join(lines)
@@ -29,9 +29,10 @@ from distutils.util import strtobool # pylint: disable=deprecated-module
 
 import numpy as np
 import pandas as pd
-from PyQt5.QtCore import QTimer # pylint: disable=import-error, no-name-in-module
+from PyQt5.QtCore import QSize, QTimer # pylint: disable=import-error, no-name-in-module
 from PyQt5.QtWidgets import QScrollArea, QVBoxLayout, QWidget # pylint: disable=import-error, no-name-in-module
 from qgis.PyQt.QtCore import QCoreApplication, Qt, pyqtSignal # pylint: disable=import-error
+from qgis.PyQt.QtGui import QPixmap # pylint: disable=import-error
 from qgis.PyQt.QtWidgets import (QComboBox, QDockWidget, # pylint: disable=import-error
                                  QGroupBox, QLabel, QPushButton)
 
@@ -41,7 +42,10 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from matplotlib.ticker import FuncFormatter
 
+from ..algorithms.utils.gpkg_manager import GpkgManager
+from ..algorithms.utils.metric_result_store import MetricResultStore
 from ..utils.LayersColoring import LayersColoring
+from .chart_cache import ChartCache
 
 
 plt.rcParams['font.family'] = "MS Gothic"
@@ -53,6 +57,8 @@ _datalist_file = os.path.join(_config_dir, 'DataListConfig.xml')
 _default_colors = list(
     dict(mcolors.TABLEAU_COLORS, **mcolors.CSS4_COLORS).keys()
 )
+# 読み込み済み評価指標データのキャッシュ（読み込み元: (更新日時, DataFrame)）
+_metric_data_cache = {}
 
 def safe_find(element, tag, default=''):
     """
@@ -165,6 +171,32 @@ def load_config(datalist_file, config_file):
     return data_items, years, datasets
 
 
+def merge_colors(datasets):
+    """
+    デフォルトの色と指定された色をマージする
+
+    :param datasets: 設定ファイルから読み込んだデータセット
+    :type datasets: dict
+    """
+    for dataset in datasets.values():
+        for data_list in dataset:
+            if data_list['type'] == 'Yearsbar':
+                continue
+
+            if len(data_list['y']) < len(data_list['color']):
+                data_list['color'] = data_list['color'][
+                    :len(data_list['y'])
+                ]
+            for i in range(len(data_list['y'])):
+                if len(data_list['y']) > len(data_list['color']):
+                    data_list['color'].append(_default_colors[i])
+                elif (
+                    data_list['color'][i] == ''
+                    or data_list['color'][i] not in _default_colors
+                ):
+                    data_list['color'][i] = _default_colors[i]
+
+
 def format_number_1f(x):
     """
     小数点以下1桁で数値をフォーマットする
@@ -219,6 +251,80 @@ def format_axis(x, _):
     return f'{x:.0f}'
 
 
+def read_metric_data(path):
+    """
+    評価指標のデータを読み込む（更新されていない場合は読み込み済みの結果を返す）
+
+    評価指標ファイルと同じフォルダのGeoPackageに算出結果が保存されている場合は
+    GeoPackageのテーブルから読み込み、保存されていない場合はCSVファイルを読み込む。
+    メイン・比較用の全GraphDockで共有し、欠損値は読み込み時にNaNとする。
+    返却するDataFrameは共有されるため、呼び出し側で変更しないこと。
+
+    :param path: 評価指標ファイル（CSV）のパス
+    :type path: str
+
+    :return: 読み込んだDataFrame
+    :rtype: pandas.DataFrame
+    """
+    df = read_metric_store(path)
+    if df is not None:
+        return df
+
+    key = os.path.normcase(os.path.abspath(path))
+    mtime = os.path.getmtime(path)
+    cached = _metric_data_cache.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pd.read_csv(path, na_values=["―"]))
+        _metric_data_cache[key] = cached
+    return cached[1]
+
+
+def read_metric_store(path):
+    """
+    評価指標ファイルに対応する算出結果をGeoPackageから読み込む
+
+    CSVと同じく、数値に変換できる列は数値型（欠損値はNaN）とする。
+
+    :param path: 評価指標ファイル（CSV）のパス
+    :type path: str
+
+    :return: 読み込んだDataFrame（GeoPackageに保存されていない場合はNone）
+    :rtype: pandas.DataFrame
+    """
+    file_id = MetricResultStore.get_file_id(path)
+    if file_id is None:
+        return None
+
+    gpkg_manager = GpkgManager(os.path.dirname(path), shared=False)
+    gpkg_path = gpkg_manager.geopackage_path
+    if not os.path.exists(gpkg_path):
+        return None
+
+    key = (os.path.normcase(os.path.abspath(gpkg_path)), file_id)
+    mtime = os.path.getmtime(gpkg_path)
+    cached = _metric_data_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        result = MetricResultStore(gpkg_manager).read(file_id)
+    finally:
+        # 読み込み用の接続を閉じる
+        gpkg_manager.close()
+    if result is None:
+        return None
+
+    columns, rows = result
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for column in df.columns:
+        try:
+            df[column] = pd.to_numeric(df[column])
+        except (ValueError, TypeError):
+            pass
+    _metric_data_cache[key] = (mtime, df)
+    return df
+
+
 def is_1d_list(lst):
     """
     指定されたリストが1次元リストかどうかを確認する。
@@ -374,32 +480,14 @@ class ControlDock(QDockWidget):
         self.plotSignal_sub.emit(self.get_current_sub_item_value())
 
 
-class GraphDock(QDockWidget):
+class ChartPlotter:
     """
-    グラフを表示するためのdockwidget
-    
-    このDockWidgetは、可視化グラフまたは比較グラフを表示するためのユーザーインターフェースを提供します。
-    QGISアプリケーション内でフローティングまたはドッキング可能なパネルとして利用されます。
+    グラフを描画するためのクラス
 
-    属性:
-        resize_timer (QTimer): ウィンドウのリサイズに遅延を加えてグラフサイズ調整を行うタイマー。
-        content (QWidget): ダイアログのメインコンテンツ。
-        layout (QVBoxLayout): メインレイアウト。
-        scroll_area (QScrollArea): グラフをスクロールできる領域。
-        scroll_content (QWidget): スクロール領域内のコンテンツ。
-        scroll_layout (QVBoxLayout): スクロール領域のレイアウト。
-        data_items (dict): 設定ファイルから読み込んだデータアイテム。
-        datasets (dict): 設定ファイルから読み込んだデータセット。
-        layer_coloring (LayersColoring): レイヤーの色付けを担当するオブジェクト。
+    GUIに依存せず、可視化グラフの表示と作成済みグラフ画像の出力の両方で使用します。
 
     メソッド:
-        __init__(self, parent=None, translator=None, title=0):
-            DockWidgetを初期化し、ウィンドウタイトルを設定します。
-        setup_translator(translator): 国際化のための翻訳機能を設定します。
-        setup_ui(): ユーザーインターフェースを設定します。
-        check_colors(): デフォルトの色と指定された色をマージする機能。
-        update_plots_and_layer_coloring(data_item, year): プロットとレイヤーの色を更新します。
-        update_plots(data_item): 選択されたデータ項目と年に基づいてプロットを更新します。
+        draw_chart(figure, data): 設定に基づいてグラフを描画します。
         title_check(text, df): テキスト内のプレースホルダを評価されたDataFrame式で置き換えます。
         plot_stacked_bar(ax, x, df, y_columns, add_line=False, colors=None,
                         change_rates=None, legends=None, bar_label_rotate=False,
@@ -426,215 +514,117 @@ class GraphDock(QDockWidget):
         check_non_numeric_values(values): リスト内の非数値の値をチェックする関数。
         add_solid_line(ax, bars, y_bases=None): 棒グラフに実線を追加する関数。
         add_dashed_line(ax, bars, y_bases=None): 棒グラフに破線を追加する関数。
-        resizeEvent(event): リサイズイベントを処理する関数。
-        adjust_figure_sizes(): ウィジェットのサイズに基づいて図のサイズを調整する関数。
     """
-    def __init__(self, parent=None, translator=None, title=0):
-        super().__init__(parent)
-        self.setup_translator(translator)
-        if title == 0:
-            self.setWindowTitle(self.tr('Visualization Graph'))
-        else:
-            self.setWindowTitle(self.tr('Comparison Graph'))
-        self.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
-        self.config_file = _config_file
-        self.datalist_file = _datalist_file
-        self.setup_ui()
-
-        self.resize_timer = QTimer(self)
-        self.resize_timer.setSingleShot(True)
-        self.resize_timer.timeout.connect(self.adjust_figure_sizes)
-
-    def setup_translator(self, translator):
+    def draw_chart(self, figure, data):
         """
-        国際化のための翻訳機能を設定します
-        
-        :param translator: 翻訳オブジェクト
-        :type translator: QTranslator
-        """
-        if translator:
-            QCoreApplication.installTranslator(translator)
-
-    def setup_ui(self):
-        """ユーザーインターフェースを設定します"""
-        self.content = QWidget()
-        self.layout = QVBoxLayout()
-        self.content.setLayout(self.layout)
-        self.setWidget(self.content)
-
-        self.scroll_area = QScrollArea()
-        self.scroll_content = QWidget()
-        self.scroll_layout = QVBoxLayout()
-        self.scroll_content.setLayout(self.scroll_layout)
-        self.scroll_area.setWidget(self.scroll_content)
-        self.scroll_area.setWidgetResizable(True)
-        self.layout.addWidget(self.scroll_area)
-
-        self.data_items, _, self.datasets = load_config(
-            self.datalist_file, self.config_file
-        )
-        self.check_colors()
-        self.layer_coloring = LayersColoring()
-
-    def check_colors(self):
-        """デフォルトの色と指定された色をマージする機能"""
-        for dataset in self.datasets.values():
-            for data_list in dataset:
-                if data_list['type'] == 'Yearsbar':
-                    continue
+        設定に基づいてグラフを描画します
 
-                if len(data_list['y']) < len(data_list['color']):
-                    data_list['color'] = data_list['color'][
-                        :len(data_list['y'])
-                    ]
-                for i in range(len(data_list['y'])):
-                    if len(data_list['y']) > len(data_list['color']):
-                        data_list['color'].append(_default_colors[i])
-                    elif (
-                        data_list['color'][i] == ''
-                        or data_list['color'][i] not in _default_colors
-                    ):
-                        data_list['color'][i] = _default_colors[i]
-
-    def update_plots_and_layer_coloring(self, data_item, year):
-        """
-        プロットとレイヤーの色を更新します
-        
-        :param data_item: 更新するデータ項目
-        :type data_item: str
-        :param year: 更新する年
-        :type year: str
-        """
-        self.update_plots(data_item)
-        self.layer_coloring.coloring(data_item, year)
+        :param figure: 描画先の図
+        :type figure: matplotlib.figure.Figure
+        :param data: グラフの設定
+        :type data: dict
 
-    def update_plots(self, data_item):
-        """
-        選択されたデータ項目と年に基づいてプロットを更新します
-        
-        :param data_item: 更新するデータ項目
-        :type data_item: str
+        :returns: 描画した場合はTrue、未対応のグラフ種別の場合はFalse
+        :rtype: bool
         """
-        for i in reversed(range(self.scroll_layout.count())):
-            self.scroll_layout.itemAt(i).widget().setParent(None)
-
-        if data_item in self.datasets:
-            datalist = self.datasets[data_item]
-            # datalist = self.datasets[data_item][year]
-            for data in datalist:
-                figure = Figure(figsize=(4, 3), dpi=100)
-                canvas = FigureCanvas(figure)
-                self.scroll_layout.addWidget(canvas)
-
-                ax = figure.add_subplot(111)
-                ax.axhline(0, color='grey', linewidth=0.8)
-
-                df = pd.read_csv(data['path'])
-                df = df.replace("―", "")
-                x = None
-                if data['type'] != 'Yearsbar':
-                    x = df[data['x']].to_numpy()
-                y_columns = data['y']
-                colors = data['color']
-
-                change_rates = []
-                if data['change_rates'] and data['change_rates'] != '':
-                    rate_columns = [
-                        col.strip() for col in data['change_rates'].split(',')
-                    ]
-                    for col in rate_columns:
-                        if col in df.columns:
-                            change_rates.append(df[col].tolist())
-
-                legends = []
-                if (
-                    data['legends'] != [''] and
-                    len(data['legends']) != 0 and
-                    len(data['legends']) == len(y_columns)
-                ):
-                    legends = data['legends']
-                else:
-                    legends = y_columns
-
-                add_line = strtobool(data['addline'])
-                bar_label_rotate = strtobool(data['bar_label_rotate'])
-                is_display_bar_label = strtobool(data['is_display_bar_label'])
-
-                if data['type'] == 'Stackedbar':
-                    self.plot_stacked_bar(
-                        ax, x, df, y_columns, bool(add_line),
-                        colors, change_rates, legends,
-                        bar_label_rotate=bool(bar_label_rotate),
-                        label_type=data['label_type'],
-                        label_format=data['label_format'],
-                        is_display_bar_label=bool(is_display_bar_label)
-                    )
-                elif data['type'] == 'Seriesbar':
-                    self.plot_series_bar(
-                        ax, x, df, y_columns, bool(add_line),
-                        colors, change_rates, legends,
-                        bar_label_rotate=bool(bar_label_rotate),
-                        label_type=data['label_type'],
-                        label_format=data['label_format'],
-                        is_display_bar_label=bool(is_display_bar_label)
-                    )
-                elif data['type'] == 'Percentbar':
-                    self.plot_percent_bar(
-                        ax, x, df, y_columns, bool(add_line),
-                        colors, change_rates, legends,
-                        _bar_label_rotate=bool(bar_label_rotate),
-                        is_display_bar_label=bool(is_display_bar_label)
-                    )
-                elif data['type'] == 'Yearsbar':
-                    self.plot_years_bar(
-                        ax, df, data, colors, change_rates,
-                        label_format=data['label_format'],
-                        is_display_bar_label=bool(is_display_bar_label)
-                    )
-                else:
-                    continue
-                if len(data['x_name']) != 0:
-                    _, x_max = ax.get_xlim()
-                    y_min, _ = ax.get_ylim()
-                    text_with_newlines = data['x_name'].replace(r'\n', '\n')
-                    ax.text(
-                        x_max + 0.1, y_min - 1.1,
-                        text_with_newlines, transform=ax.transData,
-                        fontsize=7, va='center'
-                    )
+        ax = figure.add_subplot(111)
+        ax.axhline(0, color='grey', linewidth=0.8)
+
+        df = read_metric_data(data['path'])
+        x = None
+        if data['type'] != 'Yearsbar':
+            x = df[data['x']].to_numpy()
+        y_columns = data['y']
+        colors = data['color']
+
+        change_rates = []
+        if data['change_rates'] and data['change_rates'] != '':
+            rate_columns = [
+                col.strip() for col in data['change_rates'].split(',')
+            ]
+            for col in rate_columns:
+                if col in df.columns:
+                    # 欠損値（NaN）は変化率を表示しない
+                    change_rates.append([
+                        None if pd.isna(rate) else rate
+                        for rate in df[col].tolist()
+                    ])
+
+        legends = []
+        if (
+            data['legends'] != [''] and
+            len(data['legends']) != 0 and
+            len(data['legends']) == len(y_columns)
+        ):
+            legends = data['legends']
+        else:
+            legends = y_columns
+
+        add_line = strtobool(data['addline'])
+        bar_label_rotate = strtobool(data['bar_label_rotate'])
+        is_display_bar_label = strtobool(data['is_display_bar_label'])
+
+        if data['type'] == 'Stackedbar':
+            self.plot_stacked_bar(
+                ax, x, df, y_columns, bool(add_line),
+                colors, change_rates, legends,
+                bar_label_rotate=bool(bar_label_rotate),
+                label_type=data['label_type'],
+                label_format=data['label_format'],
+                is_display_bar_label=bool(is_display_bar_label)
+            )
+        elif data['type'] == 'Seriesbar':
+            self.plot_series_bar(
+                ax, x, df, y_columns, bool(add_line),
+                colors, change_rates, legends,
+                bar_label_rotate=bool(bar_label_rotate),
+                label_type=data['label_type'],
+                label_format=data['label_format'],
+                is_display_bar_label=bool(is_display_bar_label)
+            )
+        elif data['type'] == 'Percentbar':
+            self.plot_percent_bar(
+                ax, x, df, y_columns, bool(add_line),
+                colors, change_rates, legends,
+                _bar_label_rotate=bool(bar_label_rotate),
+                is_display_bar_label=bool(is_display_bar_label)
+            )
+        elif data['type'] == 'Yearsbar':
+            self.plot_years_bar(
+                ax, df, data, colors, change_rates,
+                label_format=data['label_format'],
+                is_display_bar_label=bool(is_display_bar_label)
+            )
+        else:
+            return False
+        if len(data['x_name']) != 0:
+            _, x_max = ax.get_xlim()
+            y_min, _ = ax.get_ylim()
+            text_with_newlines = data['x_name'].replace(r'\n', '\n')
+            ax.text(
+                x_max + 0.1, y_min - 1.1,
+                text_with_newlines, transform=ax.transData,
+                fontsize=7, va='center'
+            )
 
-                data['title'] = self.title_check(data['title'], df)
-                ax.set_title(data['title'], fontsize=8)
+        # 設定のタイトルは書き換えない（CSV更新時に再評価するため）
+        title = self.title_check(data['title'], df)
+        ax.set_title(title, fontsize=8)
 
-                ax.tick_params(axis='both', which='major', labelsize=6)
+        ax.tick_params(axis='both', which='major', labelsize=6)
 
-                is_display_legend = strtobool(data['is_display_legend'])
-                if is_display_legend:
-                    ax.legend(
-                        fontsize=6,
-                        bbox_to_anchor=(0.5, -0.1),
-                        loc='center',
-                        borderaxespad=1,
-                        ncol=3
-                    )
-
-                figure.tight_layout()
-                canvas.draw()
-        else:
-            figure = Figure(figsize=(4, 3), dpi=100)
-            canvas = FigureCanvas(figure)
-            self.scroll_layout.addWidget(canvas)
-            ax = figure.add_subplot(111)
-            ax.text(
-                0.5,
-                0.5,
-                self.tr("No data available"),
-                ha='center',
-                va='center'
+        is_display_legend = strtobool(data['is_display_legend'])
+        if is_display_legend:
+            ax.legend(
+                fontsize=6,
+                bbox_to_anchor=(0.5, -0.1),
+                loc='center',
+                borderaxespad=1,
+                ncol=3
             )
-            canvas.draw()
 
-        self.adjust_figure_sizes()
+        return True
+
 
     @staticmethod
     def title_check(text, df):
@@ -1275,6 +1265,264 @@ class GraphDock(QDockWidget):
 
         return return_list
 
+
+class ChartImage(QLabel):
+    """
+    作成済みのグラフ画像を表示するためのラベル
+
+    属性:
+        source_pixmap (QPixmap): 読み込んだグラフ画像。
+    """
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.source_pixmap = QPixmap(path)
+        self.setAlignment(Qt.AlignCenter)
+
+    def set_display_size(self, width, height):
+        """
+        表示サイズに合わせてグラフ画像を縮小します
+
+        :param width: 表示幅
+        :type width: int
+        :param height: 表示高さ
+        :type height: int
+        """
+        self.setPixmap(
+            self.source_pixmap.scaled(
+                width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation
+            )
+        )
+        self.setFixedSize(width, height)
+
+
+class GraphDock(QDockWidget, ChartPlotter):
+    """
+    グラフを表示するためのdockwidget
+    
+    このDockWidgetは、可視化グラフまたは比較グラフを表示するためのユーザーインターフェースを提供します。
+    QGISアプリケーション内でフローティングまたはドッキング可能なパネルとして利用されます。
+    評価指標算出時に作成したグラフ画像がある場合は画像を表示し、ない場合はグラフを描画します。
+
+    属性:
+        resize_timer (QTimer): ウィンドウのリサイズに遅延を加えてグラフサイズ調整を行うタイマー。
+        content (QWidget): ダイアログのメインコンテンツ。
+        layout (QVBoxLayout): メインレイアウト。
+        scroll_area (QScrollArea): グラフをスクロールできる領域。
+        scroll_content (QWidget): スクロール領域内のコンテンツ。
+        scroll_layout (QVBoxLayout): スクロール領域のレイアウト。
+        data_items (dict): 設定ファイルから読み込んだデータアイテム。
+        datasets (dict): 設定ファイルから読み込んだデータセット。
+        layer_coloring (LayersColoring): レイヤーの色付けを担当するオブジェクト。
+        plot_pages (dict): データ項目ごとの作成済みグラフ。
+
+    メソッド:
+        __init__(self, parent=None, translator=None, title=0):
+            DockWidgetを初期化し、ウィンドウタイトルを設定します。
+        setup_translator(translator): 国際化のための翻訳機能を設定します。
+        setup_ui(): ユーザーインターフェースを設定します。
+        check_colors(): デフォルトの色と指定された色をマージする機能。
+        update_plots_and_layer_coloring(data_item, year): プロットとレイヤーの色を更新します。
+        update_plots(data_item): 選択されたデータ項目と年に基づいてプロットを更新します。
+        get_plots_signature(data_item): グラフの作成元CSVの更新判定用情報を取得します。
+        discard_canvases(canvases): 作成済みのグラフを破棄します。
+        get_chart_cache(data_item): データ項目の作成済みグラフ画像の管理を取得します。
+        create_plots(data_item): データ項目のグラフを作成します。
+        resizeEvent(event): リサイズイベントを処理する関数。
+        adjust_figure_sizes(): ウィジェットのサイズに基づいて図のサイズを調整する関数。
+    """
+    def __init__(self, parent=None, translator=None, title=0):
+        super().__init__(parent)
+        self.setup_translator(translator)
+        if title == 0:
+            self.setWindowTitle(self.tr('Visualization Graph'))
+        else:
+            self.setWindowTitle(self.tr('Comparison Graph'))
+        self.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+        self.config_file = _config_file
+        self.datalist_file = _datalist_file
+        self.setup_ui()
+
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.timeout.connect(self.adjust_figure_sizes)
+
+    def setup_translator(self, translator):
+        """
+        国際化のための翻訳機能を設定します
+        
+        :param translator: 翻訳オブジェクト
+        :type translator: QTranslator
+        """
+        if translator:
+            QCoreApplication.installTranslator(translator)
+
+    def setup_ui(self):
+        """ユーザーインターフェースを設定します"""
+        self.content = QWidget()
+        self.layout = QVBoxLayout()
+        self.content.setLayout(self.layout)
+        self.setWidget(self.content)
+
+        self.scroll_area = QScrollArea()
+        self.scroll_content = QWidget()
+        self.scroll_layout = QVBoxLayout()
+        self.scroll_content.setLayout(self.scroll_layout)
+        self.scroll_area.setWidget(self.scroll_content)
+        self.scroll_area.setWidgetResizable(True)
+        self.layout.addWidget(self.scroll_area)
+
+        self.data_items, _, self.datasets = load_config(
+            self.datalist_file, self.config_file
+        )
+        self.check_colors()
+        self.layer_coloring = LayersColoring()
+        # データ項目ごとの作成済みグラフ（作成元CSVの更新判定用情報, キャンバス）
+        self.plot_pages = {}
+
+    def check_colors(self):
+        """デフォルトの色と指定された色をマージする機能"""
+        merge_colors(self.datasets)
+
+    def update_plots_and_layer_coloring(self, data_item, year):
+        """
+        プロットとレイヤーの色を更新します
+        
+        :param data_item: 更新するデータ項目
+        :type data_item: str
+        :param year: 更新する年
+        :type year: str
+        """
+        self.update_plots(data_item)
+        self.layer_coloring.coloring(data_item, year)
+
+    def update_plots(self, data_item):
+        """
+        選択されたデータ項目と年に基づいてプロットを更新します
+
+        データ項目ごとに作成済みのグラフを保持し、CSVが更新されていない場合は
+        再描画せずに表示を切り替えます。
+
+        :param data_item: 更新するデータ項目
+        :type data_item: str
+        """
+        signature = self.get_plots_signature(data_item)
+        page = self.plot_pages.get(data_item)
+        if page is None or page['signature'] != signature:
+            if page is not None:
+                self.discard_canvases(page['canvases'])
+            page = {
+                'signature': signature,
+                'canvases': self.create_plots(data_item),
+            }
+            self.plot_pages[data_item] = page
+
+        # 選択されたデータ項目のグラフのみ表示
+        for item, other_page in self.plot_pages.items():
+            for canvas in other_page['canvases']:
+                canvas.setVisible(item == data_item)
+
+        self.adjust_figure_sizes()
+
+    def get_plots_signature(self, data_item):
+        """
+        グラフの作成元CSVの更新判定用情報を取得します
+
+        :param data_item: データ項目
+        :type data_item: str
+
+        :returns: 作成元CSVのパスと更新日時、グラフ画像一覧の更新日時の組
+                  （データがない場合はNone）
+        :rtype: tuple
+        """
+        if data_item not in self.datasets:
+            return None
+        chart_cache = self.get_chart_cache(data_item)
+        return tuple(
+            (
+                data['path'],
+                os.path.getmtime(data['path'])
+                if data['path'] and os.path.exists(data['path'])
+                else None,
+            )
+            for data in self.datasets[data_item]
+        ) + (chart_cache.get_mtime() if chart_cache else None,)
+
+    def discard_canvases(self, canvases):
+        """
+        作成済みのグラフを破棄します
+
+        :param canvases: 破棄するグラフのキャンバス
+        :type canvases: list
+        """
+        for canvas in canvases:
+            self.scroll_layout.removeWidget(canvas)
+            canvas.setParent(None)
+            canvas.deleteLater()
+
+    def get_chart_cache(self, data_item):
+        """
+        データ項目の作成済みグラフ画像の管理を取得します
+
+        :param data_item: データ項目
+        :type data_item: str
+
+        :returns: 作成元CSVの出力フォルダのグラフ画像の管理（パスがない場合はNone）
+        :rtype: ChartCache
+        """
+        datalist = self.datasets.get(data_item)
+        if not datalist or not datalist[0]['path']:
+            return None
+        return ChartCache(os.path.dirname(datalist[0]['path']))
+
+    def create_plots(self, data_item):
+        """
+        データ項目のグラフを作成します
+
+        :param data_item: 作成するデータ項目
+        :type data_item: str
+
+        :returns: 作成したグラフのキャンバス（作成済みの画像の場合はラベル）
+        :rtype: list
+        """
+        canvases = []
+        if data_item in self.datasets:
+            datalist = self.datasets[data_item]
+            # 作成元CSVが更新されていないグラフ画像がある場合は画像を表示
+            chart_cache = self.get_chart_cache(data_item)
+            images = chart_cache.get_images(data_item) if chart_cache else None
+            if images:
+                for image in images:
+                    chart_image = ChartImage(image)
+                    self.scroll_layout.addWidget(chart_image)
+                    canvases.append(chart_image)
+                return canvases
+
+            # datalist = self.datasets[data_item][year]
+            for data in datalist:
+                figure = Figure(figsize=(4, 3), dpi=100)
+                canvas = FigureCanvas(figure)
+                self.scroll_layout.addWidget(canvas)
+                canvases.append(canvas)
+
+                self.draw_chart(figure, data)
+
+        else:
+            figure = Figure(figsize=(4, 3), dpi=100)
+            canvas = FigureCanvas(figure)
+            self.scroll_layout.addWidget(canvas)
+            canvases.append(canvas)
+            ax = figure.add_subplot(111)
+            ax.text(
+                0.5,
+                0.5,
+                self.tr("No data available"),
+                ha='center',
+                va='center'
+            )
+
+        # 描画は表示サイズの調整時に行う
+        return canvases
+
     def resizeEvent(self, event):
         """
         リサイズイベントを処理する関数
@@ -1286,17 +1534,32 @@ class GraphDock(QDockWidget):
         self.resize_timer.start(200)
 
     def adjust_figure_sizes(self):
-        """ウィジェットのサイズに基づいて図のサイズを調整する関数"""
+        """
+        ウィジェットのサイズに基づいて図のサイズを調整する関数
+
+        表示中でサイズが変わった図のみ調整し、非表示の図は表示時に調整します。
+        """
         width = self.scroll_area.viewport().width() - 20
         height = int(width * 3 / 4)
 
         for i in range(self.scroll_layout.count()):
             item = self.scroll_layout.itemAt(i)
-            if isinstance(item.widget(), FigureCanvas):
+            if isinstance(item.widget(), ChartImage):
+                chart_image = item.widget()
+                if (
+                    chart_image.isHidden()
+                    or chart_image.size() == QSize(width, height)
+                ):
+                    continue
+                chart_image.set_display_size(width, height)
+            elif isinstance(item.widget(), FigureCanvas):
                 canvas = item.widget()
+                if canvas.isHidden() or canvas.size() == QSize(width, height):
+                    continue
                 figure = canvas.figure
                 width_inches = width / figure.dpi
                 height_inches = height / figure.dpi
                 figure.set_size_inches(width_inches, height_inches)
                 canvas.setFixedSize(width, height)
                 figure.tight_layout()
+                canvas.draw_idle()
@@ -31,10 +31,14 @@ from qgis.core import (QgsProject, QgsFillSymbol, QgsLineSymbol, # pylint: disab
                        QgsLinePatternFillSymbolLayer, QgsRendererCategory,
                        QgsGraduatedSymbolRenderer, QgsRendererRange,
                        QgsSimpleFillSymbolLayer, QgsRuleBasedRenderer,
-                       QgsCategorizedSymbolRenderer, QgsSimpleLineSymbolLayer)
+                       QgsCategorizedSymbolRenderer, QgsSimpleLineSymbolLayer,
+                       QgsLayerTree, QgsProviderRegistry)
 from qgis.PyQt.QtCore import Qt # pylint: disable=import-error
 from qgis.utils import iface # pylint: disable=import-error
 
+from ..algorithms.utils.layer_classifier import LayerClassifier
+from ..algorithms.utils.layer_generalizer import LayerGeneralizer
+
 plt.rcParams['font.family'] = "MS Gothic"
 _config_dir = os.path.join(os.path.dirname(
     os.path.abspath(__file__)), '../config'
@@ -66,22 +70,29 @@ class LayersColoring:
         iface (QgisInterface): QGISインターフェイスオブジェクト。
         layer (QgsLayer): 現在アクティブなQGISレイヤー。
         layer_config (dict): レイヤー情報を含む設定ファイルの内容。
+        renderer_cache (dict): アイテムの値・年・レイヤー・フィールド構成ごとの作成済みレンダラー。
 
     メソッド:
         __init__(self): クラスを初期化し、アクティブレイヤーを設定する。
         load_layer_config(self): XML設定ファイルを読み込み、レイヤー情報を取得する。
-        apply_single_style(self, layer_info): 単一定義用のシンボルを設定する。
-        apply_categorized_style(self, layer_info): カテゴリ値定義用のシンボルを設定する。
-        apply_graduated_style(self, layer_info): graduated値の定義に基づいてシンボルを設定する。
-        apply_ruled_style(self, layer_info): ルールに基づいてシンボルを設定する。
+        create_single_renderer(self, layer_info): 単一定義用のレンダラーを作成する。
+        create_categorized_renderer(self, layer_info): カテゴリ値定義用のレンダラーを作成する。
+        create_graduated_renderer(self, layer_info): graduated値の定義に基づいてレンダラーを作成する。
+        create_ruled_renderer(self, layer_info): ルールに基づいてレンダラーを作成する。
         parse_color(self, color_str): 'r,g,b,a'形式の文字列をQColorオブジェクトに変換する。
         hashed_layer(self, data, hashed): 斜線模様のフィルパターンを持つシンボルを設定する。
+        get_renderer(self, item_val, year, layer_info): レイヤーのレンダラーを取得する（作成済みの場合は再利用）。
+        to_class_renderer(self, renderer, layer_info): 分類番号で色分けするレンダラーに変換する。
+        find_generalized_layer(self, layer): 詳細レイヤーに対応する概略レイヤーを取得する。
+        apply_generalized_layer(self, renderer, layer_tree): 小縮尺では概略レイヤーを表示するよう切り替える。
         coloring(self, item_val, year): アイテムの値と年に基づいて地図レイヤーに色を付ける操作を実行する。
+        reorder_layers(self, layer_tree, layer_order): z-indexに基づいてレイヤーの表示順を一括で並べ替える。
     """
     def __init__(self):
         self.iface = iface
         self.layer = self.iface.activeLayer()
         self.layer_config = self.load_layer_config()
+        self.renderer_cache = {}
 
     def load_layer_config(self):
         """
@@ -162,12 +173,15 @@ class LayersColoring:
             datasets[item_val][year] = layers
         return datasets
 
-    def apply_single_style(self, layer_info):
+    def create_single_renderer(self, layer_info):
         """
-        単一定義用のシンボルを設定する関数
+        単一定義用のシンボルを設定したレンダラーを作成する関数
 
         :param layer_info: レイヤー情報を含む辞書
         :type layer_info: dict
+
+        :return: 作成したレンダラー（未対応のジオメトリタイプの場合はNone）
+        :rtype: QgsSingleSymbolRenderer
         """
         SingleSymbol = []
         for data in layer_info['data']:
@@ -224,21 +238,21 @@ class LayersColoring:
                     'line_width_unit': 'POINTS'
                 })
             else:
-                return
+                return None
 
             SingleSymbol.append(symbol)
 
-        renderer = QgsSingleSymbolRenderer(SingleSymbol[0])
-        if renderer is not None:
-            self.layer.setRenderer(renderer)
-            self.layer.triggerRepaint()
+        return QgsSingleSymbolRenderer(SingleSymbol[0])
 
-    def apply_categorized_style(self, layer_info):
+    def create_categorized_renderer(self, layer_info):
         """
-        カテゴリ値定義用のシンボルを設定する関数
+        カテゴリ値定義用のシンボルを設定したレンダラーを作成する関数
 
         :param layer_info: レイヤー情報を含む辞書
         :type layer_info: dict
+
+        :return: 作成したレンダラー（未対応のジオメトリタイプの場合はNone）
+        :rtype: QgsCategorizedSymbolRenderer
         """
         categories = []
         for data in layer_info['data']:
@@ -280,30 +294,24 @@ class LayersColoring:
                     'line_width_unit': 'POINTS'
                 })
             else:
-                return
+                return None
 
             category = QgsRendererCategory(data['value'], symbol, data['value'])
             category.setLabel(data['label_name'])
             categories.append(category)
 
-        renderer = QgsCategorizedSymbolRenderer(
-            layer_info['column'], categories
-        )
-        if renderer is not None:
-            self.layer.setRenderer(renderer)
-            self.layer.triggerRepaint()
+        return QgsCategorizedSymbolRenderer(layer_info['column'], categories)
 
-    def apply_graduated_style(self, layer_info):
+    def create_graduated_renderer(self, layer_info):
         """
-        graduated値の定義に基づいてシンボルを設定する関数
+        graduated値の定義に基づいてシンボルを設定したレンダラーを作成する関数
 
         :param layer_info: レイヤー情報を含む辞書
         :type layer_info: dict
-        """
-        if self.layer is None:
-            print("Layer not found")
-            return
 
+        :return: 作成したレンダラー（未対応のジオメトリタイプの場合はNone）
+        :rtype: QgsGraduatedSymbolRenderer
+        """
         column = layer_info['column']
         ranges = []
 
@@ -350,7 +358,7 @@ class LayersColoring:
                     'line_width_unit': 'POINTS'
                 })
             else:
-                return
+                return None
 
             range_ = QgsRendererRange(
                 lower, upper, setting_symbol, f"{lower} - {upper}"
@@ -359,17 +367,17 @@ class LayersColoring:
                 range_.setLabel(data['label_name'])
             ranges.append(range_)
 
-            renderer = QgsGraduatedSymbolRenderer(column, ranges)
-
-        self.layer.setRenderer(renderer)
-        self.layer.triggerRepaint()
+        return QgsGraduatedSymbolRenderer(column, ranges)
 
-    def apply_ruled_style(self, layer_info):
+    def create_ruled_renderer(self, layer_info):
         """
-        ルールに基づいてシンボルを設定する関数
+        ルールに基づいてシンボルを設定したレンダラーを作成する関数
 
         :param layer_info: レイヤー情報を含む辞書
         :type layer_info: dict
+
+        :return: 作成したレンダラー（未対応のジオメトリタイプの場合はNone）
+        :rtype: QgsRuleBasedRenderer
         """
         symbol = QgsSymbol.defaultSymbol(self.layer.geometryType())
         renderer = QgsRuleBasedRenderer(symbol)
@@ -381,9 +389,13 @@ class LayersColoring:
 
                 if layer_info['geometryType'] == 'polygon':
                     if data['fillPattern'] == 'Bhashed':
-                        symbol = self.hashed_layer(data, data['fillPattern'])
+                        setting_symbol = self.hashed_layer(
+                            data, data['fillPattern']
+                        )
                     elif data['fillPattern'] == 'Fhashed':
-                        symbol = self.hashed_layer(data, data['fillPattern'])
+                        setting_symbol = self.hashed_layer(
+                            data, data['fillPattern']
+                        )
                     else:
                         setting_symbol = QgsFillSymbol.createSimple({
                             'color': data['fillColor'],
@@ -416,7 +428,7 @@ class LayersColoring:
                         'line_width_unit': 'POINTS'
                     })
                 else:
-                    return
+                    return None
 
                 rule.setLabel(data['value'])
                 rule.setFilterExpression(data['rule'])
@@ -427,8 +439,7 @@ class LayersColoring:
                 print(f"Unable to set rules.{data['value']}:{data['rule']}")
 
         root_rule.removeChildAt(0)
-        self.layer.setRenderer(renderer)
-        self.layer.triggerRepaint()
+        return renderer
 
     def parse_color(self, color_str):
         """
@@ -491,6 +502,177 @@ class LayersColoring:
         symbol.insertSymbolLayer(0, line_pattern)
         return symbol
 
+    def get_renderer(self, item_val, year, layer_info):
+        """
+        レイヤーのレンダラーを取得する関数（作成済みの場合は再利用する）
+
+        :param item_val: アイテムの値
+        :type item_val: str
+        :param year: 年
+        :type year: str
+        :param layer_info: レイヤー情報を含む辞書
+        :type layer_info: dict
+
+        :return: 作成済みのレンダラー（未対応の定義の場合はNone）
+        :rtype: QgsFeatureRenderer
+        """
+        # レイヤーが読み込み直された場合や、分類番号のフィールドが追加された
+        # 場合（同じレイヤーのままフィールドが更新される）は作成し直すため、
+        # レイヤーIDとフィールド名も含める
+        key = (
+            item_val,
+            year,
+            layer_info['name'],
+            self.layer.id(),
+            tuple(self.layer.fields().names()),
+        )
+        if key in self.renderer_cache:
+            return self.renderer_cache[key]
+
+        renderer = None
+        if layer_info['type'] == 'categorized':
+            renderer = self.create_categorized_renderer(layer_info)
+        elif layer_info['type'] == 'graduated':
+            renderer = self.create_graduated_renderer(layer_info)
+        elif layer_info['type'] == 'ruled':
+            renderer = self.create_ruled_renderer(layer_info)
+        elif layer_info['type'] == 'single':
+            renderer = self.create_single_renderer(layer_info)
+
+        if renderer is not None:
+            renderer = self.to_class_renderer(renderer, layer_info)
+
+        self.renderer_cache[key] = renderer
+        return renderer
+
+    def to_class_renderer(self, renderer, layer_info):
+        """
+        評価指標算出時に作成した分類番号で色分けするレンダラーに変換する関数
+
+        分類番号のフィールドがない場合は変換せずに返す。
+
+        :param renderer: graduated値またはルールに基づくレンダラー
+        :type renderer: QgsFeatureRenderer
+        :param layer_info: レイヤー情報を含む辞書
+        :type layer_info: dict
+
+        :return: 分類番号のカテゴリ値で色分けするレンダラー
+        :rtype: QgsFeatureRenderer
+        """
+        class_column = LayerClassifier.get_class_column(layer_info)
+        if (
+            class_column is None
+            or self.layer.fields().indexOf(class_column) < 0
+        ):
+            return renderer
+
+        if layer_info['type'] == 'graduated':
+            items = [
+                (range_.symbol(), range_.label())
+                for range_ in renderer.ranges()
+            ]
+        else:
+            items = [
+                (rule.symbol(), rule.label())
+                for rule in renderer.rootRule().children()
+            ]
+
+        # 設定できなかったルールがある場合は分類番号と対応しないため変換しない
+        if len(items) != len(layer_info['data']):
+            return renderer
+
+        categories = [
+            QgsRendererCategory(index, symbol.clone(), label)
+            for index, (symbol, label) in enumerate(items)
+        ]
+        return QgsCategorizedSymbolRenderer(class_column, categories)
+
+    def find_generalized_layer(self, layer):
+        """
+        詳細レイヤーに対応する小縮尺表示用の概略レイヤーを取得する関数
+
+        :param layer: 詳細レイヤー
+        :type layer: QgsVectorLayer
+
+        :return: 同じGeoPackageの概略レイヤー（ない場合はNone）
+        :rtype: QgsVectorLayer
+        """
+        registry = QgsProviderRegistry.instance()
+        uri = registry.decodeUri(layer.providerType(), layer.source())
+        if not uri.get('path') or not uri.get('layerName'):
+            return None
+
+        path = os.path.normcase(os.path.abspath(uri['path']))
+        generalized_name = (
+            f"{uri['layerName']}{LayerGeneralizer.GENERALIZED_SUFFIX}"
+        )
+        for candidate in QgsProject.instance().mapLayers().values():
+            if candidate.providerType() != 'ogr':
+                continue
+            candidate_uri = registry.decodeUri('ogr', candidate.source())
+            if (
+                candidate_uri.get('layerName') == generalized_name
+                and candidate_uri.get('path')
+                and os.path.normcase(
+                    os.path.abspath(candidate_uri['path'])
+                ) == path
+            ):
+                return candidate
+        return None
+
+    def apply_generalized_layer(self, renderer, layer_tree):
+        """
+        分類番号で色分けする場合に、小縮尺では概略レイヤーを表示するよう切り替える関数
+
+        詳細レイヤーの最小縮尺（設定がない場合は既定の縮尺）より小縮尺では
+        同じレンダラーを適用した概略レイヤーを表示する。
+
+        :param renderer: 詳細レイヤーに適用したレンダラー
+        :type renderer: QgsFeatureRenderer
+        :param layer_tree: レイヤーツリーのルート
+        :type layer_tree: QgsLayerTree
+
+        :return: 表示した概略レイヤー（切り替えない場合はNone）
+        :rtype: QgsVectorLayer
+        """
+        if (
+            not isinstance(renderer, QgsCategorizedSymbolRenderer)
+            or not renderer.classAttribute().startswith(
+                LayerClassifier.CLASS_FIELD_PREFIX
+            )
+        ):
+            return None
+
+        generalized_layer = self.find_generalized_layer(self.layer)
+        if (
+            generalized_layer is None
+            or generalized_layer.fields().indexOf(
+                renderer.classAttribute()
+            ) < 0
+        ):
+            return None
+
+        if (
+            self.layer.hasScaleBasedVisibility()
+            and self.layer.minimumScale() > 0
+        ):
+            switch_scale = self.layer.minimumScale()
+        else:
+            switch_scale = LayerGeneralizer.GENERALIZED_SCALE
+        self.layer.setScaleBasedVisibility(True)
+        self.layer.setMinimumScale(switch_scale)
+
+        generalized_layer.setRenderer(renderer.clone())
+        generalized_layer.setScaleBasedVisibility(True)
+        # 最小縮尺は制限なし（0）、切り替え縮尺より大縮尺では非表示
+        generalized_layer.setMinimumScale(0.0)
+        generalized_layer.setMaximumScale(switch_scale)
+        generalized_node = layer_tree.findLayer(generalized_layer.id())
+        if generalized_node is not None:
+            generalized_node.setItemVisibilityChecked(True)
+        generalized_layer.triggerRepaint()
+        return generalized_layer
+
     def coloring(self, item_val, year):
         """
         アイテムの値と年に基づいて地図レイヤーに色を付ける操作を実行する関数
@@ -500,41 +682,35 @@ class LayersColoring:
         :param year: 年
         :type year: str
         """
-        rootchildren = QgsProject.instance().layerTreeRoot().children()
-
-        for layer in rootchildren:
-            layer.setItemVisibilityChecked(False)
+        layer_tree = QgsProject.instance().layerTreeRoot()
+        for node in layer_tree.children():
+            node.setItemVisibilityChecked(False)
 
         layer_order = []
 
         for layer_info in self.layer_config[item_val][year]:
-            print(layer_info)
             if 'yyyy' in layer_info['column']:
                 layer_info['column'] = (
                     layer_info['column'].replace('yyyy', year)
                 )
-            targetlayer = (
-                QgsProject.instance().mapLayersByName(layer_info['name'])[0]
+            target_layers = QgsProject.instance().mapLayersByName(
+                layer_info['name']
             )
-            self.iface.setActiveLayer(targetlayer)
-            self.layer = self.iface.activeLayer()
-            QgsProject.instance().layerTreeRoot().findLayer(
-                targetlayer.id()
-            ).setItemVisibilityChecked(True)
-
-            if self.layer is None:
-                print("Layer not found")
+            if not target_layers:
+                print(f"Layer not found: {layer_info['name']}")
                 continue
 
-            if self.layer.name() == layer_info['name']:
-                if layer_info['type'] == 'categorized':
-                    self.apply_categorized_style(layer_info)
-                elif layer_info['type'] == 'graduated':
-                    self.apply_graduated_style(layer_info)
-                elif layer_info['type'] == 'ruled':
-                    self.apply_ruled_style(layer_info)
-                elif layer_info['type'] == 'single':
-                    self.apply_single_style(layer_info)
+            # アクティブレイヤーは変更せずに対象レイヤーへ適用
+            self.layer = target_layers[0]
+            target_node = layer_tree.findLayer(self.layer.id())
+            if target_node is not None:
+                target_node.setItemVisibilityChecked(True)
+
+            renderer = self.get_renderer(item_val, year, layer_info)
+            if renderer is not None:
+                # 作成済みのレンダラーはレイヤーに所有されないよう複製して適用
+                self.layer.setRenderer(renderer.clone())
+                self.layer.triggerRepaint()
 
             if layer_info['scale-visibility'] == 'true':
                 self.layer.setScaleBasedVisibility(True)
@@ -548,31 +724,61 @@ class LayersColoring:
                     self.layer.setMaximumScale(max_scale)
                 except ValueError:
                     self.layer.setMaximumScale(100.0)
+            else:
+                # 概略レイヤへの切り替えで設定した表示縮尺を解除
+                self.layer.setScaleBasedVisibility(False)
 
-            target_node = QgsProject.instance().layerTreeRoot().findLayer(
-                targetlayer.id()
+            generalized_layer = self.apply_generalized_layer(
+                renderer, layer_tree
             )
-            layer_no = layer_info.get('layerNo')
 
+            layer_no = layer_info.get('layerNo')
             if layer_no is not None:
                 try:
-                    layer_no_int = int(layer_no)
-                    layer_order.append(
-                        (layer_no_int, target_node, layer_info['name'])
-                    )
+                    layer_order.append((int(layer_no), self.layer))
+                    if generalized_layer is not None:
+                        layer_order.append((int(layer_no), generalized_layer))
                 except ValueError:
                     pass
-            else:
-                pass
 
+        self.reorder_layers(layer_tree, layer_order)
+
+    def reorder_layers(self, layer_tree, layer_order):
+        """
+        z-indexに基づいてレイヤーの表示順を一括で並べ替える関数
+
+        z-indexの大きいレイヤーを上に、OpenStreetMapを最下位に配置する。
+        表示順が変わらない場合は並べ替えない。
+
+        :param layer_tree: レイヤーツリーのルート
+        :type layer_tree: QgsLayerTree
+        :param layer_order: z-indexとレイヤーの組のリスト
+        :type layer_order: list
+        """
         layer_order.sort(key=lambda x: x[0])
-        layer_tree = QgsProject.instance().layerTreeRoot()
-        for _, (layer_no_int, target_node, layer_name) in enumerate(
-            layer_order
-        ):
-            node_clone = target_node.clone()
-            if layer_name == 'OpenStreetMap':
-                layer_tree.insertChildNode(-1, node_clone)
-            else:
-                layer_tree.insertChildNode(0, node_clone)
-            layer_tree.removeChildNode(target_node)
+        top_layers = [
+            layer for _, layer in reversed(layer_order)
+            if layer.name() != 'OpenStreetMap'
+        ]
+        bottom_layers = [
+            layer for _, layer in layer_order
+            if layer.name() == 'OpenStreetMap'
+        ]
+        ordered_ids = {layer.id() for layer in top_layers + bottom_layers}
+
+        current_layers = [
+            node.layer() for node in layer_tree.children()
+            if QgsLayerTree.isLayer(node)
+        ]
+        new_layers = (
+            top_layers
+            + [
+                layer for layer in current_layers
+                if layer.id() not in ordered_ids
+            ]
+            + bottom_layers
+        )
+        if [layer.id() for layer in new_layers] != [
+            layer.id() for layer in current_layers
+        ]:
+            layer_tree.reorderGroupLayers(new_layers)